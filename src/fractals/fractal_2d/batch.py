@@ -0,0 +1,52 @@
+"""Batched escape-time rendering: one grid per parameter set, in one launch
+
+Kept apart from escape_time so that only code rendering batches compiles
+the parallel driver.
+"""
+
+from numba import jit, prange, types
+
+from src.fractals.fractal_2d.escape_time import POINT_KERNEL, RESUME_KERNEL, evaluate, new_grid
+
+
+# escape_batch returns one grid per parameter set
+BATCH_RESULTS = ((POINT_KERNEL, types.int32[:, :, ::1]),
+                 (RESUME_KERNEL, types.float32[:, :, ::1]))
+
+
+@jit([result(kernel, types.float64[::1], types.float64[::1], types.float64[:, ::1],
+             types.int64)
+      for kernel, result in BATCH_RESULTS],
+     nopython=True, nogil=True, parallel=True, cache=True)
+def escape_batch(point, x, y, params, max_iter):
+    """
+    Run a point kernel over the same grid for many parameter sets at once
+
+    All grids are computed in one parallel launch, row by row, so the
+    launch overhead is paid once however many sets there are (e.g. a
+    Julia set thumbnail per c).
+
+    Args:
+        point: Compiled point kernel, or resume kernel for normalized counts
+        x: Array of x coordinates
+        y: Array of y coordinates
+        params: (sets, parameters) float array, one row per grid
+        max_iter: Maximum iterations
+
+    Returns:
+        (sets, len(y), len(x)) int32 array of iteration counts (float32
+        normalized counts)
+    """
+    count = params.shape[0]
+    height = len(y)
+    width = len(x)
+    result = new_grid(point, (count, height, width))
+
+    for row in prange(count * height):
+        k = row // height
+        i = row % height
+        for j in range(width):
+            value, _ = evaluate(point, x[j], y[i], params[k], max_iter)
+            result[k, i, j] = value
+
+    return result
@@ -3,21 +3,94 @@
 import numpy as np
 from numba import jit
 
+from src.fractals.fractal_2d.escape_time import (PERIODICITY_TOLERANCE, POINT_SIGNATURE,
+                                                 RESUME_SIGNATURE)
+from src.rendering.tile_engine import default_engine
+
+
+@jit(RESUME_SIGNATURE, nopython=True, nogil=True, cache=True)
+def burning_ship_resume(x, y, params, z_real, z_imag, start, max_iter):
+    """
+    Iterate c = x + iy from iteration start onwards (params unused)
+    
+    Orbits that settle into a cycle are caught by Brent-style periodicity
+    detection and exit early with max_iter.
+    
+    Args:
+        x: Real part of c
+        y: Imaginary part of c
+        params: Float array of fractal parameters
+        z_real: Real part of z after start iterations (ignored when start is 0)
+        z_imag: Imaginary part of z after start iterations
+        start: Iterations already done
+        max_iter: Maximum iterations
+    
+    Returns:
+        (iteration count, 1 if the point exited early else 0, z.real, z.imag)
+    """
+    c = complex(x, y)
+    z = complex(z_real, z_imag) if start > 0 else 0j
+    saved = z
+    period = 1
+    steps = 0
+    for n in range(start, max_iter):
+        if abs(z) > 2.0:
+            return n, 0, z.real, z.imag
+        # Key difference: take absolute values
+        z = complex(abs(z.real), abs(z.imag))
+        z = z * z + c
+        
+        # Compare with a saved orbit point, saving at doubling intervals
+        d = z - saved
+        if d.real * d.real + d.imag * d.imag < PERIODICITY_TOLERANCE:
+            return max_iter, 1, z.real, z.imag
+        steps += 1
+        if steps == period:
+            saved = z
+            steps = 0
+            period *= 2
+    return max_iter, 0, z.real, z.imag
+
+
+@jit(POINT_SIGNATURE, nopython=True, nogil=True, cache=True)
+def burning_ship_point(x, y, params, max_iter):
+    """
+    Escape count of the single point c = x + iy (params unused)
+    
+    Returns:
+        (iteration count, 1 if the point exited early else 0)
+    """
+    count, early, _, _ = burning_ship_resume(x, y, params, 0.0, 0.0, 0, max_iter)
+    return count, early
+
 
 class BurningShip:
     """Burning Ship fractal - similar to Mandelbrot with absolute values"""
     
+    INFO = {
+        "name": "Burning Ship",
+        "dimension": "2D",
+        "description": "The burning ship fractal - dramatic coastline appearance",
+        "complexity": 4,
+    }
+    
+    # Rendered by perturbation beyond float64 precision
+    deep_zoom = True
+    burning_ship = True
+    
     def __init__(self):
         self.name = "Burning Ship"
         self.dimension = "2D"
         self.default_center = (-0.5, -0.5)
         self.default_zoom = 0.5
+        self.point = burning_ship_point
+        self.resume = burning_ship_resume
+        self.params = np.empty(0)
         
     @staticmethod
-    @jit(nopython=True)
     def calculate(x_coords, y_coords, max_iter):
         """
-        Calculate Burning Ship fractal
+        Calculate Burning Ship fractal, tile by tile on every core
         
         The Burning Ship uses absolute values before squaring,
         creating unique ship-like structures.
@@ -30,26 +103,10 @@ class BurningShip:
         Returns:
             2D array of iteration counts
         """
-        height = len(y_coords)
-        width = len(x_coords)
-        result = np.zeros((height, width), dtype=np.int32)
-        
-        for i in range(height):
-            for j in range(width):
-                c = complex(x_coords[j], y_coords[i])
-                z = 0+0j
-                
-                for n in range(max_iter):
-                    if abs(z) > 2.0:
-                        result[i, j] = n
-                        break
-                    # Key difference: take absolute values
-                    z = complex(abs(z.real), abs(z.imag))
-                    z = z * z + c
-                else:
-                    result[i, j] = max_iter
-                    
-        return result
+        x_coords = np.ascontiguousarray(x_coords, dtype=np.float64)
+        y_coords = np.ascontiguousarray(y_coords, dtype=np.float64)
+        return default_engine().compute_points(burning_ship_point, x_coords, y_coords,
+                                               np.empty(0), max_iter)[0]
     
     @staticmethod
     def get_interesting_points():
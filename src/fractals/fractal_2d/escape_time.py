@@ -0,0 +1,263 @@
+"""Shared escape-time helpers for the 2D point kernels
+
+A point kernel has the signature ``point(x, y, params, max_iter)`` and
+returns ``(count, early)``, where ``early`` is 1 if the point was resolved
+by an interior shortcut instead of running to ``max_iter``.
+
+A resume kernel, ``resume(x, y, params, z_real, z_imag, start, max_iter)``,
+continues an orbit from the z reached after ``start`` iterations and returns
+``(count, early, z_real, z_imag)``.
+
+The grid drivers accept either kind. Given a point kernel they return int32
+escape counts. Given a resume kernel they run every orbit from z0 and return
+float32 normalized iteration counts (smooth coloring): an orbit that escaped
+after n iterations gets a value in [n, n + 1) from the z it escaped with, so
+the bands between whole counts blend. The two cost the same.
+
+Kernels are compiled eagerly with POINT_SIGNATURE / RESUME_SIGNATURE and the
+drivers take them as typed first-class functions. A plain dispatcher
+argument would be typed by its identity, which changes every run and
+defeats the on-disk cache; with typed kernels every driver is compiled once
+and cached (``cache=True``) for all fractals. Wrap a kernel with
+``first_class`` before handing it to a driver in a hot loop: a bare
+dispatcher works too, but is converted on every call.
+"""
+
+import math
+
+import numpy as np
+from numba import jit, types
+from numba.extending import overload, typeof_impl
+
+
+# (x, y, params, max_iter) -> (count, early)
+POINT_SIGNATURE = types.UniTuple(types.int64, 2)(
+    types.float64, types.float64, types.float64[::1], types.int64)
+
+# (x, y, params, z_real, z_imag, start, max_iter) -> (count, early, z_real, z_imag)
+RESUME_SIGNATURE = types.Tuple((types.int64, types.int64, types.float64, types.float64))(
+    types.float64, types.float64, types.float64[::1], types.float64, types.float64,
+    types.int64, types.int64)
+
+POINT_KERNEL = types.FunctionType(POINT_SIGNATURE)
+RESUME_KERNEL = types.FunctionType(RESUME_SIGNATURE)
+
+# Grid drivers return (int32 counts, pixels iterated, early exits), or
+# float32 normalized counts when given a resume kernel
+GRID_RESULT = types.Tuple((types.int32[:, ::1], types.int64, types.int64))
+SMOOTH_GRID_RESULT = types.Tuple((types.float32[:, ::1], types.int64, types.int64))
+
+# Kernel argument and result types of the drivers, point kernels first
+KERNEL_RESULTS = ((POINT_KERNEL, GRID_RESULT), (RESUME_KERNEL, SMOOTH_GRID_RESULT))
+
+
+class FirstClassKernel(types.CompileResultWAP):
+    """A kernel compiled with an explicit signature, as a typed function value"""
+
+    def __init__(self, kernel):
+        """
+        Args:
+            kernel: Dispatcher compiled for exactly one signature
+        """
+        (args,) = kernel.signatures
+        super().__init__(kernel.overloads[args])
+        self.kernel = kernel
+        self.numba_type = types.FunctionType(self.signature())
+
+
+@typeof_impl.register(FirstClassKernel)
+def _typeof_first_class_kernel(val, c):
+    # Precomputed, so that passing a kernel costs no type construction
+    return val.numba_type
+
+
+_first_class = {}
+
+
+def first_class(kernel):
+    """Return the (shared) FirstClassKernel of a point or resume kernel"""
+    if isinstance(kernel, FirstClassKernel):
+        return kernel
+    wrapped = _first_class.get(kernel)
+    if wrapped is None:
+        wrapped = _first_class.setdefault(kernel, FirstClassKernel(kernel))
+    return wrapped
+
+
+# Two orbit points closer than this (squared distance) are considered equal
+# by periodicity detection
+PERIODICITY_TOLERANCE = 1e-28
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def smooth_count(count, z_real, z_imag, max_iter):
+    """
+    Normalized iteration count of an orbit
+
+    Args:
+        count: Escape count (max_iter if the orbit did not escape)
+        z_real: Real part of z when the orbit stopped
+        z_imag: Imaginary part of z when the orbit stopped
+        max_iter: Maximum iterations
+
+    Returns:
+        count + 1 - log2(log2 |z|), clamped to [count, count + 1); count
+        itself if the orbit stopped without |z| passing 2 (interior points,
+        convergence bailouts)
+    """
+    modulus = z_real * z_real + z_imag * z_imag
+    if count >= max_iter or modulus <= 4.0:
+        return float(count)
+    return count + 1.0 - min(math.log2(0.5 * math.log2(modulus)), 1.0)
+
+
+@jit(types.float32[::1](types.int32[::1], types.float64[::1], types.float64[::1], types.int64),
+     nopython=True, nogil=True, cache=True)
+def smooth_counts(counts, z_real, z_imag, max_iter):
+    """smooth_count of a list of orbits, e.g. from resume_pixels"""
+    values = np.empty(len(counts), dtype=np.float32)
+    for k in range(len(counts)):
+        values[k] = smooth_count(counts[k], z_real[k], z_imag[k], max_iter)
+    return values
+
+
+def evaluate(kernel, x, y, params, max_iter):
+    """(value, early) of one point: a point kernel's escape count, or the
+    normalized count of a resume kernel's orbit from z0 (for jitted code)"""
+    raise NotImplementedError("evaluate is only available in jitted code")
+
+
+@overload(evaluate, jit_options={"nogil": True})
+def _evaluate(kernel, x, y, params, max_iter):
+    if kernel == RESUME_KERNEL:
+        def evaluate_smooth(kernel, x, y, params, max_iter):
+            count, early, z_real, z_imag = kernel(x, y, params, 0.0, 0.0, 0, max_iter)
+            return smooth_count(count, z_real, z_imag, max_iter), early
+        return evaluate_smooth
+
+    def evaluate_count(kernel, x, y, params, max_iter):
+        return kernel(x, y, params, max_iter)
+    return evaluate_count
+
+
+def new_grid(kernel, shape):
+    """Zeroed result array for a kernel: int32 counts or float32 normalized
+    counts (for jitted code)"""
+    raise NotImplementedError("new_grid is only available in jitted code")
+
+
+@overload(new_grid, jit_options={"nogil": True})
+def _new_grid(kernel, shape):
+    if kernel == RESUME_KERNEL:
+        return lambda kernel, shape: np.zeros(shape, dtype=np.float32)
+    return lambda kernel, shape: np.zeros(shape, dtype=np.int32)
+
+
+@jit([result(kernel, types.float64[::1], types.float64[::1], types.float64[::1], types.int64)
+      for kernel, result in KERNEL_RESULTS],
+     nopython=True, nogil=True, cache=True)
+def escape_grid(point, x, y, params, max_iter):
+    """
+    Run a point kernel over every point of a grid
+
+    Args:
+        point: Compiled point kernel, or resume kernel for normalized counts
+        x: Array of x coordinates
+        y: Array of y coordinates
+        params: Float array of fractal parameters
+        max_iter: Maximum iterations
+
+    Returns:
+        (2D int32 array of iteration counts, or float32 of normalized
+        counts, pixels iterated, early exits)
+    """
+    height = len(y)
+    width = len(x)
+    result = new_grid(point, (height, width))
+    early = 0
+
+    for i in range(height):
+        for j in range(width):
+            value, shortcut = evaluate(point, x[j], y[i], params, max_iter)
+            result[i, j] = value
+            early += shortcut
+
+    return result, height * width, early
+
+
+@jit([result.types[0].copy(ndim=1)(kernel, types.float64[::1], types.float64[::1],
+                                   types.float64[::1], types.int64)
+      for kernel, result in KERNEL_RESULTS],
+     nopython=True, nogil=True, cache=True)
+def escape_points(point, x, y, params, max_iter):
+    """
+    Run a point kernel over a list of points (e.g. supersamples)
+
+    Args:
+        point: Compiled point kernel, or resume kernel for normalized counts
+        x: Array of x coordinates, one per point
+        y: Array of y coordinates, one per point
+        params: Float array of fractal parameters
+        max_iter: Maximum iterations
+
+    Returns:
+        int32 array of iteration counts (float32 normalized counts)
+    """
+    counts = new_grid(point, len(x))
+    for k in range(len(x)):
+        value, _ = evaluate(point, x[k], y[k], params, max_iter)
+        counts[k] = value
+    return counts
+
+
+@jit(types.Tuple((types.int32[::1], types.boolean[::1]))(
+         RESUME_KERNEL, types.float64[::1], types.float64[::1], types.float64[::1],
+         types.int32[::1], types.float64[::1], types.float64[::1], types.int32[::1], types.int64),
+     nopython=True, nogil=True, cache=True)
+def resume_pixels(resume, x, y, params, index, z_real, z_imag, start, max_iter):
+    """
+    Continue a list of grid pixels up to a new max_iter
+
+    z_real, z_imag and start are updated in place to the new state.
+
+    Args:
+        resume: Compiled resume kernel
+        x: Array of x coordinates of the grid
+        y: Array of y coordinates of the grid
+        params: Float array of fractal parameters
+        index: Flat (row * width + column) grid index of every pixel
+        z_real: Real parts of z per pixel
+        z_imag: Imaginary parts of z per pixel
+        start: Iterations already done per pixel (0 = not started)
+        max_iter: New maximum iterations
+
+    Returns:
+        (int32 counts, bool early-exit flags) per pixel
+    """
+    width = len(x)
+    count = len(index)
+    counts = np.empty(count, dtype=np.int32)
+    early = np.zeros(count, dtype=np.bool_)
+
+    for k in range(count):
+        i = index[k] // width
+        j = index[k] % width
+        n, shortcut, zr, zi = resume(x[j], y[i], params, z_real[k], z_imag[k],
+                                     start[k], max_iter)
+        counts[k] = n
+        early[k] = shortcut == 1
+        z_real[k] = zr
+        z_imag[k] = zi
+        start[k] = n
+
+    return counts, early
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def in_main_cardioid_or_bulb(x, y):
+    """True if c = x + iy lies in the Mandelbrot main cardioid or period-2 bulb"""
+    shifted = x - 0.25
+    q = shifted * shifted + y * y
+    if q * (q + shifted) <= 0.25 * y * y:
+        return True
+    return (x + 1.0) * (x + 1.0) + y * y <= 0.0625
@@ -0,0 +1,247 @@
+"""Formula compiler for escape-time fractals
+
+A ``Formula`` describes one escape-time iteration in a few Python
+expressions over complex numbers; ``compile()`` turns it into a resume and
+a point kernel with the same signatures, periodicity detection and speed as
+the hand-written Mandelbrot kernels, so it runs on the shared drivers
+(tiles, subdivision, resumable iteration state):
+
+    TRICORN = Formula(
+        "Tricorn",
+        init={"z": "0j", "c": "pixel"},
+        step={"z": "z.conjugate() * z.conjugate() + c"},
+    )
+
+Expressions may use ``pixel`` (the point x + iy), the formula's parameters,
+the variables set up by ``init`` and anything numba supports in nopython
+mode. ``init`` values are converted to complex; ``step`` expressions must
+stay complex and assign variables simultaneously from their previous
+values, while variables it does not assign stay constant. The generated source is written
+to a file named by its hash so numba can cache the machine code on disk.
+"""
+
+import hashlib
+import importlib.util
+import keyword
+import os
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from src.rendering.tile_engine import default_engine
+
+
+# Names the generated kernels use themselves
+RESERVED = {"x", "y", "params", "z_real", "z_imag", "start", "max_iter", "pixel",
+            "n", "period", "steps"}
+
+
+def formula_cache_dir():
+    """Directory the generated kernel modules are written to"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "donuts-fractals" / "formulas"
+
+
+class Formula:
+    """Description of an escape-time iteration"""
+
+    def __init__(self, name, init, step, bailout="z.real * z.real + z.imag * z.imag > 4.0",
+                 params=None, periodicity=True):
+        """
+        Args:
+            name: Name of the fractal (used in messages and generated code)
+            init: Dict of variable -> initial value expression; must set z
+            step: Dict of variable -> expression of its next value; must set z
+            bailout: Expression that is true once the orbit has escaped
+            params: Dict of real parameter name -> default value
+            periodicity: Stop orbits that settle into a cycle early (turn
+                off for formulas whose bailout is convergence, like Newton)
+        """
+        self.name = name
+        self.init = dict(init)
+        self.step = dict(step)
+        self.bailout = bailout
+        self.params = dict(params or {})
+        self.periodicity = periodicity
+        self._kernels = None
+        self._lock = threading.Lock()
+
+        for label, names in (("variable", self.init), ("parameter", self.params)):
+            for variable in names:
+                if (not variable.isidentifier() or keyword.iskeyword(variable) or
+                        variable in RESERVED or variable.startswith(("_", "difference"))):
+                    raise ValueError(f"{name}: invalid {label} name {variable!r}")
+        if "z" not in self.init or "z" not in self.step:
+            raise ValueError(f"{name}: init and step must both set z")
+        unknown = set(self.step) - set(self.init)
+        if unknown:
+            raise ValueError(f"{name}: step assigns variables without init: {sorted(unknown)}")
+        clash = set(self.init) & set(self.params)
+        if clash:
+            raise ValueError(f"{name}: names used as variable and parameter: {sorted(clash)}")
+
+    @property
+    def resumable(self):
+        """True if an orbit can be continued from z alone"""
+        return set(self.step) == {"z"}
+
+    def param_array(self, **values):
+        """Parameter array for the kernels, defaults overridden by values"""
+        unknown = set(values) - set(self.params)
+        if unknown:
+            raise TypeError(f"{self.name}: unknown parameters {sorted(unknown)}")
+        merged = dict(self.params, **values)
+        return np.array([merged[name] for name in self.params], dtype=np.float64)
+
+    def source(self):
+        """Python source of the resume and point kernels"""
+        lines = [
+            f"# Generated from the {self.name!r} formula by src.fractals.fractal_2d.formula",
+            "from numba import jit",
+            "",
+            "from src.fractals.fractal_2d.escape_time import (PERIODICITY_TOLERANCE,",
+            "                                                 POINT_SIGNATURE, RESUME_SIGNATURE)",
+            "",
+            "",
+            "@jit(RESUME_SIGNATURE, nopython=True, nogil=True, cache=True)",
+            "def resume(x, y, params, z_real, z_imag, start, max_iter):",
+            "    pixel = complex(x, y)",
+        ]
+        for index, name in enumerate(self.params):
+            lines.append(f"    {name} = params[{index}]")
+        for name, expression in self.init.items():
+            lines.append(f"    {name} = 0j + ({expression})")
+        if self.resumable:
+            lines += [
+                "    if start > 0:",
+                "        z = complex(z_real, z_imag)",
+            ]
+        else:
+            # Only z survives between runs, so orbits with more state
+            # start over (still correct, just not incremental)
+            lines.append("    start = 0")
+
+        tracked = list(self.step)
+        if self.periodicity:
+            lines += [f"    _saved_{name} = {name}" for name in tracked]
+            lines += ["    period = 1", "    steps = 0"]
+        lines += [
+            "    for n in range(start, max_iter):",
+            f"        if {self.bailout}:",
+            "            return n, 0, z.real, z.imag",
+            f"        {', '.join(tracked)} = {', '.join(self.step[v] for v in tracked)}",
+        ]
+        if self.periodicity:
+            # Squared distance of the whole state from the saved one, as a
+            # single expression (adding to 0.0 would not be folded away)
+            terms = []
+            for index, name in enumerate(tracked):
+                lines.append(f"        difference{index} = {name} - _saved_{name}")
+                terms.append(f"difference{index}.real * difference{index}.real + "
+                             f"difference{index}.imag * difference{index}.imag")
+            lines += [
+                f"        if {' + '.join(terms)} < PERIODICITY_TOLERANCE:",
+                "            return max_iter, 1, z.real, z.imag",
+                "        steps += 1",
+                "        if steps == period:",
+            ]
+            lines += [f"            _saved_{name} = {name}" for name in tracked]
+            lines += [
+                "            steps = 0",
+                "            period *= 2",
+            ]
+        lines += [
+            "    return max_iter, 0, z.real, z.imag",
+            "",
+            "",
+            "@jit(POINT_SIGNATURE, nopython=True, nogil=True, cache=True)",
+            "def point(x, y, params, max_iter):",
+            "    count, early, _, _ = resume(x, y, params, 0.0, 0.0, 0, max_iter)",
+            "    return count, early",
+            "",
+        ]
+        return "\n".join(lines)
+
+    def compile(self):
+        """
+        Compile the formula (once per process; cached on disk across runs)
+
+        Returns:
+            (point kernel, resume kernel)
+        """
+        with self._lock:
+            if self._kernels is None:
+                module = self._load(self.source())
+                self._kernels = (module.point, module.resume)
+            return self._kernels
+
+    def _load(self, source):
+        """Import generated source from a file named by its hash"""
+        digest = hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+        module_name = f"_donuts_formula_{digest}"
+        if module_name in sys.modules:
+            return sys.modules[module_name]
+
+        path = formula_cache_dir() / f"{module_name}.py"
+        try:
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Write under a private name first so that concurrent
+                # processes never import a half-written file
+                partial = path.with_suffix(f".{os.getpid()}.tmp")
+                partial.write_text(source, encoding="utf-8")
+                os.replace(partial, path)
+        except OSError:
+            # No writable cache: compile in memory (and again next run)
+            module = type(sys)(module_name)
+            exec(compile(source.replace("cache=True", "cache=False"),
+                         f"<{self.name} formula>", "exec"), module.__dict__)
+            sys.modules[module_name] = module
+            return module
+
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+        return module
+
+
+class FormulaFractal:
+    """Base class of the 2D fractals defined by a Formula
+
+    Subclasses set ``formula`` plus the usual ``INFO`` and default view;
+    keyword arguments of the constructor override formula parameters.
+    """
+
+    formula = None
+    default_center = (0.0, 0.0)
+    default_zoom = 1.0
+
+    # Perturbation kernels exist only for Mandelbrot and Burning Ship
+    deep_zoom = False
+    burning_ship = False
+
+    def __init__(self, **params):
+        self.name = self.formula.name
+        self.dimension = "2D"
+        self.point, self.resume = self.formula.compile()
+        self.params = self.formula.param_array(**params)
+
+    def calculate(self, x_coords, y_coords, max_iter):
+        """
+        Calculate the fractal over a grid, tile by tile on every core
+
+        Args:
+            x_coords: Array of x coordinates
+            y_coords: Array of y coordinates
+            max_iter: Maximum iterations
+
+        Returns:
+            2D array of iteration counts
+        """
+        x_coords = np.ascontiguousarray(x_coords, dtype=np.float64)
+        y_coords = np.ascontiguousarray(y_coords, dtype=np.float64)
+        return default_engine().compute_points(self.point, x_coords, y_coords, self.params,
+                                               max_iter)[0]
@@ -3,22 +3,93 @@
 import numpy as np
 from numba import jit
 
+from src.fractals.fractal_2d.escape_time import (PERIODICITY_TOLERANCE, POINT_SIGNATURE,
+                                                 RESUME_SIGNATURE, first_class)
+from src.rendering.tile_engine import default_engine
+
+
+@jit(RESUME_SIGNATURE, nopython=True, nogil=True, cache=True)
+def julia_resume(x, y, params, z_real, z_imag, start, max_iter):
+    """
+    Iterate z0 = x + iy, with c = params[0] + i params[1], from iteration start
+    
+    Orbits that settle into a cycle are caught by Brent-style periodicity
+    detection and exit early with max_iter.
+    
+    Args:
+        x: Real part of z0
+        y: Imaginary part of z0
+        params: Float array [c_real, c_imag]
+        z_real: Real part of z after start iterations (ignored when start is 0)
+        z_imag: Imaginary part of z after start iterations
+        start: Iterations already done
+        max_iter: Maximum iterations
+    
+    Returns:
+        (iteration count, 1 if the point exited early else 0, z.real, z.imag)
+    """
+    c = complex(params[0], params[1])
+    z = complex(z_real, z_imag) if start > 0 else complex(x, y)
+    saved = z
+    period = 1
+    steps = 0
+    for n in range(start, max_iter):
+        if abs(z) > 2.0:
+            return n, 0, z.real, z.imag
+        z = z * z + c
+        
+        # Compare with a saved orbit point, saving at doubling intervals
+        d = z - saved
+        if d.real * d.real + d.imag * d.imag < PERIODICITY_TOLERANCE:
+            return max_iter, 1, z.real, z.imag
+        steps += 1
+        if steps == period:
+            saved = z
+            steps = 0
+            period *= 2
+    return max_iter, 0, z.real, z.imag
+
+
+@jit(POINT_SIGNATURE, nopython=True, nogil=True, cache=True)
+def julia_point(x, y, params, max_iter):
+    """
+    Escape count of the single point z0 = x + iy, with c = params[0] + i params[1]
+    
+    Returns:
+        (iteration count, 1 if the point exited early else 0)
+    """
+    count, early, _, _ = julia_resume(x, y, params, 0.0, 0.0, 0, max_iter)
+    return count, early
+
 
 class JuliaSet:
     """Julia set fractal with customizable parameter"""
     
+    INFO = {
+        "name": "Julia Set",
+        "dimension": "2D",
+        "description": "Beautiful Julia set with customizable parameters",
+        "complexity": 3,
+    }
+    
+    # No perturbation kernel: zoom is limited to float64 precision
+    deep_zoom = False
+    burning_ship = False
+    
     def __init__(self, c_real=-0.4, c_imag=0.6):
         self.name = "Julia Set"
         self.dimension = "2D"
         self.c = complex(c_real, c_imag)
         self.default_center = (0.0, 0.0)
         self.default_zoom = 1.0
+        self.point = julia_point
+        self.resume = julia_resume
+        self.params = np.array([c_real, c_imag], dtype=np.float64)
         
     @staticmethod
-    @jit(nopython=True)
     def calculate(x_coords, y_coords, c_real, c_imag, max_iter):
         """
-        Calculate Julia set
+        Calculate Julia set, tile by tile on every core
         
         Args:
             x_coords: Array of x coordinates
@@ -30,24 +101,44 @@ class JuliaSet:
         Returns:
             2D array of iteration counts
         """
-        height = len(y_coords)
-        width = len(x_coords)
-        result = np.zeros((height, width), dtype=np.int32)
-        c = complex(c_real, c_imag)
+        x_coords = np.ascontiguousarray(x_coords, dtype=np.float64)
+        y_coords = np.ascontiguousarray(y_coords, dtype=np.float64)
+        params = np.array([c_real, c_imag], dtype=np.float64)
+        return default_engine().compute_points(julia_point, x_coords, y_coords, params,
+                                               max_iter)[0]
+    
+    @staticmethod
+    def calculate_batch(c_values, width=64, height=64, max_iter=256, center=(0.0, 0.0),
+                        zoom=1.0, smooth=False):
+        """
+        Calculate a Julia set thumbnail for every c in one parallel launch
+        
+        Every thumbnail shows the same view, with square pixels and a
+        vertical extent of 4 / zoom like the 2D renderer.
+        
+        Args:
+            c_values: Complex array (any shape) of parameters
+            width: Thumbnail width
+            height: Thumbnail height
+            max_iter: Maximum iterations
+            center: (x, y) center of the view
+            zoom: Zoom of the view
+            smooth: Return normalized iteration counts
+            
+        Returns:
+            Contiguous (len(c_values), height, width) array of iteration
+            counts (int32, or float32 with smooth)
+        """
+        # Imported here: the parallel batch driver is compiled only when used
+        from src.fractals.fractal_2d.batch import escape_batch
         
-        for i in range(height):
-            for j in range(width):
-                z = complex(x_coords[j], y_coords[i])
-                
-                for n in range(max_iter):
-                    if abs(z) > 2.0:
-                        result[i, j] = n
-                        break
-                    z = z * z + c
-                else:
-                    result[i, j] = max_iter
-                    
-        return result
+        c_values = np.asarray(c_values, dtype=np.complex128).reshape(-1)
+        params = np.ascontiguousarray(np.stack([c_values.real, c_values.imag], axis=1))
+        pixel = 4.0 / zoom / height
+        x_coords = center[0] + (np.arange(width) - (width - 1) / 2) * pixel
+        y_coords = center[1] + (np.arange(height) - (height - 1) / 2) * pixel
+        kernel = first_class(julia_resume if smooth else julia_point)
+        return escape_batch(kernel, x_coords, y_coords, params, max_iter)
     
     def calculate_with_param(self, x_coords, y_coords, max_iter):
         """Calculate with current parameter"""
@@ -3,21 +3,96 @@
 import numpy as np
 from numba import jit
 
+from src.fractals.fractal_2d.escape_time import (PERIODICITY_TOLERANCE, POINT_SIGNATURE,
+                                                 RESUME_SIGNATURE, in_main_cardioid_or_bulb)
+from src.rendering.tile_engine import default_engine
+
+
+@jit(RESUME_SIGNATURE, nopython=True, nogil=True, cache=True)
+def mandelbrot_resume(x, y, params, z_real, z_imag, start, max_iter):
+    """
+    Iterate c = x + iy from iteration start onwards (params unused)
+    
+    Points in the main cardioid or period-2 bulb are answered analytically
+    and orbits that settle into a cycle are caught by Brent-style periodicity
+    detection; both exit early with max_iter.
+    
+    Args:
+        x: Real part of c
+        y: Imaginary part of c
+        params: Float array of fractal parameters
+        z_real: Real part of z after start iterations (ignored when start is 0)
+        z_imag: Imaginary part of z after start iterations
+        start: Iterations already done
+        max_iter: Maximum iterations
+    
+    Returns:
+        (iteration count, 1 if the point exited early else 0, z.real, z.imag)
+    """
+    if start == 0 and in_main_cardioid_or_bulb(x, y):
+        return max_iter, 1, 0.0, 0.0
+    
+    c = complex(x, y)
+    z = complex(z_real, z_imag) if start > 0 else 0j
+    saved = z
+    period = 1
+    steps = 0
+    for n in range(start, max_iter):
+        if abs(z) > 2.0:
+            return n, 0, z.real, z.imag
+        z = z * z + c
+        
+        # Compare with a saved orbit point, saving at doubling intervals
+        d = z - saved
+        if d.real * d.real + d.imag * d.imag < PERIODICITY_TOLERANCE:
+            return max_iter, 1, z.real, z.imag
+        steps += 1
+        if steps == period:
+            saved = z
+            steps = 0
+            period *= 2
+    return max_iter, 0, z.real, z.imag
+
+
+@jit(POINT_SIGNATURE, nopython=True, nogil=True, cache=True)
+def mandelbrot_point(x, y, params, max_iter):
+    """
+    Escape count of the single point c = x + iy (params unused)
+    
+    Returns:
+        (iteration count, 1 if the point exited early else 0)
+    """
+    count, early, _, _ = mandelbrot_resume(x, y, params, 0.0, 0.0, 0, max_iter)
+    return count, early
+
 
 class Mandelbrot:
     """Classic Mandelbrot fractal"""
     
+    INFO = {
+        "name": "Mandelbrot",
+        "dimension": "2D",
+        "description": "Classic Mandelbrot set - the most famous fractal",
+        "complexity": 3,
+    }
+    
+    # Rendered by perturbation beyond float64 precision
+    deep_zoom = True
+    burning_ship = False
+    
     def __init__(self):
         self.name = "Mandelbrot Set"
         self.dimension = "2D"
         self.default_center = (0.0, 0.0)
         self.default_zoom = 1.0
+        self.point = mandelbrot_point
+        self.resume = mandelbrot_resume
+        self.params = np.empty(0)
         
     @staticmethod
-    @jit(nopython=True)
     def calculate(x_coords, y_coords, max_iter):
         """
-        Calculate Mandelbrot set
+        Calculate Mandelbrot set, tile by tile on every core
         
         Args:
             x_coords: Array of x coordinates
@@ -27,24 +102,10 @@ class Mandelbrot:
         Returns:
             2D array of iteration counts
         """
-        height = len(y_coords)
-        width = len(x_coords)
-        result = np.zeros((height, width), dtype=np.int32)
-        
-        for i in range(height):
-            for j in range(width):
-                c = complex(x_coords[j], y_coords[i])
-                z = 0+0j
-                
-                for n in range(max_iter):
-                    if abs(z) > 2.0:
-                        result[i, j] = n
-                        break
-                    z = z * z + c
-                else:
-                    result[i, j] = max_iter
-                    
-        return result
+        x_coords = np.ascontiguousarray(x_coords, dtype=np.float64)
+        y_coords = np.ascontiguousarray(y_coords, dtype=np.float64)
+        return default_engine().compute_points(mandelbrot_point, x_coords, y_coords,
+                                               np.empty(0), max_iter)[0]
     
     @staticmethod
     def get_interesting_points():
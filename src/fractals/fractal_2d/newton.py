@@ -0,0 +1,28 @@
+"""Newton Fractal Implementation"""
+
+from src.fractals.fractal_2d.formula import Formula, FormulaFractal
+
+
+# Counts the steps Newton's method needs to reach a root of z^3 - 1; the
+# orbit converges, so periodicity detection would stop it at the root.
+# z = 0 (no tangent) stays put and never converges.
+NEWTON = Formula(
+    "Newton",
+    init={"z": "pixel"},
+    step={"z": "z - (z * z * z - 1.0) / (3.0 * z * z) if z != 0 else z"},
+    bailout="abs(z * z * z - 1.0) < 1e-6",
+    periodicity=False,
+)
+
+
+class Newton(FormulaFractal):
+    """Basins of attraction of Newton's method for z^3 - 1"""
+    
+    INFO = {
+        "name": "Newton",
+        "dimension": "2D",
+        "description": "Newton fractal - convergence of Newton's method for z^3 = 1",
+        "complexity": 3,
+    }
+    
+    formula = NEWTON
@@ -0,0 +1,181 @@
+"""Perturbation-theory deep zoom for Mandelbrot and Burning Ship
+
+One reference orbit Z_n is iterated in arbitrary precision with Python's
+``decimal`` module. Every pixel then iterates only its float64 difference
+(delta) from that orbit, which stays representable far beyond the 1e13 zoom
+where plain float64 coordinates run out of bits.
+"""
+
+from decimal import Decimal, localcontext
+
+import numpy as np
+from numba import jit
+
+
+def reference_orbit(c_real, c_imag, max_iter, burning_ship=False, digits=50):
+    """
+    Iterate the reference point in high precision
+
+    Args:
+        c_real: Real part of the reference point (Decimal)
+        c_imag: Imaginary part of the reference point (Decimal)
+        max_iter: Maximum iterations
+        burning_ship: Take absolute values before squaring
+        digits: Decimal digits of precision
+
+    Returns:
+        (ref_real, ref_imag) float64 arrays holding Z_0 = 0 up to the first
+        escaped value or Z_max_iter
+    """
+    orbit_real = [0.0]
+    orbit_imag = [0.0]
+    with localcontext() as ctx:
+        ctx.prec = digits
+        c_real = Decimal(c_real)
+        c_imag = Decimal(c_imag)
+        z_real = Decimal(0)
+        z_imag = Decimal(0)
+        for _ in range(max_iter):
+            if burning_ship:
+                z_real, z_imag = abs(z_real), abs(z_imag)
+            z_real, z_imag = (z_real * z_real - z_imag * z_imag + c_real,
+                              2 * z_real * z_imag + c_imag)
+            orbit_real.append(float(z_real))
+            orbit_imag.append(float(z_imag))
+            if orbit_real[-1] ** 2 + orbit_imag[-1] ** 2 > 4.0:
+                break
+    return np.array(orbit_real), np.array(orbit_imag)
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def diffabs(c, d):
+    """|c + d| - |c| without cancellation"""
+    if c >= 0.0:
+        if c + d >= 0.0:
+            return d
+        return -(2.0 * c + d)
+    if c + d > 0.0:
+        return 2.0 * c + d
+    return -d
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def calculate_delta(dx, dy, ref_real, ref_imag, max_iter, burning_ship):
+    """
+    Calculate escape counts by perturbation around a reference orbit
+
+    A pixel whose full value z = Z_m + delta becomes smaller than its delta
+    is a glitch in the making (the reference no longer describes it), and so
+    is one that outlives the reference orbit. Both are rebased: the delta
+    becomes the full value and the pixel restarts along the reference from
+    Z_0 = 0.
+
+    Args:
+        dx: Array of x offsets from the reference point
+        dy: Array of y offsets from the reference point
+        ref_real: Real parts of the reference orbit
+        ref_imag: Imaginary parts of the reference orbit
+        max_iter: Maximum iterations
+        burning_ship: Use the Burning Ship recurrence
+
+    Returns:
+        2D array of iteration counts
+    """
+    height = len(dy)
+    width = len(dx)
+    result = np.zeros((height, width), dtype=np.int32)
+    last = len(ref_real) - 1
+
+    for i in range(height):
+        for j in range(width):
+            dc_x = dx[j]
+            dc_y = dy[i]
+            ex = 0.0
+            ey = 0.0
+            m = 0
+            result[i, j] = max_iter
+
+            for n in range(max_iter):
+                zx = ref_real[m] + ex
+                zy = ref_imag[m] + ey
+                z_norm = zx * zx + zy * zy
+                if z_norm > 4.0:
+                    result[i, j] = n
+                    break
+
+                # Glitch detection and rebasing
+                if z_norm < ex * ex + ey * ey or m == last:
+                    ex = zx
+                    ey = zy
+                    m = 0
+
+                X = ref_real[m]
+                Y = ref_imag[m]
+                if burning_ship:
+                    nx = 2.0 * X * ex + ex * ex - 2.0 * Y * ey - ey * ey + dc_x
+                    ny = 2.0 * diffabs(X * Y, X * ey + ex * Y + ex * ey) + dc_y
+                else:
+                    nx = 2.0 * (X * ex - Y * ey) + ex * ex - ey * ey + dc_x
+                    ny = 2.0 * (X * ey + Y * ex) + 2.0 * ex * ey + dc_y
+                ex = nx
+                ey = ny
+                m += 1
+
+    return result
+
+
+class PerturbationReference:
+    """A reference orbit anchored at a point of a renderer's pixel grid"""
+
+    def __init__(self, grid_x, grid_y, zoom_index, pixel, max_iter,
+                 burning_ship=False, digits=50):
+        """
+        Args:
+            grid_x: Grid column of the reference point
+            grid_y: Grid row of the reference point
+            zoom_index: Zoom ladder step the grid belongs to
+            pixel: Grid spacing (float, converted exactly)
+            max_iter: Maximum iterations
+            burning_ship: Use the Burning Ship recurrence
+            digits: Decimal digits of precision
+        """
+        self.grid_x = grid_x
+        self.grid_y = grid_y
+        self.zoom_index = zoom_index
+        self.pixel = pixel
+        self.max_iter = max_iter
+        self.burning_ship = burning_ship
+
+        with localcontext() as ctx:
+            ctx.prec = digits
+            c_real = Decimal(grid_x) * Decimal(pixel)
+            c_imag = Decimal(grid_y) * Decimal(pixel)
+        self.ref_real, self.ref_imag = reference_orbit(
+            c_real, c_imag, max_iter, burning_ship, digits)
+
+    def covers(self, grid_x, grid_y, zoom_index, max_iter, reach):
+        """True if this reference can serve pixels near (grid_x, grid_y)"""
+        return (zoom_index == self.zoom_index and max_iter == self.max_iter and
+                abs(grid_x - self.grid_x) <= reach and abs(grid_y - self.grid_y) <= reach)
+
+    def calculate(self, origin_x, origin_y, cols, rows, engine=None):
+        """
+        Calculate the grid points (origin_x + cols) x (origin_y + rows)
+
+        Args:
+            origin_x: Grid column the column indices are relative to
+            origin_y: Grid row the row indices are relative to
+            cols: Array of column indices
+            rows: Array of row indices
+            engine: Optional TileEngine to spread the work over all cores
+
+        Returns:
+            2D array of iteration counts
+        """
+        # Offsets are small integers, so they convert to float exactly
+        dx = (cols + (origin_x - self.grid_x)).astype(np.float64) * self.pixel
+        dy = (rows + (origin_y - self.grid_y)).astype(np.float64) * self.pixel
+        args = (self.ref_real, self.ref_imag, self.max_iter, self.burning_ship)
+        if engine is None:
+            return calculate_delta(dx, dy, *args)
+        return engine.compute(calculate_delta, dx, dy, *args)
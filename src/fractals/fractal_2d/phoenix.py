@@ -0,0 +1,24 @@
+"""Phoenix Fractal Implementation"""
+
+from src.fractals.fractal_2d.formula import Formula, FormulaFractal
+
+
+PHOENIX = Formula(
+    "Phoenix",
+    init={"z": "complex(y, x)", "previous": "0j"},
+    step={"z": "z * z + c + p * previous", "previous": "z"},
+    params={"c": 0.5667, "p": -0.5},
+)
+
+
+class Phoenix(FormulaFractal):
+    """Julia-style set of z -> z^2 + c + p * z_previous"""
+    
+    INFO = {
+        "name": "Phoenix",
+        "dimension": "2D",
+        "description": "Phoenix fractal - iteration that remembers the previous z",
+        "complexity": 3,
+    }
+    
+    formula = PHOENIX
@@ -0,0 +1,24 @@
+"""Tricorn (Mandelbar) Implementation"""
+
+from src.fractals.fractal_2d.formula import Formula, FormulaFractal
+
+
+TRICORN = Formula(
+    "Tricorn",
+    init={"z": "0j", "c": "pixel"},
+    step={"z": "z.conjugate() * z.conjugate() + c"},
+)
+
+
+class Tricorn(FormulaFractal):
+    """Mandelbrot set of the complex conjugate, z -> conj(z)^2 + c"""
+    
+    INFO = {
+        "name": "Tricorn",
+        "dimension": "2D",
+        "description": "Mandelbar set - the Mandelbrot iteration with conjugation",
+        "complexity": 3,
+    }
+    
+    formula = TRICORN
+    default_center = (-0.3, 0.0)
@@ -0,0 +1,73 @@
+"""Mandelbulb Implementation"""
+
+import math
+
+from numba import jit
+
+from src.fractals.fractal_3d.ray_march import DISTANCE_SIGNATURE
+
+
+@jit(DISTANCE_SIGNATURE, nopython=True, nogil=True, cache=True)
+def mandelbulb_distance(x, y, z, power, max_iter):
+    """
+    Distance estimate from (x, y, z) to the Mandelbulb
+    
+    Args:
+        x, y, z: Point
+        power: Exponent of the spherical power map (8 for the classic bulb)
+        max_iter: Maximum iterations
+    
+    Returns:
+        0.5 * log(r) * r / dr at the last iterate
+    """
+    zx, zy, zz = x, y, z
+    dr = 1.0
+    r = 0.0
+    
+    for _ in range(max_iter):
+        r = math.sqrt(zx * zx + zy * zy + zz * zz)
+        
+        if r > 2.0:
+            break
+        
+        # Convert to spherical coordinates
+        theta = math.atan2(math.sqrt(zx ** 2 + zy ** 2), zz)
+        phi = math.atan2(zy, zx)
+        
+        dr = math.pow(r, power - 1) * power * dr + 1.0
+        
+        # Scale and rotate
+        zr = math.pow(r, power)
+        theta = theta * power
+        phi = phi * power
+        
+        # Convert back to cartesian
+        zx = zr * (math.sin(theta) * math.cos(phi)) + x
+        zy = zr * (math.sin(phi) * math.sin(theta)) + y
+        zz = zr * math.cos(theta) + z
+    
+    return 0.5 * math.log(r) * r / dr
+
+
+def mandelbulb_de(pos, power=8, max_iter=10):
+    """Distance estimator for Mandelbulb"""
+    return mandelbulb_distance(pos[0], pos[1], pos[2], power, max_iter)
+
+
+class Mandelbulb:
+    """3D Mandelbrot analogue in spherical coordinates"""
+    
+    INFO = {
+        "name": "Mandelbulb",
+        "dimension": "3D",
+        "description": "3D Mandelbrot - stunning bulbous fractal",
+        "complexity": 5,
+    }
+    
+    def __init__(self, power=8):
+        self.name = "Mandelbulb"
+        self.dimension = "3D"
+        self.power = power
+        self.distance_estimator = mandelbulb_de
+        # Compiled kernel for the ray marcher
+        self.distance = mandelbulb_distance
@@ -1,249 +1,225 @@
-"""Fractal registry - central catalog of all available fractals"""
+"""Fractal registry - central catalog of all available fractals
 
+Fractal classes describe themselves with a literal ``INFO`` class attribute
+(description, dimension, complexity). The registry discovers them without
+importing anything: the modules of the ``fractal_2d`` and ``fractal_3d``
+packages are listed with ``pkgutil`` and their source is read with ``ast``.
+Installed packages contribute fractals through the ``donuts_fractals.fractals``
+entry point group (``My Fractal = my_package.module:MyFractal``).
+
+A fractal module, and with it its numba kernels, is imported only when the
+fractal is first loaded.
+"""
+
+import ast
+import importlib
+import importlib.util
+import pkgutil
+import sys
+import threading
+import warnings
+from importlib.metadata import entry_points
+from pathlib import Path
 from typing import Dict, Any
 
 
-class FractalRegistry:
+# Packages scanned for built-in fractals
+PACKAGES = ("src.fractals.fractal_2d", "src.fractals.fractal_3d")
+
+# Entry point group for fractals provided by installed packages
+ENTRY_POINT_GROUP = "donuts_fractals.fractals"
+
+
+def plugin_entry_points():
+    """Entry points of ENTRY_POINT_GROUP (``entry_points(group=)`` needs Python 3.10)"""
+    if sys.version_info >= (3, 10):
+        return entry_points(group=ENTRY_POINT_GROUP)
+    return entry_points().get(ENTRY_POINT_GROUP, ())
+
+
+def read_class_info(path, class_name=None):
+    """
+    Read the literal INFO dicts of the classes in a source file
+    
+    Args:
+        path: Python source file
+        class_name: Only look at this class
+    
+    Returns:
+        List of (class name, info dict) in source order
+    """
+    try:
+        tree = ast.parse(Path(path).read_text(encoding="utf-8"), filename=str(path))
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return []
+    
+    found = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        if class_name is not None and node.name != class_name:
+            continue
+        for statement in node.body:
+            if (isinstance(statement, ast.Assign) and len(statement.targets) == 1 and
+                    isinstance(statement.targets[0], ast.Name) and
+                    statement.targets[0].id == "INFO"):
+                try:
+                    info = ast.literal_eval(statement.value)
+                except ValueError:
+                    break
+                if isinstance(info, dict):
+                    found.append((node.name, info))
+                break
+    return found
+
+
+class _RegistryMeta(type):
+    """Keeps the former catalog class attributes readable"""
+    
+    @property
+    def FRACTALS_2D(cls) -> Dict[str, Any]:
+        """Deprecated: use get_2d_fractals()"""
+        warnings.warn("FractalRegistry.FRACTALS_2D is deprecated; use get_2d_fractals()",
+                      DeprecationWarning, stacklevel=2)
+        return cls.get_2d_fractals()
+    
+    @property
+    def FRACTALS_3D(cls) -> Dict[str, Any]:
+        """Deprecated: use get_3d_fractals()"""
+        warnings.warn("FractalRegistry.FRACTALS_3D is deprecated; use get_3d_fractals()",
+                      DeprecationWarning, stacklevel=2)
+        return cls.get_3d_fractals()
+
+
+class FractalRegistry(metaclass=_RegistryMeta):
     """Registry of all available fractals"""
     
-    # 2D Fractals
-    FRACTALS_2D = {
-        "Mandelbrot": {
-            "class": "Mandelbrot",
-            "dimension": "2D",
-            "description": "Classic Mandelbrot set - the most famous fractal",
-            "complexity": 3,
-            "module": "src.fractals.fractal_2d.mandelbrot"
-        },
-        "Julia Set": {
-            "class": "JuliaSet",
-            "dimension": "2D",
-            "description": "Beautiful Julia set with customizable parameters",
-            "complexity": 3,
-            "module": "src.fractals.fractal_2d.julia"
-        },
-        "Burning Ship": {
-            "class": "BurningShip",
-            "dimension": "2D",
-            "description": "The burning ship fractal - dramatic coastline appearance",
-            "complexity": 4,
-            "module": "src.fractals.fractal_2d.burning_ship"
-        },
-        "Newton": {
-            "class": "NewtonFractal",
-            "dimension": "2D",
-            "description": "Newton's method fractal - colorful basin boundaries",
-            "complexity": 3,
-            "module": "src.fractals.fractal_2d.newton"
-        },
-        "Phoenix": {
-            "class": "PhoenixFractal",
-            "dimension": "2D",
-            "description": "Phoenix fractal - rising from complex dynamics",
-            "complexity": 4,
-            "module": "src.fractals.fractal_2d.phoenix"
-        },
-        "Tricorn": {
-            "class": "Tricorn",
-            "dimension": "2D",
-            "description": "Mandelbar or Tricorn - conjugate Mandelbrot",
-            "complexity": 3,
-            "module": "src.fractals.fractal_2d.tricorn"
-        },
-        "Barnsley Fern": {
-            "class": "BarnsleyFern",
-            "dimension": "2D",
-            "description": "Nature-inspired fern pattern using IFS",
-            "complexity": 2,
-            "module": "src.fractals.fractal_2d.barnsley_fern"
-        },
-        "Sierpinski": {
-            "class": "SierpinskiTriangle",
-            "dimension": "2D",
-            "description": "Classic Sierpinski triangle - infinite self-similarity",
-            "complexity": 2,
-            "module": "src.fractals.fractal_2d.sierpinski"
-        },
-        "Dragon Curve": {
-            "class": "DragonCurve",
-            "dimension": "2D",
-            "description": "Heighway dragon curve - paper folding fractal",
-            "complexity": 2,
-            "module": "src.fractals.fractal_2d.dragon"
-        },
-        "Koch Snowflake": {
-            "class": "KochSnowflake",
-            "dimension": "2D",
-            "description": "Koch snowflake - geometric beauty",
-            "complexity": 2,
-            "module": "src.fractals.fractal_2d.koch"
-        },
-        "Apollonian": {
-            "class": "ApollonianGasket",
-            "dimension": "2D",
-            "description": "Apollonian gasket - circle packing fractal",
-            "complexity": 3,
-            "module": "src.fractals.fractal_2d.apollonian"
-        },
-        "Lyapunov": {
-            "class": "LyapunovFractal",
-            "dimension": "2D",
-            "description": "Lyapunov fractal - chaos theory visualization",
-            "complexity": 4,
-            "module": "src.fractals.fractal_2d.lyapunov"
-        },
-        "Bifurcation": {
-            "class": "BifurcationDiagram",
-            "dimension": "2D",
-            "description": "Logistic map bifurcation diagram",
-            "complexity": 3,
-            "module": "src.fractals.fractal_2d.bifurcation"
-        },
-        "Hilbert Curve": {
-            "class": "HilbertCurve",
-            "dimension": "2D",
-            "description": "Space-filling Hilbert curve",
-            "complexity": 2,
-            "module": "src.fractals.fractal_2d.hilbert"
-        },
-        "Gosper Curve": {
-            "class": "GosperCurve",
+    _fractals = None
+    _classes = {}
+    _lock = threading.Lock()
+    
+    @classmethod
+    def discover(cls, refresh=False) -> Dict[str, Any]:
+        """
+        Build the catalog from the fractal packages and entry points
+        
+        Args:
+            refresh: Scan again even if the catalog has been built
+        
+        Returns:
+            Dict of fractal name -> info (2D fractals first)
+        """
+        with cls._lock:
+            if cls._fractals is None or refresh:
+                fractals = {}
+                for package in PACKAGES:
+                    fractals.update(cls._scan_package(package))
+                fractals.update(cls._scan_entry_points())
+                cls._fractals = dict(sorted(
+                    fractals.items(), key=lambda item: (item[1]["dimension"], item[0])))
+            return cls._fractals
+    
+    @staticmethod
+    def _entry(name, class_name, module, info):
+        """Catalog entry with defaults filled in"""
+        entry = {
+            "name": name,
+            "class": class_name,
             "dimension": "2D",
-            "description": "Gosper or flowsnake curve",
+            "description": "",
             "complexity": 3,
-            "module": "src.fractals.fractal_2d.gosper"
+            "module": module,
         }
-    }
-    
-    # 3D Fractals
-    FRACTALS_3D = {
-        "Mandelbulb": {
-            "class": "Mandelbulb",
-            "dimension": "3D",
-            "description": "3D Mandelbrot - stunning bulbous fractal",
-            "complexity": 5,
-            "module": "src.fractals.fractal_3d.mandelbulb"
-        },
-        "Menger Sponge": {
-            "class": "MengerSponge",
-            "dimension": "3D",
-            "description": "3D Sierpinski - infinite holes",
-            "complexity": 4,
-            "module": "src.fractals.fractal_3d.menger"
-        },
-        "Sierpinski 3D": {
-            "class": "SierpinskiPyramid",
-            "dimension": "3D",
-            "description": "Tetrahedral Sierpinski pyramid",
-            "complexity": 3,
-            "module": "src.fractals.fractal_3d.sierpinski_3d"
-        },
-        "Julia 3D": {
-            "class": "Julia3D",
-            "dimension": "3D",
-            "description": "3D Julia set - mesmerizing complexity",
-            "complexity": 4,
-            "module": "src.fractals.fractal_3d.julia_3d"
-        },
-        "Quaternion": {
-            "class": "QuaternionJulia",
-            "dimension": "3D",
-            "description": "4D quaternion Julia in 3D space",
-            "complexity": 5,
-            "module": "src.fractals.fractal_3d.quaternion"
-        },
-        "Mandelbox": {
-            "class": "Mandelbox",
-            "dimension": "3D",
-            "description": "Box-like fractal with amazing detail",
-            "complexity": 5,
-            "module": "src.fractals.fractal_3d.mandelbox"
-        },
-        "Klein Bottle": {
-            "class": "KleinBottle",
-            "dimension": "3D",
-            "description": "Non-orientable surface fractal",
-            "complexity": 4,
-            "module": "src.fractals.fractal_3d.klein"
-        },
-        "Lorenz": {
-            "class": "LorenzAttractor",
-            "dimension": "3D",
-            "description": "Chaotic Lorenz attractor butterfly",
-            "complexity": 3,
-            "module": "src.fractals.fractal_3d.lorenz"
-        },
-        "Cube Fractal": {
-            "class": "CubeFractal",
-            "dimension": "3D",
-            "description": "Recursive cube subdivision",
-            "complexity": 3,
-            "module": "src.fractals.fractal_3d.cube"
-        },
-        "Dodecahedron": {
-            "class": "DodecahedronFractal",
-            "dimension": "3D",
-            "description": "12-sided polyhedron fractal",
-            "complexity": 4,
-            "module": "src.fractals.fractal_3d.dodecahedron"
-        },
-        "Icosahedron": {
-            "class": "IcosahedronFractal",
-            "dimension": "3D",
-            "description": "20-sided polyhedron fractal",
-            "complexity": 4,
-            "module": "src.fractals.fractal_3d.icosahedron"
-        },
-        "Tree 3D": {
-            "class": "Tree3D",
-            "dimension": "3D",
-            "description": "3D fractal tree structure",
-            "complexity": 3,
-            "module": "src.fractals.fractal_3d.tree"
-        },
-        "Apollonian 3D": {
-            "class": "ApollonianSphere",
-            "dimension": "3D",
-            "description": "3D sphere packing fractal",
-            "complexity": 4,
-            "module": "src.fractals.fractal_3d.apollonian_3d"
-        },
-        "Tetrahedron": {
-            "class": "TetrahedralFractal",
-            "dimension": "3D",
-            "description": "Tetrahedral fractal subdivision",
-            "complexity": 3,
-            "module": "src.fractals.fractal_3d.tetrahedron"
-        },
-        "Octahedron": {
-            "class": "OctahedralFractal",
-            "dimension": "3D",
-            "description": "8-sided octahedral fractal",
-            "complexity": 3,
-            "module": "src.fractals.fractal_3d.octahedron"
-        }
-    }
+        entry.update({key: value for key, value in info.items() if key != "name"})
+        return entry
+    
+    @classmethod
+    def _scan_package(cls, package):
+        """Entries for the classes with INFO in a package's modules"""
+        spec = importlib.util.find_spec(package)
+        if spec is None or not spec.submodule_search_locations:
+            return {}
+        
+        fractals = {}
+        for module_info in pkgutil.iter_modules(spec.submodule_search_locations):
+            if module_info.ispkg:
+                continue
+            path = Path(module_info.module_finder.path) / f"{module_info.name}.py"
+            module = f"{package}.{module_info.name}"
+            for class_name, info in read_class_info(path):
+                name = info.get("name", class_name)
+                fractals[name] = cls._entry(name, class_name, module, info)
+        return fractals
+    
+    @classmethod
+    def _scan_entry_points(cls):
+        """Entries for fractals registered by installed packages"""
+        fractals = {}
+        for point in plugin_entry_points():
+            # "module:attr" (EntryPoint.module / .attr need Python 3.9)
+            module, _, attr = point.value.partition(":")
+            module, attr = module.strip(), attr.strip()
+            try:
+                # Locates the module (importing only its parent packages)
+                spec = importlib.util.find_spec(module)
+            except (ImportError, ValueError) as e:
+                warnings.warn(f"Skipping fractal plugin {point.name!r}: {e}")
+                continue
+            info = {}
+            if spec is not None and spec.origin and spec.origin.endswith(".py"):
+                found = read_class_info(spec.origin, attr)
+                if found:
+                    info = found[0][1]
+            fractals[point.name] = cls._entry(point.name, attr, module, info)
+        return fractals
     
     @classmethod
     def get_all_fractals(cls) -> Dict[str, Any]:
         """Get all registered fractals"""
-        all_fractals = {}
-        all_fractals.update(cls.FRACTALS_2D)
-        all_fractals.update(cls.FRACTALS_3D)
-        return all_fractals
+        return dict(cls.discover())
     
     @classmethod
     def get_2d_fractals(cls) -> Dict[str, Any]:
         """Get only 2D fractals"""
-        return cls.FRACTALS_2D.copy()
+        return {name: info for name, info in cls.discover().items()
+                if info["dimension"] == "2D"}
     
     @classmethod
     def get_3d_fractals(cls) -> Dict[str, Any]:
         """Get only 3D fractals"""
-        return cls.FRACTALS_3D.copy()
+        return {name: info for name, info in cls.discover().items()
+                if info["dimension"] == "3D"}
     
     @classmethod
     def get_fractal(cls, name: str) -> Dict[str, Any]:
         """Get specific fractal by name"""
-        all_fractals = cls.get_all_fractals()
-        return all_fractals.get(name)
+        return cls.discover().get(name)
+    
+    @classmethod
+    def load(cls, fractal):
+        """
+        Import the class of a fractal (once)
+        
+        Args:
+            fractal: Fractal name or catalog entry
+        
+        Returns:
+            The fractal class
+        """
+        info = cls.get_fractal(fractal) if isinstance(fractal, str) else fractal
+        if info is None:
+            raise KeyError(f"Unknown fractal: {fractal}")
+        
+        key = (info["module"], info["class"])
+        with cls._lock:
+            fractal_class = cls._classes.get(key)
+            if fractal_class is None:
+                module = importlib.import_module(info["module"])
+                fractal_class = getattr(module, info["class"])
+                cls._classes[key] = fractal_class
+        return fractal_class
+    
+    @classmethod
+    def create(cls, fractal, **kwargs):
+        """Instantiate a fractal by name or catalog entry"""
+        return cls.load(fractal)(**kwargs)
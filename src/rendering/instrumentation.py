@@ -0,0 +1,202 @@
+"""Per-stage render timers for the viewer's HUD and Chrome-trace export
+
+Rendering code marks its stages (kernel, colormap, conversion to QImage,
+pixmap scaling) with ``profiler.stage(name)``. While the profiler is
+disabled a stage is a shared no-op context manager, so instrumented code
+costs one attribute lookup per stage. Enabled, every stage becomes a
+trace event and its time is added to the frame being built on its thread.
+
+A frame is split across threads: the render worker computes and colors it
+and calls ``finish_render`` when it hands the image over, then the GUI
+thread scales and shows it and calls ``end_frame``, which joins both parts
+into one frame summary. Frames the showing thread renders itself are
+ended the same way without a worker part.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+
+_NO_STAGE = nullcontext()
+
+
+class _Stage:
+    """Times one stage on the current thread"""
+
+    __slots__ = ("profiler", "name", "frame", "start")
+
+    def __init__(self, profiler, name, frame):
+        self.profiler = profiler
+        self.name = name
+        self.frame = frame
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter(), self.frame)
+        return False
+
+
+class Profiler:
+    """Collects stage timings of rendered frames; disabled by default
+
+    Trace events are kept in a bounded ring, so leaving the profiler on
+    for a long session holds the most recent events only.
+    """
+
+    MAX_EVENTS = 200000
+    # Frames rendered but not shown yet (older ones are dropped)
+    MAX_PENDING = 8
+    # Frame summaries kept for averaging
+    HISTORY = 60
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.epoch = time.perf_counter()
+        # Chrome-trace events: (name, start, end, thread id, args)
+        self.events = deque(maxlen=self.MAX_EVENTS)
+        self.threads = {}
+        # Thread id -> [start, {stage: seconds}] of the frame built there
+        self._open = {}
+        # Worker parts handed over by finish_render, oldest first
+        self._pending = deque(maxlen=self.MAX_PENDING)
+        self.frames = deque(maxlen=self.HISTORY)
+
+    def set_enabled(self, enabled):
+        """Turn collection on or off; turning it on starts a fresh trace"""
+        with self._lock:
+            if enabled and not self.enabled:
+                self.epoch = time.perf_counter()
+                self.events.clear()
+                self.frames.clear()
+            self._open.clear()
+            self._pending.clear()
+            self.enabled = enabled
+
+    def stage(self, name, frame=True):
+        """
+        Context manager timing a stage
+
+        Args:
+            name: Stage name (shown in the HUD and the trace)
+            frame: Count the time towards the current thread's frame; pool
+                threads pass False and only appear in the trace
+        """
+        if not self.enabled:
+            return _NO_STAGE
+        return _Stage(self, name, frame)
+
+    def record(self, name, start, end, frame=True, args=None):
+        """Add a timed stage (see ``stage``)"""
+        thread = threading.current_thread()
+        with self._lock:
+            if not self.enabled:
+                return
+            self.threads[thread.ident] = thread.name
+            self.events.append((name, start, end, thread.ident, args))
+            if frame:
+                part = self._open.setdefault(thread.ident, [start, {}])
+                part[1][name] = part[1].get(name, 0.0) + end - start
+
+    def finish_render(self):
+        """Hand the current thread's frame part over to the thread showing it"""
+        if not self.enabled:
+            return
+        with self._lock:
+            part = self._open.pop(threading.get_ident(), None)
+            if part is not None:
+                self._pending.append(part)
+
+    def discard_render(self):
+        """Drop the current thread's frame part (a cancelled render)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._open.pop(threading.get_ident(), None)
+
+    def end_frame(self, counters=None, rendered_elsewhere=True):
+        """
+        Close the frame just shown
+
+        Args:
+            counters: Work counters of the frame (pixels, iterations, ...)
+            rendered_elsewhere: Join the oldest part handed over by
+                ``finish_render``; False for frames rendered on this thread
+
+        Returns:
+            Frame summary dict ("frame_ms", "stages" in ms, "counters"), or
+            None when disabled
+        """
+        if not self.enabled:
+            return None
+        end = time.perf_counter()
+        ident = threading.get_ident()
+        with self._lock:
+            part = self._open.pop(ident, None)
+            stages = {}
+            start = None
+            if rendered_elsewhere and self._pending:
+                start, stages = self._pending.popleft()
+                stages = dict(stages)
+            if part is not None:
+                start = part[0] if start is None else start
+                for name, seconds in part[1].items():
+                    stages[name] = stages.get(name, 0.0) + seconds
+            if start is None:
+                return None
+            # Plain numbers, so the trace serializes
+            counters = {key: value.item() if hasattr(value, "item") else value
+                        for key, value in (counters or {}).items()}
+            self.events.append(("frame", start, end, ident, counters))
+            summary = {
+                "frame_ms": (end - start) * 1000,
+                "stages": {name: seconds * 1000 for name, seconds in stages.items()},
+                "counters": counters,
+            }
+            self.frames.append(summary)
+        return summary
+
+    def chrome_trace(self):
+        """
+        The collected events in Chrome trace event format
+
+        Load the JSON in chrome://tracing or https://ui.perfetto.dev.
+
+        Returns:
+            Dict with "traceEvents"
+        """
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+            threads = dict(self.threads)
+        trace = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                  "args": {"name": name}} for tid, name in threads.items()]
+        for name, start, end, tid, args in events:
+            event = {"name": name, "cat": "frame" if name == "frame" else "stage", "ph": "X",
+                     "ts": (start - self.epoch) * 1e6, "dur": (end - start) * 1e6,
+                     "pid": pid, "tid": tid}
+            if args:
+                event["args"] = args
+            trace.append(event)
+            if name == "frame" and args:
+                # Counter tracks plot the work per frame over time
+                trace.append({"name": "work", "ph": "C", "ts": (end - self.epoch) * 1e6,
+                              "pid": pid, "args": {key: value for key, value in args.items()
+                                                   if isinstance(value, (int, float))}})
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def save_trace(self, path):
+        """Write chrome_trace() as JSON"""
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+# The process-wide profiler used by the renderers and the viewer
+profiler = Profiler()
@@ -0,0 +1,112 @@
+"""Resumable per-pixel iteration state for changing max_iter in place"""
+
+import numpy as np
+
+from src.fractals.fractal_2d.escape_time import resume_pixels, smooth_counts
+
+
+class IterationState:
+    """Iteration counts of one frame plus the orbits that have not escaped
+
+    ``counts`` holds every pixel's escape count as far as the frame has
+    been iterated; pixels that are still bounded hold ``max_iter``, the
+    highest limit reached so far. Only those unresolved pixels carry orbit
+    state, kept as parallel arrays (flat pixel index, z, iterations done)
+    so the memory scales with the part of the frame inside the set rather
+    than with the whole frame. Pixels proven interior by a kernel shortcut
+    (cardioid test, periodicity) are dropped from the state: they stay at
+    the limit whatever it becomes.
+
+    Lowering the limit is answered from the counts alone. Raising it
+    continues the unresolved orbits from where they stopped. Frames of
+    normalized counts (float) get normalized counts for the newly escaped
+    pixels as well.
+    """
+
+    # Unresolved pixels are continued in chunks of this many on the engine
+    CHUNK_SIZE = 4096
+
+    def __init__(self, key, counts, max_iter, x, y, resume, params):
+        """
+        Args:
+            key: Identifies fractal and view the counts belong to
+            counts: 2D iteration buffer (int32 counts or float32 normalized
+                counts) computed with max_iter
+            max_iter: Limit counts were computed with
+            x: Array of x coordinates of the frame
+            y: Array of y coordinates of the frame
+            resume: Compiled resume kernel of the fractal
+            params: Float array of fractal parameters
+        """
+        self.key = key
+        self.counts = counts.copy()
+        self.max_iter = max_iter
+        self.x = x
+        self.y = y
+        self.resume = resume
+        self.params = params
+
+        # Orbit state of the pixels that were still running. The frame may
+        # have filled pixels without iterating them (subdivision), so they
+        # start over once from z0; afterwards they continue from z.
+        self.index = np.flatnonzero(self.counts >= max_iter).astype(np.int32)
+        self.z_real = np.zeros(len(self.index))
+        self.z_imag = np.zeros(len(self.index))
+        self.start = np.zeros(len(self.index), dtype=np.int32)
+
+    @property
+    def nbytes(self):
+        """Memory held by the state"""
+        return (self.counts.nbytes + self.index.nbytes + self.z_real.nbytes +
+                self.z_imag.nbytes + self.start.nbytes)
+
+    def counts_for(self, max_iter, engine=None):
+        """
+        Iteration counts of the frame for a new limit
+
+        Args:
+            max_iter: Maximum iterations
+            engine: Optional TileEngine to continue orbits on all cores
+
+        Returns:
+            (2D array of iteration counts like the initial buffer, pixels
+            iterated)
+        """
+        if max_iter <= self.max_iter:
+            return np.minimum(self.counts, max_iter), 0
+
+        iterated = len(self.index)
+        chunks = [slice(i, i + self.CHUNK_SIZE)
+                  for i in range(0, len(self.index), self.CHUNK_SIZE)]
+
+        def run(chunk):
+            # z and start are views, updated in place by the kernel
+            return resume_pixels(self.resume, self.x, self.y, self.params,
+                                 self.index[chunk], self.z_real[chunk],
+                                 self.z_imag[chunk], self.start[chunk], max_iter)
+
+        parts = list(engine.map(run, chunks) if engine is not None else map(run, chunks))
+        if parts:
+            found = np.concatenate([counts for counts, _ in parts])
+            early = np.concatenate([flags for _, flags in parts])
+        else:
+            found = np.empty(0, dtype=np.int32)
+            early = np.empty(0, dtype=np.bool_)
+
+        # Keep only the orbits that are still running
+        running = (found >= max_iter) & ~early
+
+        flat = self.counts.reshape(-1)
+        flat[flat >= self.max_iter] = max_iter
+        if flat.dtype.kind == 'f':
+            # z holds the value each orbit escaped with
+            flat[self.index] = smooth_counts(found, self.z_real, self.z_imag, max_iter)
+        else:
+            flat[self.index] = found
+        self.max_iter = max_iter
+
+        self.index = self.index[running]
+        self.z_real = self.z_real[running]
+        self.z_imag = self.z_imag[running]
+        self.start = self.start[running]
+        return self.counts.copy(), iterated
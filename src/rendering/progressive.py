@@ -0,0 +1,73 @@
+"""Progressive coarse-to-fine evaluation of a 2D view"""
+
+import numpy as np
+
+
+class ProgressiveFrame:
+    """Evaluates one view in interleaved passes, coarsest first
+
+    The first pass samples every ``start_step``-th pixel. Each further pass
+    halves the step and computes only the pixels that are new on the finer
+    grid, Adam7-style, so no pixel is ever computed twice. After every pass
+    the known samples are block-replicated into a full size preview.
+    """
+
+    DEFAULT_START_STEP = 8
+
+    def __init__(self, compute, x_coords, y_coords, start_step=DEFAULT_START_STEP):
+        """
+        Args:
+            compute: Callable (x_coords, y_coords) -> 2D block of results
+            x_coords: Full resolution x coordinates (or pixel columns)
+            y_coords: Full resolution y coordinates (or pixel rows)
+            start_step: Sample spacing of the first pass (power of two)
+        """
+        self.compute = compute
+        self.x = x_coords
+        self.y = y_coords
+        self.buffer = None
+        self.step = start_step
+        self.started = False
+
+    @property
+    def done(self):
+        """True once the full resolution pass has been computed"""
+        return self.started and self.step == 1
+
+    def next_pass(self):
+        """
+        Compute the next pass
+
+        Returns:
+            Full size preview of the frame, or None when already complete
+        """
+        if self.done:
+            return None
+
+        if not self.started:
+            step = self.step
+            block = self.compute(self.x[::step], self.y[::step])
+            self.buffer = np.empty((len(self.y), len(self.x)), dtype=block.dtype)
+            self.buffer[::step, ::step] = block
+            self.started = True
+        else:
+            coarse = self.step
+            step = coarse // 2
+            # Rows that are new on the finer grid, every fine column
+            self.buffer[step::coarse, ::step] = self.compute(
+                self.x[::step], self.y[step::coarse])
+            # Rows of the coarse grid, only the new columns
+            self.buffer[::coarse, step::coarse] = self.compute(
+                self.x[step::coarse], self.y[::coarse])
+            self.step = step
+
+        return self.preview()
+
+    def preview(self):
+        """Block-replicate the known samples to a full size array"""
+        step = self.step
+        if step == 1:
+            return self.buffer
+        height, width = self.buffer.shape
+        samples = self.buffer[::step, ::step]
+        return np.repeat(np.repeat(samples, step, axis=0), step, axis=1)[:height, :width]
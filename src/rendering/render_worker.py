@@ -0,0 +1,83 @@
+"""Background render thread with request coalescing and cancellation"""
+
+import threading
+import traceback
+
+from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from src.rendering.instrumentation import profiler
+from src.rendering.tile_engine import RenderCancelled, cancellation
+
+
+class RenderWorker(QThread):
+    """Runs render jobs off the GUI thread
+
+    Only the most recent job is kept: submitting a job drops any job still
+    waiting and cooperatively cancels the one in progress. A job is a
+    callable returning an iterable of QImages (one per progressive pass);
+    every frame is delivered through ``frame_ready``.
+    """
+
+    frame_ready = pyqtSignal(QImage)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._condition = threading.Condition()
+        self._pending = None
+        self._generation = 0
+        self._running = True
+
+    def submit(self, job):
+        """Queue a job, superseding whatever was queued or running"""
+        with self._condition:
+            self._pending = job
+            self._generation += 1
+            self._condition.notify()
+
+    def cancel(self):
+        """Drop the queued job and cancel the running one"""
+        with self._condition:
+            self._pending = None
+            self._generation += 1
+
+    def stop(self):
+        """Cancel all work and wait for the thread to finish"""
+        with self._condition:
+            self._running = False
+            self._pending = None
+            self._generation += 1
+            self._condition.notify()
+        self.wait()
+
+    def run(self):
+        """Thread loop: take the latest job and render it"""
+        while True:
+            with self._condition:
+                while self._pending is None and self._running:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                job, generation = self._pending, self._generation
+                self._pending = None
+
+            def is_cancelled(generation=generation):
+                return generation != self._generation
+
+            try:
+                with cancellation(is_cancelled):
+                    for image in job():
+                        if is_cancelled():
+                            break
+                        if image is not None:
+                            # The timings so far belong to this image
+                            profiler.finish_render()
+                            self.frame_ready.emit(image)
+            except RenderCancelled:
+                continue
+            except Exception:
+                # Keep the thread alive for the next request
+                traceback.print_exc()
+            finally:
+                # Timings of work that produced no frame (a cancelled render)
+                profiler.discard_render()
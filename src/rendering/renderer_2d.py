@@ -1,134 +1,803 @@
 """2D Fractal Renderer"""
 
+import math
+import threading
+import warnings
+from collections import Counter
+from decimal import Decimal, localcontext
+
 import numpy as np
-from PyQt6.QtGui import QImage, QColor
-from PyQt6.QtCore import QSize
-from numba import jit
+
+from src.fractals.fractal_2d.escape_time import escape_grid, escape_points, first_class
+from src.fractals.fractal_2d.perturbation import PerturbationReference
+from src.fractals.fractal_registry import FractalRegistry
+from src.rendering.antialiasing import (DEFAULT_PATTERN, DEFAULT_THRESHOLD, average_colors,
+                                        edge_pixels, sample_pattern)
+from src.rendering.instrumentation import profiler
+from src.rendering.iteration_state import IterationState
+from src.rendering.progressive import ProgressiveFrame
+from src.rendering.subdivision import subdivide
+from src.rendering.tile_cache import TileCache
+from src.rendering.tile_engine import TileEngine
+from src.rendering.tile_store import TileStore, tile_address
+from src.utils.colors import ColorPalette
 
 
 class Renderer2D:
     """Renderer for 2D fractals"""
     
-    def __init__(self, size: QSize, config):
-        self.width = size.width()
-        self.height = size.height()
+    dimension = "2D"
+    
+    # Zoom snaps to this many levels per doubling so that every view lines
+    # up with the pixel grid (and tile grid) of its zoom level
+    ZOOM_STEPS_PER_OCTAVE = 8
+    
+    # Beyond this zoom float64 coordinates run out of bits and pixels are
+    # computed by perturbation around a high-precision reference orbit.
+    # Frames taller than the reference height (posters) have finer pixels
+    # and switch proportionally earlier.
+    DEEP_ZOOM_THRESHOLD = 1e11
+    DEEP_ZOOM_REFERENCE_HEIGHT = 1080
+    
+    def __init__(self, size, config, fractal="Mandelbrot", **params):
+        # A QSize from the GUI, or (width, height) for headless renders
+        if isinstance(size, tuple):
+            self.width, self.height = size
+        else:
+            self.width = size.width()
+            self.height = size.height()
         self.config = config
+        self.engine = TileEngine(config)
+        self.palette = ColorPalette(config)
+        self.tile_cache = TileCache(config, self.engine.tile_size,
+                                    self.ZOOM_STEPS_PER_OCTAVE)
+        # Tiles persisted across sessions, behind the tile cache (or None)
+        self.tile_store = TileStore.from_config(config) if self.tile_cache.enabled else None
+        
+        # Selected fractal and the parameters it was created with, set by
+        # set_fractal
+        self.fractal_name = None
+        self.fractal_params = {}
+        # Identifies the fractal and its parameters in cached tiles
+        self.fractal_key = None
+        # Per-point kernel and its parameters
+        self.point = None
+        self.params = np.empty(0)
+        # Kernel that continues orbits when max_iter is raised
+        self.resume = None
+        rendering = config.get('rendering', {})
+        self.subdivision = rendering.get('subdivision', False)
+        # Normalized (fractional) iteration counts instead of whole counts
+        self.smooth = rendering.get('smooth_coloring', False)
+        # Spread the gradient over the frame's histogram of counts
+        self.equalize = rendering.get('histogram_equalization', False)
+        
+        # Adaptive antialiasing: only edge pixels are supersampled
+        self.antialiasing = rendering.get('antialiasing', False)
+        self.aa_pattern = sample_pattern(rendering.get('antialiasing_pattern', DEFAULT_PATTERN))
+        self.aa_threshold = rendering.get('antialiasing_threshold', DEFAULT_THRESHOLD)
+        # (frame key, sorted flat pixel indices, sample counts) of the last
+        # antialiased frame, reused when it is recolored
+        self.aa_samples = None
         
-        # View parameters
-        self.center_x = 0.0
-        self.center_y = 0.0
-        self.zoom = 1.0
+        # Work counters of the current frame
+        self.counters = Counter()
+        self._counter_lock = threading.Lock()
+        
+        # Last iteration buffer, kept for recoloring
+        self.last_result = None
+        self.last_max_iter = None
+        # View of last_result when it is exact, used to answer pans by
+        # shifting the buffer
+        self.last_view = None
+        # Orbits of the last exact frame, continued when only max_iter changes
+        self.iteration_state = None
+        
+        # Reference orbit for deep zoom (fractals with a perturbation kernel)
+        self.reference = None
+        self.deep_zoom = False
+        self.burning_ship = False
+        
+        # Frame being refined by progressive rendering
+        self.progressive = None
+        self.progressive_view = None
+        
+        # View parameters (the center is kept in decimal so that it stays
+        # exact at any zoom)
+        self.center_x = Decimal(0)
+        self.center_y = Decimal(0)
+        self.default_center = (0.0, 0.0)
         self.default_zoom = 1.0
+        self.set_fractal(fractal, **params)
+        
+    def set_fractal(self, fractal, **params):
+        """
+        Select the fractal to render and move to its default view
+        
+        The fractal's module is imported on first use through the registry.
+        Parameters not given take the fractal's defaults; the frame state
+        is kept only when name and resolved parameters are unchanged.
+        
+        Args:
+            fractal: Registry name or catalog entry of a 2D fractal
+            **params: Fractal parameters (e.g. c_real, c_imag of the Julia Set)
+        """
+        name = fractal if isinstance(fractal, str) else fractal.get("name")
+        instance = FractalRegistry.create(fractal, **params)
+        fractal_key = (name,) + tuple(float(p) for p in instance.params)
+        if fractal_key == self.fractal_key:
+            return
+        self.fractal_name = name
+        self.fractal_params = params
+        self.point = first_class(instance.point)
+        self.resume = first_class(instance.resume)
+        self.params = instance.params
+        self.fractal_key = fractal_key
+        self.deep_zoom = instance.deep_zoom
+        self.burning_ship = instance.burning_ship
+        
+        # Frames of the previous fractal cannot be reused
+        self.progressive = None
+        self.last_result = None
+        self.last_view = None
+        self.iteration_state = None
+        self.reference = None
+        self.aa_samples = None
+        
+        self.default_center = instance.default_center
+        self.default_zoom = instance.default_zoom
+        self.reset_view()
         
     def render(self, fractal_info, max_iterations=256):
         """Render a 2D fractal"""
-        # Get fractal name from info
-        if isinstance(fractal_info, dict) and 'description' in fractal_info:
-            # It's a fractal_info dict
-            fractal_name = "Unknown"
-        else:
-            fractal_name = "Mandelbrot"  # default
+        # Switching fractals resets the parameters; the same fractal keeps them
+        name = fractal_info if isinstance(fractal_info, str) else fractal_info.get("name")
+        if name != self.fractal_name:
+            self.set_fractal(fractal_info)
+        
+        # A full render supersedes any frame still being refined
+        self.progressive = None
             
         # Create image array
-        image_array = self.render_mandelbrot(max_iterations)
+        image_array = self.render_array(max_iterations)
         
         # Convert to QImage
         return self.array_to_qimage(image_array)
     
+    def render_array(self, max_iter):
+        """Render the current view to an RGB array"""
+        result = self.compute_view(max_iter)
+        
+        # Apply colormap (and antialiasing)
+        return self.colorize(result, max_iter)
+    
     def render_mandelbrot(self, max_iter):
-        """Render Mandelbrot set"""
-        # Calculate bounds
-        aspect = self.width / self.height
-        height_range = 4.0 / self.zoom
-        width_range = height_range * aspect
+        """Deprecated: use render_array() (renders the selected fractal)"""
+        warnings.warn("Renderer2D.render_mandelbrot is deprecated; use render_array()",
+                      DeprecationWarning, stacklevel=2)
+        return self.render_array(max_iter)
+    
+    @staticmethod
+    def mandelbrot_set(x, y, max_iter):
+        """Deprecated: use Mandelbrot.calculate() (this returns float64 counts)"""
+        warnings.warn("Renderer2D.mandelbrot_set is deprecated; use Mandelbrot.calculate()",
+                      DeprecationWarning, stacklevel=2)
+        from src.fractals.fractal_2d.mandelbrot import mandelbrot_point
+        x = np.ascontiguousarray(x, dtype=np.float64)
+        y = np.ascontiguousarray(y, dtype=np.float64)
+        return escape_grid(mandelbrot_point, x, y, np.empty(0), max_iter)[0].astype(np.float64)
+    
+    def current_view(self):
+        """Snapshot of the view as (origin_x, origin_y, zoom_index)
         
-        x_min = self.center_x - width_range / 2
-        x_max = self.center_x + width_range / 2
-        y_min = self.center_y - height_range / 2
-        y_max = self.center_y + height_range / 2
+        The origin is the grid index of the top-left pixel; pixel (i, j)
+        of the view samples grid point (origin_x + j, origin_y + i).
+        """
+        zoom_index = self.zoom_index
+        pixel = Decimal(self.pixel_size(zoom_index))
+        with localcontext() as ctx:
+            ctx.prec = self.decimal_digits(zoom_index)
+            origin_x = (self.center_x / pixel - Decimal(self.width - 1) / 2).to_integral_value()
+            origin_y = (self.center_y / pixel - Decimal(self.height - 1) / 2).to_integral_value()
+        return (int(origin_x), int(origin_y), zoom_index)
+    
+    def pixel_size(self, zoom_index):
+        """Spacing of the (square) pixel grid at a zoom index"""
+        zoom_level = 2.0 ** (zoom_index / self.ZOOM_STEPS_PER_OCTAVE)
+        return 4.0 / zoom_level / self.height
+    
+    def decimal_digits(self, zoom_index):
+        """Decimal digits needed to address single pixels at a zoom index"""
+        zoom_level = 2.0 ** (zoom_index / self.ZOOM_STEPS_PER_OCTAVE)
+        return int(math.log10(max(zoom_level, 1.0) * self.height)) + 20
+    
+    def is_deep(self, zoom_index):
+        """True if a zoom index needs perturbation rendering"""
+        scale = max(self.height, self.DEEP_ZOOM_REFERENCE_HEIGHT) / self.DEEP_ZOOM_REFERENCE_HEIGHT
+        zoom_level = 2.0 ** (zoom_index / self.ZOOM_STEPS_PER_OCTAVE)
+        return self.deep_zoom and zoom_level * scale > self.DEEP_ZOOM_THRESHOLD
+    
+    def view_coordinates(self, view=None):
+        """Return the x and y coordinate arrays of a view (default: current)
         
-        # Generate coordinate arrays
-        x = np.linspace(x_min, x_max, self.width)
-        y = np.linspace(y_min, y_max, self.height)
+        Only meaningful below DEEP_ZOOM_THRESHOLD.
+        """
+        origin_x, origin_y, zoom_index = view or self.current_view()
+        pixel = self.pixel_size(zoom_index)
         
-        # Calculate fractal
-        result = self.mandelbrot_set(x, y, max_iter)
+        # Grid index times spacing, so the same grid point always gets the
+        # same coordinate no matter which view or tile it belongs to
+        x = np.arange(origin_x, origin_x + self.width) * pixel
+        y = np.arange(origin_y, origin_y + self.height) * pixel
+        return x, y
+    
+    @property
+    def kernel(self):
+        """Kernel handed to the drivers: resume kernels give normalized counts"""
+        return self.resume if self.smooth else self.point
+    
+    def compute_block(self, x, y, max_iter):
+        """Compute iteration counts for the grid spanned by x and y"""
+        result, iterated, early = self.engine.compute_points(
+            self.kernel, x, y, self.params, max_iter, self.subdivision)
+        self.count(pixels=result.size, iterated_pixels=iterated, early_exits=early)
+        return result
+    
+    def compute_single(self, x, y, max_iter):
+        """Like compute_block, but on the calling thread (for pool tasks)"""
+        driver = subdivide if self.subdivision else escape_grid
+        result, iterated, early = driver(self.kernel, x, y, self.params, max_iter)
+        self.count(pixels=result.size, iterated_pixels=iterated, early_exits=early)
+        return result
+    
+    def count(self, **amounts):
+        """Add to the work counters of the current frame (thread-safe)"""
+        with self._counter_lock:
+            self.counters.update(amounts)
+    
+    def reset_counters(self):
+        """Start counting a new frame"""
+        with self._counter_lock:
+            self.counters = Counter()
+            
+    def render_stats(self):
+        """Work counters of the current frame plus derived ratios"""
+        with self._counter_lock:
+            stats = dict(self.counters)
+        stats['supersampled_fraction'] = (stats.get('supersampled_pixels', 0) /
+                                          (self.width * self.height))
+        return stats
+    
+    def compute_pixels(self, view, cols, rows, max_iter, parallel=True):
+        """Compute the grid points (origin + cols) x (origin + rows) of a view
         
-        # Apply colormap
-        return self.apply_colormap(result, max_iter)
+        Args:
+            view: (origin_x, origin_y, zoom_index)
+            cols: Array of column indices relative to origin_x
+            rows: Array of row indices relative to origin_y
+            max_iter: Maximum iterations
+            parallel: Spread the work over the tile engine
+        """
+        origin_x, origin_y, zoom_index = view
+        if self.is_deep(zoom_index):
+            reference = self.deep_reference(view, max_iter)
+            engine = self.engine if parallel else None
+            result = reference.calculate(origin_x, origin_y, cols, rows, engine)
+            # Perturbation yields whole counts only
+            if self.smooth:
+                result = result.astype(np.float32)
+        else:
+            pixel = self.pixel_size(zoom_index)
+            x = (origin_x + cols) * pixel
+            y = (origin_y + rows) * pixel
+            if parallel:
+                result = self.compute_block(x, y, max_iter)
+            else:
+                result = self.compute_single(x, y, max_iter)
+        if profiler.enabled:
+            self.count_iterations(result)
+        return result
     
-    @staticmethod
-    @jit(nopython=True)
-    def mandelbrot_set(x, y, max_iter):
-        """Calculate Mandelbrot set using Numba for speed"""
-        result = np.zeros((len(y), len(x)))
-        
-        for i in range(len(y)):
-            for j in range(len(x)):
-                c = complex(x[j], y[i])
-                z = 0
-                
-                for n in range(max_iter):
-                    if abs(z) > 2:
-                        result[i, j] = n
-                        break
-                    z = z*z + c
+    def count_iterations(self, result):
+        """Add the iterations an iteration buffer represents to the counters
+        
+        Pixels filled by subdivision or answered by an interior shortcut
+        count as if they had been iterated. Only done while the profiler
+        is on, since it costs a pass over the buffer.
+        """
+        self.count(iterations=int(result.sum(dtype=np.float64)))
+    
+    def deep_reference(self, view, max_iter):
+        """Reference orbit for a deep view, reused while the view stays near it"""
+        origin_x, origin_y, zoom_index = view
+        center_x = origin_x + self.width // 2
+        center_y = origin_y + self.height // 2
+        reference = self.reference
+        if reference is None or not reference.covers(center_x, center_y, zoom_index, max_iter,
+                                                     max(self.width, self.height)):
+            reference = PerturbationReference(
+                center_x, center_y, zoom_index, self.pixel_size(zoom_index), max_iter,
+                self.burning_ship, self.decimal_digits(zoom_index))
+            self.reference = reference
+        return reference
+    
+    def compute_view(self, max_iter):
+        """Compute the iteration buffer of the current view
+        
+        If only max_iter changed since the last exact frame, the frame is
+        answered from its iteration state. With the tile cache enabled the
+        view is assembled from cached tiles and only missing tiles are
+        computed. Otherwise, if the view has only been panned since the
+        last exact frame, that frame is shifted and only the exposed strips
+        are computed.
+        """
+        view = self.current_view()
+        self.reset_counters()
+        
+        with profiler.stage("kernel"):
+            if self.can_resume(view, max_iter):
+                result = self.resume_view(view, max_iter)
+            elif self.tile_cache.enabled:
+                result = self.compute_tiled(view, max_iter)
+            else:
+                offset = self.pan_offset(view, max_iter)
+                if offset is None:
+                    result = self.compute_pixels(view, np.arange(self.width),
+                                                 np.arange(self.height), max_iter)
                 else:
-                    result[i, j] = max_iter
-                    
+                    result = self.shift_buffer(self.last_result, offset, view, max_iter)
+            
+        state = self.iteration_state
+        if state is not None and state.key != (self.fractal_key, view):
+            self.iteration_state = None
+            
+        self.last_result = result
+        self.last_max_iter = max_iter
+        self.last_view = view
         return result
     
-    def apply_colormap(self, data, max_iter):
-        """Apply color mapping to fractal data"""
-        # Normalize data
-        normalized = data / max_iter
-        
-        # Create RGB image
-        height, width = data.shape
-        image = np.zeros((height, width, 3), dtype=np.uint8)
-        
-        # Donut-themed color scheme
-        for i in range(height):
-            for j in range(width):
-                t = normalized[i, j]
-                
-                if t >= 1.0:  # In set
-                    image[i, j] = [0, 0, 0]
-                else:
-                    # Pink to orange gradient
-                    r = int(255 * (0.8 + 0.2 * np.sin(t * 10)))
-                    g = int(182 * (0.7 + 0.3 * np.cos(t * 8)))
-                    b = int(193 * (0.5 + 0.5 * np.sin(t * 6)))
-                    image[i, j] = [r, g, b]
-                    
+    def can_resume(self, view, max_iter):
+        """True if view is the last exact frame with only max_iter changed"""
+        return (self.last_result is not None and view == self.last_view and
+                max_iter != self.last_max_iter and not self.is_deep(view[2]))
+    
+    def resume_view(self, view, max_iter):
+        """Recompute the last exact frame for a new max_iter
+        
+        Lowering the limit clips the stored counts; raising it continues
+        only the pixels that had not escaped yet.
+        """
+        key = (self.fractal_key, view)
+        state = self.iteration_state
+        if state is None or state.key != key:
+            x, y = self.view_coordinates(view)
+            state = IterationState(key, self.last_result, self.last_max_iter,
+                                   x, y, self.resume, self.params)
+            self.iteration_state = state
+        result, iterated = state.counts_for(max_iter, self.engine)
+        self.count(pixels=result.size, iterated_pixels=iterated)
+        if profiler.enabled:
+            self.count_iterations(result)
+        self.store_tiles(view, result, max_iter)
+        return result
+    
+    def tile_keys(self, view, max_iter):
+        """Cache keys of all tiles overlapping a view"""
+        origin_x, origin_y, zoom_index = view
+        size = self.tile_cache.tile_size
+        return [(self.fractal_key, max_iter, zoom_index, tx, ty)
+                for ty in range(origin_y // size, (origin_y + self.height - 1) // size + 1)
+                for tx in range(origin_x // size, (origin_x + self.width - 1) // size + 1)]
+    
+    def store_addresses(self, keys):
+        """Addresses in the tile store of tile cache keys
+        
+        Besides the cache key, a stored tile depends on the pixel spacing
+        (which follows the frame height), on perturbation being used, on
+        the kind of counts and on subdivision.
+        """
+        size = self.tile_cache.tile_size
+        return [tile_address(fractal_key, max_iter, self.pixel_size(zoom_index),
+                             self.is_deep(zoom_index), self.smooth, self.subdivision,
+                             size, tx, ty)
+                for fractal_key, max_iter, zoom_index, tx, ty in keys]
+    
+    def load_stored(self, keys):
+        """Move the tiles of keys found in the tile store into the tile cache
+        
+        Returns:
+            Dict of key -> tile for the tiles found
+        """
+        if self.tile_store is None or not keys:
+            return {}
+        addresses = self.store_addresses(keys)
+        stored = self.tile_store.get_many(addresses)
+        found = {key: stored[address] for key, address in zip(keys, addresses)
+                 if address in stored}
+        for key, tile in found.items():
+            self.tile_cache.put(key, tile)
+        self.count(stored_tiles=len(found))
+        return found
+    
+    def compute_tiled(self, view, max_iter):
+        """Assemble a view from cached tiles, computing the missing ones in parallel
+        
+        Tiles missing from the tile cache are looked up in the tile store
+        before they are computed, and computed tiles are written to it.
+        """
+        origin_x, origin_y, zoom_index = view
+        size = self.tile_cache.tile_size
+        
+        keys = self.tile_keys(view, max_iter)
+        tiles = {key: self.tile_cache.get(key) for key in keys}
+        missing = [key for key, tile in tiles.items() if tile is None]
+        self.count(cached_tiles=len(keys) - len(missing))
+        if missing:
+            tiles.update(self.load_stored(missing))
+            missing = [key for key in missing if tiles[key] is None]
+        if missing and self.is_deep(zoom_index):
+            # Set up the reference orbit once, before the pool threads need it
+            self.deep_reference(view, max_iter)
+        
+        def compute(key):
+            tile_view = (key[3] * size, key[4] * size, zoom_index)
+            indices = np.arange(size)
+            tile = self.compute_pixels(tile_view, indices, indices, max_iter, parallel=False)
+            self.tile_cache.put(key, tile)
+            return tile
+        
+        computed = self.engine.map(compute, missing)
+        for key, tile in zip(missing, computed):
+            tiles[key] = tile
+        if self.tile_store is not None and missing:
+            self.tile_store.put_many(zip(self.store_addresses(missing), computed))
+            
+        # Paste the tiles into their bounding box and crop out the view
+        tx0, ty0 = keys[0][3], keys[0][4]
+        tx1, ty1 = keys[-1][3], keys[-1][4]
+        dtype = tiles[keys[0]].dtype
+        span = np.empty(((ty1 - ty0 + 1) * size, (tx1 - tx0 + 1) * size), dtype=dtype)
+        for key, tile in tiles.items():
+            row, col = (key[4] - ty0) * size, (key[3] - tx0) * size
+            span[row:row + size, col:col + size] = tile
+            
+        top, left = origin_y - ty0 * size, origin_x - tx0 * size
+        return span[top:top + self.height, left:left + self.width].copy()
+    
+    def inner_tiles(self, view, max_iter):
+        """Cache keys and frame offsets (top, left) of the tiles lying fully inside a view"""
+        origin_x, origin_y = view[0], view[1]
+        size = self.tile_cache.tile_size
+        inner = []
+        for key in self.tile_keys(view, max_iter):
+            top = key[4] * size - origin_y
+            left = key[3] * size - origin_x
+            if top >= 0 and left >= 0 and top + size <= self.height and left + size <= self.width:
+                inner.append((key, top, left))
+        return inner
+    
+    def store_tiles(self, view, buffer, max_iter):
+        """Put every tile lying fully inside an exact frame into the cache"""
+        if not self.tile_cache.enabled:
+            return
+        size = self.tile_cache.tile_size
+        new = []
+        for key, top, left in self.inner_tiles(view, max_iter):
+            if key not in self.tile_cache:
+                tile = buffer[top:top + size, left:left + size].copy()
+                self.tile_cache.put(key, tile)
+                new.append((key, tile))
+        if self.tile_store is not None and new:
+            keys, tiles = zip(*new)
+            self.tile_store.put_many(zip(self.store_addresses(keys), tiles))
+    
+    def is_cached(self, view, max_iter):
+        """True if the cache or the tile store hold every tile lying fully inside a view
+        
+        Such a view is assembled from tiles, computing at most the partial
+        tiles along its edges, which exact frames do not store.
+        """
+        if not self.tile_cache.enabled:
+            return False
+        missing = [key for key, _, _ in self.inner_tiles(view, max_iter)
+                   if key not in self.tile_cache]
+        return not missing or (self.tile_store is not None and
+                               self.tile_store.contains_all(self.store_addresses(missing)))
+    
+    def pan_offset(self, view, max_iter):
+        """Whole-pixel offset (dx, dy) of view from the last exact frame
+        
+        Returns:
+            The offset, or None if the last frame cannot be reused
+        """
+        if self.last_view is None or self.last_result is None:
+            return None
+        if max_iter != self.last_max_iter or view[2] != self.last_view[2]:
+            return None
+            
+        offset = (self.last_view[0] - view[0], self.last_view[1] - view[1])
+        if abs(offset[0]) >= self.width or abs(offset[1]) >= self.height:
+            return None
+        return offset
+    
+    def shift_buffer(self, previous, offset, view, max_iter):
+        """Translate previous by offset and compute the exposed strips
+        
+        Args:
+            previous: Iteration buffer of the last frame
+            offset: Whole-pixel shift (dx, dy); new[i, j] = previous[i - dy, j - dx]
+            view: The new view
+            max_iter: Maximum iterations
+        """
+        dx, dy = offset
+        height, width = previous.shape
+        result = np.empty_like(previous)
+        cols_all = np.arange(width)
+        rows_all = np.arange(height)
+        
+        # Rows and columns that are still on screen
+        rows_new = slice(max(dy, 0), height + min(dy, 0))
+        rows_old = slice(max(-dy, 0), height - max(dy, 0))
+        cols_new = slice(max(dx, 0), width + min(dx, 0))
+        cols_old = slice(max(-dx, 0), width - max(dx, 0))
+        result[rows_new, cols_new] = previous[rows_old, cols_old]
+        
+        # Exposed full-width row strip
+        if dy:
+            rows = slice(0, dy) if dy > 0 else slice(height + dy, height)
+            result[rows, :] = self.compute_pixels(view, cols_all, rows_all[rows], max_iter)
+        # Exposed column strip beside the reused rows
+        if dx:
+            cols = slice(0, dx) if dx > 0 else slice(width + dx, width)
+            result[rows_new, cols] = self.compute_pixels(view, cols_all[cols],
+                                                         rows_all[rows_new], max_iter)
+            
+        return result
+    
+    def begin_progressive(self, max_iter,
+                          start_step=ProgressiveFrame.DEFAULT_START_STEP):
+        """Start a coarse-to-fine render of the current view
+        
+        A view that was only panned, only had max_iter changed, or is fully
+        cached, is finished at once.
+        
+        Returns:
+            QImage of the coarse first pass
+        """
+        view = self.current_view()
+        self.reset_counters()
+        if (self.pan_offset(view, max_iter) is not None or self.can_resume(view, max_iter) or
+                self.is_cached(view, max_iter)):
+            self.progressive = None
+            result = self.compute_view(max_iter)
+            return self.array_to_qimage(self.colorize(result, max_iter))
+            
+        self.progressive = ProgressiveFrame(
+            lambda cols, rows: self.compute_pixels(view, cols, rows, max_iter),
+            np.arange(self.width), np.arange(self.height), start_step)
+        self.progressive_view = view
+        self.last_max_iter = max_iter
+        # The buffer is a preview until the last pass is in
+        self.last_view = None
+        return self.refine()
+    
+    def refine(self):
+        """Compute the next progressive pass
+        
+        Returns:
+            QImage of the refined frame, or None when nothing is left to refine
+        """
+        if self.progressive is None:
+            return None
+        with profiler.stage("kernel"):
+            preview = self.progressive.next_pass()
+        if self.progressive.done:
+            self.progressive = None
+            self.last_view = self.progressive_view
+            self.store_tiles(self.last_view, preview, self.last_max_iter)
+        if preview is None:
+            return None
+        self.last_result = preview
+        return self.array_to_qimage(self.colorize(preview, self.last_max_iter))
+    
+    def apply_colormap(self, data, max_iter, equalization=None):
+        """Apply color mapping to fractal data
+        
+        Args:
+            data: Iteration buffer
+            max_iter: Maximum iterations
+            equalization: Histogram equalization to use (default: that of
+                data when histogram equalization is on)
+        """
+        with profiler.stage("apply_colormap"):
+            if equalization is None and self.equalize:
+                equalization = self.palette.histogram(data, max_iter)
+            return self.palette.apply(data, max_iter, equalization=equalization)
+    
+    def colorize(self, result, max_iter, view=None):
+        """Color an exact frame, supersampling its edge pixels if antialiasing is on
+        
+        Pixels whose color differs strongly from a neighbour are evaluated
+        at every point of the sample pattern and get the average color.
+        Samples are kept per frame, so recoloring computes only pixels that
+        become edges under the new scheme.
+        
+        Args:
+            result: Iteration buffer of view
+            max_iter: Maximum iterations
+            view: View of result (default: the last exact frame; previews
+                are colored without antialiasing)
+        """
+        equalization = None
+        if self.equalize:
+            with profiler.stage("histogram"):
+                equalization = self.palette.histogram(result, max_iter)
+        image = self.apply_colormap(result, max_iter, equalization)
+        view = view or self.last_view
+        if not self.antialiasing or view is None or self.is_deep(view[2]):
+            return image
+        with profiler.stage("antialiasing"):
+            return self.antialias(image, result, max_iter, view, equalization)
+        
+    def antialias(self, image, result, max_iter, view, equalization):
+        """Replace the colors of the edge pixels of image by the average of their samples"""
+        edges = edge_pixels(image, self.aa_threshold)
+        key = (self.fractal_key, view, max_iter)
+        if self.aa_samples is not None and self.aa_samples[0] == key:
+            _, known, samples = self.aa_samples
+        else:
+            known, samples = self.load_samples(view, max_iter)
+            if known is None:
+                known = np.empty(0, dtype=np.intp)
+                samples = np.empty((0, len(self.aa_pattern)), dtype=result.dtype)
+            self.aa_samples = (key, known, samples)
+        missing = np.setdiff1d(edges, known, assume_unique=True)
+        if len(missing):
+            known = np.concatenate([known, missing])
+            samples = np.concatenate([samples, self.compute_samples(view, missing, max_iter)])
+            order = np.argsort(known)
+            known, samples = known[order], samples[order]
+            self.aa_samples = (key, known, samples)
+            if self.tile_store is not None:
+                self.tile_store.put_many(zip(self.samples_addresses(view, max_iter),
+                                             (known[None, :], samples)))
+            
+        position = np.searchsorted(known, edges)
+        image.reshape(-1, 3)[edges] = average_colors(self.palette, samples[position], max_iter,
+                                                     equalization)
+        with self._counter_lock:
+            self.counters['supersampled_pixels'] = len(edges)
+            self.counters['supersamples'] += len(missing) * len(self.aa_pattern)
         return image
+        
+    def samples_addresses(self, view, max_iter):
+        """Addresses in the tile store of a frame's supersampled pixel indices and samples"""
+        frame = (self.fractal_key, max_iter, view, self.pixel_size(view[2]), self.smooth,
+                 self.width, self.aa_pattern.tolist())
+        return tile_address('aa-pixels', *frame), tile_address('aa-samples', *frame)
     
-    def array_to_qimage(self, array):
-        """Convert numpy array to QImage"""
-        height, width, channels = array.shape
-        bytes_per_line = channels * width
+    def load_samples(self, view, max_iter):
+        """Antialiasing samples of a frame from the tile store
+        
+        Returns:
+            (sorted flat pixel indices, samples), or (None, None)
+        """
+        if self.tile_store is None:
+            return None, None
+        addresses = self.samples_addresses(view, max_iter)
+        stored = self.tile_store.get_many(list(addresses))
+        if len(stored) < 2:
+            return None, None
+        return stored[addresses[0]][0], stored[addresses[1]]
+    
+    def compute_samples(self, view, index, max_iter):
+        """Evaluate the sample pattern of the given pixels of a view
+        
+        Args:
+            view: (origin_x, origin_y, zoom_index)
+            index: Flat pixel indices (row * width + column)
+            max_iter: Maximum iterations
+            
+        Returns:
+            (pixels, samples per pixel) int32 array of iteration counts
+        """
+        origin_x, origin_y, zoom_index = view
+        pixel = self.pixel_size(zoom_index)
+        rows, cols = np.divmod(index, self.width)
+        offsets = self.aa_pattern
+        x = (((origin_x + cols)[:, None] + offsets[:, 0]) * pixel).ravel()
+        y = (((origin_y + rows)[:, None] + offsets[:, 1]) * pixel).ravel()
+        
+        chunk = self.engine.tile_size * self.engine.tile_size
+        chunks = [slice(i, i + chunk) for i in range(0, len(x), chunk)]
+        parts = self.engine.map(
+            lambda part: escape_points(self.kernel, x[part], y[part], self.params, max_iter),
+            chunks)
+        counts = np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+        return counts.reshape(len(index), len(offsets))
         
-        # Ensure array is contiguous
-        array = np.ascontiguousarray(array)
+    def set_color_scheme(self, name):
+        """Switch the active color scheme"""
+        self.palette.set_scheme(name)
         
-        image = QImage(array.data, width, height, bytes_per_line, 
-                      QImage.Format.Format_RGB888)
+    def set_histogram_equalization(self, enabled):
+        """Turn histogram-equalized coloring on or off (takes effect on recolor)"""
+        self.equalize = enabled
         
-        # Copy the image data
-        return image.copy()
+    def set_smooth_coloring(self, enabled):
+        """Switch between whole and normalized iteration counts
+        
+        The buffers change type, so frames and cached tiles are dropped.
+        """
+        if enabled == self.smooth:
+            return
+        self.smooth = enabled
+        self.progressive = None
+        self.last_result = None
+        self.last_view = None
+        self.iteration_state = None
+        self.aa_samples = None
+        self.tile_cache.clear()
+        
+    def recolor(self):
+        """Re-map the last iteration buffer with the active scheme
+        
+        Returns:
+            QImage, or None if nothing has been rendered yet
+        """
+        if self.last_result is None:
+            return None
+        image_array = self.colorize(self.last_result, self.last_max_iter)
+        return self.array_to_qimage(image_array)
+    
+    def array_to_qimage(self, array):
+        """Convert numpy array to QImage"""
+        # Imported here so that headless renders do not need Qt
+        from PyQt6.QtGui import QImage
+        
+        with profiler.stage("array_to_qimage"):
+            height, width, channels = array.shape
+            bytes_per_line = channels * width
+            
+            # Ensure array is contiguous
+            array = np.ascontiguousarray(array)
+            
+            image = QImage(array.data, width, height, bytes_per_line, 
+                          QImage.Format.Format_RGB888)
+            
+            # Copy the image data
+            return image.copy()
     
     def pan(self, dx, dy):
-        """Pan the view"""
-        scale = 4.0 / self.zoom / self.width
-        self.center_x -= dx * scale
-        self.center_y -= dy * scale
+        """Pan the view by whole pixels"""
+        pixel = Decimal(self.pixel_size(self.zoom_index))
+        with localcontext() as ctx:
+            ctx.prec = self.decimal_digits(self.zoom_index)
+            self.center_x -= int(round(dx)) * pixel
+            self.center_y -= int(round(dy)) * pixel
         
     def zoom(self, factor):
-        """Zoom in/out"""
-        self.zoom *= factor
+        """Zoom in/out by at least one step of the zoom ladder"""
+        steps = int(round(math.log2(factor) * self.ZOOM_STEPS_PER_OCTAVE))
+        if steps == 0 and factor != 1:
+            steps = 1 if factor > 1 else -1
+        self.set_zoom_index(self.zoom_index + steps)
+        
+    def set_center(self, x, y):
+        """Move the view center; x and y may be floats, strings or Decimals"""
+        self.center_x = Decimal(str(x)) if isinstance(x, float) else Decimal(x)
+        self.center_y = Decimal(str(y)) if isinstance(y, float) else Decimal(y)
+        
+    def set_zoom(self, zoom_level):
+        """Set the zoom, snapped to the nearest step of the zoom ladder"""
+        self.set_zoom_index(int(round(math.log2(zoom_level) * self.ZOOM_STEPS_PER_OCTAVE)))
+        
+    def set_zoom_index(self, zoom_index):
+        """Set the zoom as a step on the zoom ladder"""
+        self.zoom_index = zoom_index
+        self.zoom_level = 2.0 ** (zoom_index / self.ZOOM_STEPS_PER_OCTAVE)
         
     def reset_view(self):
         """Reset to default view"""
-        self.center_x = 0.0
-        self.center_y = 0.0
-        self.zoom = self.default_zoom
+        self.set_center(*self.default_center)
+        self.set_zoom(self.default_zoom)
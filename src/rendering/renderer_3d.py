@@ -1,18 +1,38 @@
 """3D Fractal Renderer using ray marching"""
 
+import warnings
+
 import numpy as np
 from PyQt6.QtGui import QImage
 from PyQt6.QtCore import QSize
-from numba import jit
+
+from src.fractals.fractal_2d.escape_time import first_class
+from src.fractals.fractal_3d.ray_march import LIGHT_DIRECTION, march, march_tile, normal
+from src.fractals.fractal_registry import FractalRegistry
+from src.rendering.instrumentation import profiler
+from src.rendering.tile_engine import TileEngine
 
 
 class Renderer3D:
     """Renderer for 3D fractals using ray marching"""
     
-    def __init__(self, size: QSize, config):
+    dimension = "3D"
+    
+    # Previews shown while the camera moves march every PREVIEW_STEP-th pixel
+    PREVIEW_STEP = 4
+    
+    def __init__(self, size: QSize, config, fractal="Mandelbulb"):
         self.width = size.width()
         self.height = size.height()
         self.config = config
+        self.engine = TileEngine(config)
+        
+        # Selected fractal, its distance estimator and the compiled
+        # distance kernel the ray marcher calls
+        self.fractal_name = None
+        self.distance_estimator = None
+        self.distance = None
+        self.set_fractal(fractal)
         
         # Camera parameters
         self.camera_pos = np.array([0.0, 0.0, -3.0])
@@ -23,168 +43,127 @@ class Renderer3D:
         self.rotation_x = 0.0
         self.rotation_y = 0.0
         
+    def set_fractal(self, fractal):
+        """
+        Select the fractal to render
+        
+        Args:
+            fractal: Registry name or catalog entry of a 3D fractal
+        """
+        name = fractal if isinstance(fractal, str) else fractal.get("name")
+        if name == self.fractal_name:
+            return
+        instance = FractalRegistry.create(fractal)
+        self.fractal_name = name
+        self.distance_estimator = instance.distance_estimator
+        self.distance = first_class(instance.distance)
+        
     def render(self, fractal_info, max_iterations=8):
         """Render a 3D fractal"""
-        # Render Mandelbulb (example)
-        image_array = self.render_mandelbulb(max_iterations)
+        self.set_fractal(fractal_info)
+        with profiler.stage("kernel"):
+            image_array = self.render_scene(max_iterations)
         
         # Convert to QImage
         return self.array_to_qimage(image_array)
     
+    def render_preview(self, max_iterations=8):
+        """Render a coarse frame for interaction: 1/PREVIEW_STEP of the resolution, upscaled"""
+        step = self.PREVIEW_STEP
+        width = -(-self.width // step)
+        height = -(-self.height // step)
+        with profiler.stage("kernel"):
+            coarse = self.march_frame(max_iterations, width, height)
+        image_array = np.repeat(np.repeat(coarse, step, axis=0), step, axis=1)
+        return self.array_to_qimage(image_array[:self.height, :self.width])
+    
+    def render_scene(self, power=8):
+        """Ray march the selected fractal"""
+        return self.march_frame(power, self.width, self.height)
+    
     def render_mandelbulb(self, power=8):
-        """Render Mandelbulb fractal"""
-        # Create image array
-        image = np.zeros((self.height, self.width, 3), dtype=np.uint8)
-        
-        # Camera setup
-        fov = 45.0
-        aspect = self.width / self.height
-        
-        for y in range(self.height):
-            for x in range(self.width):
-                # Calculate ray direction
-                px = (2.0 * x / self.width - 1.0) * aspect * np.tan(np.radians(fov / 2))
-                py = (1.0 - 2.0 * y / self.height) * np.tan(np.radians(fov / 2))
-                
-                # Apply rotation
-                ray_dir = self.rotate_vector(
-                    np.array([px, py, 1.0]), 
-                    self.rotation_x, 
-                    self.rotation_y
-                )
-                ray_dir = ray_dir / np.linalg.norm(ray_dir)
-                
-                # Ray march
-                color = self.ray_march(self.camera_pos, ray_dir, power)
-                
-                # Donut-themed coloring
-                image[y, x] = [
-                    int(255 * color * 0.9),  # Pink tint
-                    int(182 * color * 0.8),
-                    int(193 * color * 0.7)
-                ]
-                
-        return image
+        """Deprecated: use render_scene() (renders the selected fractal)"""
+        warnings.warn("Renderer3D.render_mandelbulb is deprecated; use render_scene()",
+                      DeprecationWarning, stacklevel=2)
+        return self.render_scene(power)
     
     @staticmethod
     def rotate_vector(v, angle_x, angle_y):
-        """Rotate vector by angles"""
-        # Rotation around Y axis
-        cos_y = np.cos(angle_y)
-        sin_y = np.sin(angle_y)
-        v = np.array([
-            v[0] * cos_y - v[2] * sin_y,
-            v[1],
-            v[0] * sin_y + v[2] * cos_y
-        ])
-        
-        # Rotation around X axis
-        cos_x = np.cos(angle_x)
-        sin_x = np.sin(angle_x)
-        v = np.array([
-            v[0],
-            v[1] * cos_x - v[2] * sin_x,
-            v[1] * sin_x + v[2] * cos_x
-        ])
-        
-        return v
+        """Deprecated: rotate v about y, then about x (march_tile rotates rays itself)"""
+        warnings.warn("Renderer3D.rotate_vector is deprecated", DeprecationWarning, stacklevel=2)
+        cos_y, sin_y = np.cos(angle_y), np.sin(angle_y)
+        cos_x, sin_x = np.cos(angle_x), np.sin(angle_x)
+        x = v[0] * cos_y - v[2] * sin_y
+        z = v[0] * sin_y + v[2] * cos_y
+        return np.array([x, v[1] * cos_x - z * sin_x, v[1] * sin_x + z * cos_x])
     
     def ray_march(self, origin, direction, power):
-        """Ray marching algorithm"""
-        max_steps = 100
-        max_dist = 10.0
-        min_dist = 0.001
-        
-        total_dist = 0.0
-        
-        for step in range(max_steps):
-            pos = origin + direction * total_dist
-            
-            # Distance estimation to Mandelbulb
-            dist = self.mandelbulb_de(pos, power)
-            
-            if dist < min_dist:
-                # Hit! Calculate shading
-                normal = self.estimate_normal(pos, power)
-                light_dir = np.array([1.0, 1.0, -1.0])
-                light_dir = light_dir / np.linalg.norm(light_dir)
-                
-                # Simple diffuse lighting
-                diffuse = max(0.0, np.dot(normal, light_dir))
-                ambient = 0.2
-                
-                return ambient + diffuse * 0.8
-            
-            total_dist += dist
-            
-            if total_dist > max_dist:
-                break
-        
-        # Miss - return background
-        return 0.0
+        """Deprecated: brightness of one ray of the selected fractal (ray_march.march)"""
+        warnings.warn("Renderer3D.ray_march is deprecated; use ray_march.march",
+                      DeprecationWarning, stacklevel=2)
+        light = np.array(LIGHT_DIRECTION)
+        light = light / np.linalg.norm(light)
+        return march(self.distance, *(float(c) for c in origin),
+                     *(float(c) for c in direction), float(power), *light)
     
     @staticmethod
     def mandelbulb_de(pos, power=8, max_iter=10):
-        """Distance estimator for Mandelbulb"""
-        z = pos.copy()
-        dr = 1.0
-        r = 0.0
-        
-        for i in range(max_iter):
-            r = np.linalg.norm(z)
-            
-            if r > 2.0:
-                break
-            
-            # Convert to spherical coordinates
-            theta = np.arctan2(np.sqrt(z[0]**2 + z[1]**2), z[2])
-            phi = np.arctan2(z[1], z[0])
-            
-            dr = pow(r, power - 1) * power * dr + 1.0
-            
-            # Scale and rotate
-            zr = pow(r, power)
-            theta = theta * power
-            phi = phi * power
-            
-            # Convert back to cartesian
-            z = zr * np.array([
-                np.sin(theta) * np.cos(phi),
-                np.sin(phi) * np.sin(theta),
-                np.cos(theta)
-            ])
-            z += pos
-        
-        return 0.5 * np.log(r) * r / dr
+        """Deprecated: use mandelbulb.mandelbulb_de"""
+        warnings.warn("Renderer3D.mandelbulb_de is deprecated; use mandelbulb.mandelbulb_de",
+                      DeprecationWarning, stacklevel=2)
+        from src.fractals.fractal_3d.mandelbulb import mandelbulb_de
+        return mandelbulb_de(pos, float(power), max_iter)
     
     def estimate_normal(self, pos, power):
-        """Estimate surface normal using gradient"""
-        eps = 0.001
+        """Deprecated: unit surface normal of the selected fractal (ray_march.normal)"""
+        warnings.warn("Renderer3D.estimate_normal is deprecated; use ray_march.normal",
+                      DeprecationWarning, stacklevel=2)
+        return np.array(normal(self.distance, float(pos[0]), float(pos[1]), float(pos[2]),
+                               float(power)))
+    
+    def march_frame(self, power, width, height):
+        """Ray march a width x height frame of the current camera
         
-        normal = np.array([
-            self.mandelbulb_de(pos + np.array([eps, 0, 0]), power) - 
-            self.mandelbulb_de(pos - np.array([eps, 0, 0]), power),
-            
-            self.mandelbulb_de(pos + np.array([0, eps, 0]), power) - 
-            self.mandelbulb_de(pos - np.array([0, eps, 0]), power),
+        Tiles are marched by the compiled kernel in parallel on the tile
+        engine; a cancelled render stops between tiles.
+        """
+        # Camera setup
+        fov = 45.0
+        aspect = width / height
+        camera = np.array([self.camera_pos[0], self.camera_pos[1], self.camera_pos[2],
+                           aspect, np.tan(np.radians(fov / 2))])
+        rotation = np.array([np.cos(self.rotation_x), np.sin(self.rotation_x),
+                             np.cos(self.rotation_y), np.sin(self.rotation_y)])
+        light = np.array(LIGHT_DIRECTION)
+        light = light / np.linalg.norm(light)
+        
+        def run(tile):
+            i0, i1, j0, j1 = tile
+            return march_tile(self.distance, camera, rotation, light, float(power),
+                              width, height, i0, i1, j0, j1)
             
-            self.mandelbulb_de(pos + np.array([0, 0, eps]), power) - 
-            self.mandelbulb_de(pos - np.array([0, 0, eps]), power)
-        ])
-        
-        return normal / np.linalg.norm(normal)
+        image = np.zeros((height, width, 3), dtype=np.uint8)
+        tiles = self.engine.split(height, width)
+        for (i0, i1, j0, j1), block in zip(tiles, self.engine.map(run, tiles)):
+            image[i0:i1, j0:j1] = block
+        return image
+    
+    def render_stats(self):
+        """Work counters of the current frame"""
+        return {'pixels': self.width * self.height}
     
     def array_to_qimage(self, array):
         """Convert numpy array to QImage"""
-        height, width, channels = array.shape
-        bytes_per_line = channels * width
-        
-        array = np.ascontiguousarray(array)
-        
-        image = QImage(array.data, width, height, bytes_per_line,
-                      QImage.Format.Format_RGB888)
-        
-        return image.copy()
+        with profiler.stage("array_to_qimage"):
+            height, width, channels = array.shape
+            bytes_per_line = channels * width
+            
+            array = np.ascontiguousarray(array)
+            
+            image = QImage(array.data, width, height, bytes_per_line,
+                          QImage.Format.Format_RGB888)
+            
+            return image.copy()
     
     def pan(self, dx, dy):
         """Pan the camera"""
@@ -0,0 +1,152 @@
+"""Mariani-Silver rectangle subdivision for escape-time kernels"""
+
+import numpy as np
+from numba import jit, types
+from numba.extending import overload
+
+from src.fractals.fractal_2d.escape_time import KERNEL_RESULTS, evaluate, new_grid
+
+
+# Rectangles at most this many pixels across are iterated pixel by pixel
+MIN_RECT_SIZE = 6
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _sample(point, x, y, params, max_iter, result, done, i, j):
+    """Compute pixel (i, j) unless already known; return (value, iterated, early)"""
+    if done[i, j]:
+        return result[i, j], 0, 0
+    value, early = evaluate(point, x[j], y[i], params, max_iter)
+    result[i, j] = value
+    done[i, j] = True
+    return value, 1, early
+
+
+def fill(result, done, i0, j0, i1, j1):
+    """Fill the interior of a rectangle whose border is uniform (for jitted code)"""
+    raise NotImplementedError("fill is only available in jitted code")
+
+
+@overload(fill, jit_options={"nogil": True})
+def _fill(result, done, i0, j0, i1, j1):
+    if isinstance(result.dtype, types.Float):
+        def fill_blend(result, done, i0, j0, i1, j1):
+            # Normalized counts within one band vary smoothly, so the
+            # interior is blended from the four sides (Coons patch) and kept
+            # inside the band
+            low = np.floor(result[i0, j0])
+            high = low + 0.9999
+            c00 = result[i0, j0]
+            c01 = result[i0, j1]
+            c10 = result[i1, j0]
+            c11 = result[i1, j1]
+            for i in range(i0 + 1, i1):
+                v = (i - i0) / (i1 - i0)
+                for j in range(j0 + 1, j1):
+                    u = (j - j0) / (j1 - j0)
+                    value = ((1 - v) * result[i0, j] + v * result[i1, j] +
+                             (1 - u) * result[i, j0] + u * result[i, j1] -
+                             (1 - u) * (1 - v) * c00 - u * (1 - v) * c01 -
+                             (1 - u) * v * c10 - u * v * c11)
+                    result[i, j] = min(max(value, low), high)
+                    done[i, j] = True
+        return fill_blend
+
+    def fill_constant(result, done, i0, j0, i1, j1):
+        value = result[i0, j0]
+        for i in range(i0 + 1, i1):
+            for j in range(j0 + 1, j1):
+                result[i, j] = value
+                done[i, j] = True
+    return fill_constant
+
+
+@jit([result(kernel, types.float64[::1], types.float64[::1], types.float64[::1],
+             types.int64, min_size)
+      for kernel, result in KERNEL_RESULTS
+      for min_size in (types.int64, types.Omitted(MIN_RECT_SIZE))],
+     nopython=True, nogil=True, cache=True)
+def subdivide(point, x, y, params, max_iter, min_size=MIN_RECT_SIZE):
+    """
+    Calculate a grid by Mariani-Silver subdivision
+
+    The border of a rectangle is computed first. If every border pixel has
+    the same iteration count the interior is filled with it without
+    iterating; otherwise the rectangle is split in two along its longer
+    side and both halves are processed the same way. Escape-time sets are
+    connected, so a uniform border almost always encloses a uniform region.
+    Normalized counts (resume kernels) are compared by their whole count
+    and the interior is blended from the border values.
+
+    Args:
+        point: Compiled point kernel (x, y, params, max_iter) -> (count, early),
+            or resume kernel for normalized counts
+        x: Array of x coordinates
+        y: Array of y coordinates
+        params: Float array of fractal parameters passed to point
+        max_iter: Maximum iterations
+        min_size: Rectangles this small are iterated pixel by pixel
+
+    Returns:
+        (2D int32 array of iteration counts, or float32 of normalized
+        counts, pixels iterated, early exits)
+    """
+    height = len(y)
+    width = len(x)
+    result = new_grid(point, (height, width))
+    done = np.zeros((height, width), dtype=np.bool_)
+    iterated = 0
+    early = 0
+    if height == 0 or width == 0:
+        return result, iterated, early
+
+    # Rectangles as inclusive (i0, j0, i1, j1)
+    stack = [(0, 0, height - 1, width - 1)]
+    while len(stack) > 0:
+        i0, j0, i1, j1 = stack.pop()
+
+        # Border
+        first = -1
+        uniform = True
+        for j in range(j0, j1 + 1):
+            for i in (i0, i1):
+                value, n, shortcut = _sample(point, x, y, params, max_iter,
+                                             result, done, i, j)
+                iterated += n
+                early += shortcut
+                band = int(value)
+                if first == -1:
+                    first = band
+                elif band != first:
+                    uniform = False
+        for i in range(i0 + 1, i1):
+            for j in (j0, j1):
+                value, n, shortcut = _sample(point, x, y, params, max_iter,
+                                             result, done, i, j)
+                iterated += n
+                early += shortcut
+                if int(value) != first:
+                    uniform = False
+
+        if i1 - i0 < 2 or j1 - j0 < 2:
+            continue
+
+        if uniform:
+            fill(result, done, i0, j0, i1, j1)
+        elif i1 - i0 <= min_size or j1 - j0 <= min_size:
+            for i in range(i0 + 1, i1):
+                for j in range(j0 + 1, j1):
+                    value, n, shortcut = _sample(point, x, y, params, max_iter,
+                                                 result, done, i, j)
+                    iterated += n
+                    early += shortcut
+        elif j1 - j0 >= i1 - i0:
+            middle = (j0 + j1) // 2
+            stack.append((i0, j0, i1, middle))
+            stack.append((i0, middle, i1, j1))
+        else:
+            middle = (i0 + i1) // 2
+            stack.append((i0, j0, middle, j1))
+            stack.append((middle, j0, i1, j1))
+
+    return result, iterated, early
@@ -0,0 +1,132 @@
+"""Quadtree tile cache with LRU eviction under a memory budget"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class TileCache:
+    """Cache of computed iteration tiles
+
+    Keys are ``(fractal_key, max_iter, zoom_index, tx, ty)``: views are
+    aligned to a global pixel grid per zoom index, and tile (tx, ty) covers
+    grid pixels ``[tx * size, (tx + 1) * size)`` horizontally (likewise for
+    ty). Zoom indices one octave apart form a quadtree, so a missing tile
+    can be derived from its four children by taking every other pixel.
+
+    Least recently used tiles are evicted once the byte budget is exceeded.
+    The cache is thread-safe so tiles can be stored from pool threads.
+    """
+
+    DEFAULT_BUDGET_MB = 256
+
+    def __init__(self, config=None, tile_size=64, levels_per_octave=8):
+        performance = (config or {}).get('performance', {})
+        self.enabled = performance.get('cache_enabled', True)
+        self.max_bytes = int(performance.get('cache_size_mb', self.DEFAULT_BUDGET_MB) * 1024 * 1024)
+        self.tile_size = tile_size
+        self.levels_per_octave = levels_per_octave
+
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.derived = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._tiles
+
+    def __len__(self):
+        return len(self._tiles)
+
+    def get(self, key):
+        """
+        Look up a tile, deriving it from its quadtree children if possible
+
+        Args:
+            key: (fractal_key, max_iter, zoom_index, tx, ty)
+
+        Returns:
+            The tile array, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return tile
+
+        tile = self._from_children(key)
+        with self._lock:
+            if tile is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.derived += 1
+        if tile is not None:
+            self.put(key, tile)
+        return tile
+
+    def _from_children(self, key):
+        """Assemble a tile from the four tiles one octave deeper"""
+        fractal_key, max_iter, zoom_index, tx, ty = key
+        size = self.tile_size
+        child_index = zoom_index + self.levels_per_octave
+        children = []
+        with self._lock:
+            for cy in (2 * ty, 2 * ty + 1):
+                for cx in (2 * tx, 2 * tx + 1):
+                    child = self._tiles.get((fractal_key, max_iter, child_index, cx, cy))
+                    if child is None:
+                        return None
+                    children.append(child)
+
+        # Pixel g on this level samples the same point as pixel 2g one octave deeper
+        tile = np.empty((size, size), dtype=children[0].dtype)
+        half = size // 2
+        for n, child in enumerate(children):
+            row, col = divmod(n, 2)
+            tile[row * half:(row + 1) * half, col * half:(col + 1) * half] = child[::2, ::2]
+        return tile
+
+    def put(self, key, tile):
+        """Store a tile and evict least recently used tiles over budget"""
+        if not self.enabled:
+            return
+        with self._lock:
+            old = self._tiles.pop(key, None)
+            if old is not None:
+                self.bytes -= old.nbytes
+            self._tiles[key] = tile
+            self.bytes += tile.nbytes
+            while self.bytes > self.max_bytes and len(self._tiles) > 1:
+                _, evicted = self._tiles.popitem(last=False)
+                self.bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all tiles (statistics are kept)"""
+        with self._lock:
+            self._tiles.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """Hit/miss statistics and memory use"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "derived": self.derived,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "tiles": len(self._tiles),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,221 @@
+"""Tiled multi-core escape-time engine shared by all 2D kernels"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+import numpy as np
+
+from src.rendering.instrumentation import profiler
+
+
+class RenderCancelled(Exception):
+    """Raised inside a render that has been superseded by a newer request"""
+
+
+_cancel_state = threading.local()
+
+
+@contextmanager
+def cancellation(is_cancelled):
+    """
+    Make renders on the current thread cancellable
+
+    Args:
+        is_cancelled: Callable returning True once the render should stop
+    """
+    previous = getattr(_cancel_state, 'check', None)
+    _cancel_state.check = is_cancelled
+    try:
+        yield
+    finally:
+        _cancel_state.check = previous
+
+
+def check_cancelled():
+    """Raise RenderCancelled if the current thread's render was cancelled"""
+    check = getattr(_cancel_state, 'check', None)
+    if check is not None and check():
+        raise RenderCancelled()
+
+
+class TileEngine:
+    """Computes escape-time kernels tile by tile on a pool of worker threads
+
+    Every kernel is called as ``kernel(x_tile, y_tile, *args)`` and returns
+    a 2D array for its tile. Kernels are compiled with ``nogil=True`` so the
+    tiles really run on separate cores.
+    """
+
+    DEFAULT_TILE_SIZE = 64
+
+    def __init__(self, config=None, tile_size=DEFAULT_TILE_SIZE):
+        performance = (config or {}).get('performance', {})
+        self.workers = self.resolve_workers(performance)
+        self.tile_size = tile_size
+        self._executor = None
+
+    @staticmethod
+    def resolve_workers(performance):
+        """
+        Work out the worker count from the ``performance`` config section
+
+        Args:
+            performance: The ``performance`` dict from config.json
+
+        Returns:
+            1 when multi-threading is off, ``worker_threads`` when it is set
+            to a positive number, otherwise the number of CPU cores
+        """
+        if not performance.get('multi_threading', True):
+            return 1
+        workers = performance.get('worker_threads', 0)
+        if workers and workers > 0:
+            return int(workers)
+        return os.cpu_count() or 1
+
+    @property
+    def executor(self):
+        """Lazily created thread pool"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix="tile")
+        return self._executor
+
+    def split(self, height, width):
+        """Return (row0, row1, col0, col1) bounds of every tile in a frame"""
+        size = self.tile_size
+        return [(i, min(i + size, height), j, min(j + size, width))
+                for i in range(0, height, size)
+                for j in range(0, width, size)]
+
+    def map(self, func, items):
+        """
+        Apply func to every item, in parallel when more than one worker
+
+        Returns only once no item is running any more, also when it raises,
+        so a cancelled render leaves no tile writing to its caches.
+
+        Raises:
+            RenderCancelled: If the calling thread's render was cancelled
+        """
+        # Pool threads do not see the caller's thread-local cancel check
+        is_cancelled = getattr(_cancel_state, 'check', None)
+
+        def run(item):
+            if is_cancelled is not None and is_cancelled():
+                raise RenderCancelled()
+            with profiler.stage("tile", frame=False):
+                return func(item)
+
+        if self.workers == 1 or len(items) < 2:
+            return [run(item) for item in items]
+        futures = [self.executor.submit(run, item) for item in items]
+        try:
+            return [future.result() for future in futures]
+        finally:
+            for future in futures:
+                future.cancel()
+            wait(futures)
+
+    def compute(self, kernel, x_coords, y_coords, *args):
+        """
+        Run an escape-time kernel over a whole frame
+
+        Args:
+            kernel: Compiled kernel taking (x_coords, y_coords, *args)
+            x_coords: Array of x coordinates
+            y_coords: Array of y coordinates
+            *args: Extra kernel arguments (parameters, max_iter)
+
+        Returns:
+            2D array assembled from the per-tile results
+
+        Raises:
+            RenderCancelled: If the render was cancelled between tiles
+        """
+        height, width = len(y_coords), len(x_coords)
+        tiles = self.split(height, width)
+
+        def run(tile):
+            i0, i1, j0, j1 = tile
+            return kernel(x_coords[j0:j1], y_coords[i0:i1], *args)
+
+        result = None
+        for (i0, i1, j0, j1), block in zip(tiles, self.map(run, tiles)):
+            if result is None:
+                result = np.empty((height, width), dtype=block.dtype)
+            result[i0:i1, j0:j1] = block
+
+        if result is None:
+            result = np.zeros((height, width), dtype=np.int32)
+        return result
+
+    def compute_points(self, point, x_coords, y_coords, params, max_iter,
+                       subdivision=False):
+        """
+        Run a point kernel over a frame, one tile per task
+
+        Args:
+            point: Compiled point kernel (x, y, params, max_iter) -> (count, early),
+                or resume kernel for normalized counts
+            x_coords: Array of x coordinates
+            y_coords: Array of y coordinates
+            params: Float array of fractal parameters
+            max_iter: Maximum iterations
+            subdivision: Use Mariani-Silver subdivision inside each tile
+
+        Returns:
+            (2D int32 array of iteration counts, or float32 of normalized
+            counts, pixels iterated, early exits)
+        """
+        # Imported here so that the engine and its cancellation helpers can
+        # be imported without loading any kernel
+        from src.fractals.fractal_2d.escape_time import escape_grid
+        from src.rendering.subdivision import subdivide
+
+        height, width = len(y_coords), len(x_coords)
+        tiles = self.split(height, width)
+        driver = subdivide if subdivision else escape_grid
+
+        def run(tile):
+            i0, i1, j0, j1 = tile
+            return driver(point, x_coords[j0:j1], y_coords[i0:i1], params, max_iter)
+
+        result = None
+        iterated = 0
+        early = 0
+        for (i0, i1, j0, j1), (block, count, shortcuts) in zip(tiles, self.map(run, tiles)):
+            if result is None:
+                result = np.empty((height, width), dtype=block.dtype)
+            result[i0:i1, j0:j1] = block
+            iterated += count
+            early += shortcuts
+
+        if result is None:
+            result = np.zeros((height, width), dtype=np.int32)
+        return result, iterated, early
+
+    def shutdown(self):
+        """Stop the worker threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+_default_engine = None
+_default_lock = threading.Lock()
+
+
+def default_engine():
+    """
+    Process-wide TileEngine on every core, for code that has no config
+
+    The fractals' ``calculate`` methods run on it.
+    """
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            _default_engine = TileEngine()
+        return _default_engine
@@ -0,0 +1,229 @@
+"""Persistent content-addressed store of iteration tiles
+
+Tiles of raw iteration counts (not colors, so they can be recolored) are
+kept across sessions in one SQLite file. A tile is addressed by a hash of
+everything its pixels depend on, so a view revisited in a later session,
+or by another process, is read back instead of computed. The file is
+capped in size; least recently used tiles are evicted.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+
+# Part of every address; bump when kernels change what they compute
+FORMAT_VERSION = 1
+
+# Addresses per SQL statement
+BATCH = 500
+
+
+def default_path():
+    """Store file in the user's cache directory"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "donuts-fractals" / "tiles.sqlite"
+
+
+def tile_address(*parts):
+    """Content address of a tile: a hash of the values that determine it"""
+    return hashlib.blake2b(repr((FORMAT_VERSION,) + parts).encode(), digest_size=20).digest()
+
+
+class TileStore:
+    """SQLite file of compressed iteration tiles with size-capped LRU eviction
+
+    One store is shared by all renderers of a process (see ``from_config``);
+    it is thread-safe, and several processes may use the same file. Storage
+    errors are counted and treated as misses, so a broken or read-only
+    cache never fails a render.
+    """
+
+    DEFAULT_BUDGET_MB = 1024
+    # Eviction frees space down to this fraction of the budget
+    EVICT_TO = 0.9
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        The process-wide store for a config
+
+        Returns:
+            TileStore, or None when the disk cache is disabled (it is opt-in:
+            ``disk_cache_enabled`` must be set) or cannot be opened
+        """
+        performance = (config or {}).get('performance', {})
+        if not (performance.get('cache_enabled', True) and
+                performance.get('disk_cache_enabled', False)):
+            return None
+        path = Path(performance.get('disk_cache_path') or default_path()).expanduser()
+        max_bytes = int(performance.get('disk_cache_mb', cls.DEFAULT_BUDGET_MB) * 1024 * 1024)
+        with cls._shared_lock:
+            store = cls._shared.get(path)
+            if store is None:
+                try:
+                    store = cls(path, max_bytes)
+                except (OSError, sqlite3.Error):
+                    return None
+                cls._shared[path] = store
+            return store
+
+    def __init__(self, path, max_bytes=DEFAULT_BUDGET_MB * 1024 * 1024):
+        """
+        Args:
+            path: SQLite file (created with its directory if missing)
+            max_bytes: Budget for the compressed tiles
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False,
+                                   isolation_level=None)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS tiles (address BLOB PRIMARY KEY, "
+                         "dtype TEXT, rows INTEGER, cols INTEGER, data BLOB, "
+                         "bytes INTEGER, used REAL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS tiles_used ON tiles (used)")
+        self.bytes = self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM tiles").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+        if self.bytes > self.max_bytes:
+            with self._lock:
+                self._evict()
+
+    def get_many(self, addresses):
+        """
+        Read tiles
+
+        Args:
+            addresses: Tile addresses from tile_address()
+
+        Returns:
+            Dict of address -> read-only 2D array for the tiles present
+        """
+        found = {}
+        now = time.time()
+        try:
+            with self._lock:
+                for i in range(0, len(addresses), BATCH):
+                    chunk = addresses[i:i + BATCH]
+                    rows = self._db.execute(
+                        "SELECT address, dtype, rows, cols, data FROM tiles WHERE address IN "
+                        f"({','.join('?' * len(chunk))})", chunk).fetchall()
+                    for address, dtype, height, width, data in rows:
+                        found[address] = np.frombuffer(zlib.decompress(data),
+                                                       dtype=dtype).reshape(height, width)
+                if found:
+                    self._db.executemany("UPDATE tiles SET used = ? WHERE address = ?",
+                                         [(now, address) for address in found])
+        except (sqlite3.Error, zlib.error):
+            self.errors += 1
+            return {}
+        self.hits += len(found)
+        self.misses += len(addresses) - len(found)
+        return found
+
+    def contains_all(self, addresses):
+        """True if every address is in the store"""
+        try:
+            with self._lock:
+                for i in range(0, len(addresses), BATCH):
+                    chunk = addresses[i:i + BATCH]
+                    count = self._db.execute(
+                        "SELECT COUNT(*) FROM tiles WHERE address IN "
+                        f"({','.join('?' * len(chunk))})", chunk).fetchone()[0]
+                    if count < len(chunk):
+                        return False
+        except sqlite3.Error:
+            self.errors += 1
+            return False
+        return True
+
+    def put_many(self, tiles):
+        """
+        Write tiles and evict least recently used ones over budget
+
+        Args:
+            tiles: Iterable of (address, 2D array)
+        """
+        now = time.time()
+        rows = []
+        for address, tile in tiles:
+            tile = np.ascontiguousarray(tile)
+            data = zlib.compress(tile.data, 1)
+            rows.append((address, tile.dtype.str, tile.shape[0], tile.shape[1], data,
+                         len(data), now))
+        if not rows:
+            return
+        try:
+            with self._lock:
+                self._db.execute("BEGIN")
+                self._db.executemany("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                     rows)
+                self._db.execute("COMMIT")
+                self.writes += len(rows)
+                self.bytes += sum(row[5] for row in rows)
+                if self.bytes > self.max_bytes:
+                    self._evict()
+        except sqlite3.Error:
+            self.errors += 1
+            if self._db.in_transaction:
+                self._db.execute("ROLLBACK")
+
+    def _evict(self):
+        """Drop least recently used tiles down to EVICT_TO of the budget"""
+        # Other processes may have written too: recount first
+        self.bytes = self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM tiles").fetchone()[0]
+        target = self.max_bytes * self.EVICT_TO
+        while self.bytes > target:
+            victims = self._db.execute(
+                "SELECT address, bytes FROM tiles ORDER BY used LIMIT ?", (BATCH,)).fetchall()
+            if not victims:
+                break
+            freed = []
+            for address, size in victims:
+                freed.append((address,))
+                self.bytes -= size
+                if self.bytes <= target:
+                    break
+            self._db.executemany("DELETE FROM tiles WHERE address = ?", freed)
+            self.evictions += len(freed)
+
+    def clear(self):
+        """Delete every tile (statistics are kept)"""
+        with self._lock:
+            self._db.execute("DELETE FROM tiles")
+            self._db.execute("VACUUM")
+            self.bytes = 0
+
+    def stats(self):
+        """Hit/miss statistics and disk use"""
+        with self._lock:
+            tiles = self._db.execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "tiles": tiles,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "path": str(self.path),
+        }
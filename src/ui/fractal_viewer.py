@@ -1,22 +1,56 @@
 """Fractal viewer widget"""
 
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSlider, QPushButton
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSlider, QPushButton,
+                             QComboBox, QCheckBox)
+from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal
 from PyQt6.QtGui import QImage, QPixmap, QPainter
 
-from src.rendering.renderer_2d import Renderer2D
-from src.rendering.renderer_3d import Renderer3D
+from src.rendering.instrumentation import profiler
+from src.rendering.render_worker import RenderWorker
+from src.rendering.tile_engine import RenderCancelled, cancellation
+from src.utils.colors import ColorPalette
+
+
+def refine_passes(renderer):
+    """Frames of the passes left in a 2D renderer's progressive render"""
+    while True:
+        image = renderer.refine()
+        if image is None:
+            return
+        yield image
 
 
 class FractalViewer(QWidget):
     """Widget for displaying and interacting with fractals"""
     
+    # Delay after the last pan/zoom event before refining
+    SETTLE_DELAY_MS = 150
+    
+    # Sizes offered by the poster export (any WIDTHxHEIGHT can be typed)
+    POSTER_SIZES = ["4096x4096", "8192x8192", "16384x16384", "32768x32768", "65536x65536"]
+    
+    # Render stages in pipeline order, as listed by the HUD
+    HUD_STAGES = ["kernel", "histogram", "apply_colormap", "antialiasing", "array_to_qimage",
+                  "scale_pixmap"]
+    
     def __init__(self, config):
         super().__init__()
         self.config = config
         self.current_fractal = None
         self.renderer = None
         self.is_rendering = False
+        self.poster_thread = None
+        self.progressive = config.get('rendering', {}).get('progressive', True)
+        
+        # Progressive refinement starts once input has settled
+        self.settle_timer = QTimer(self)
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.timeout.connect(self.refine_step)
+        
+        # Frames are rendered off the GUI thread
+        self.render_worker = RenderWorker(self)
+        self.render_worker.frame_ready.connect(self.on_frame_ready)
+        self.render_worker.start()
         
         self.init_ui()
         
@@ -63,6 +97,18 @@ class FractalViewer(QWidget):
         self.save_btn.clicked.connect(self.save_image)
         info_layout.addWidget(self.save_btn)
         
+        self.poster_btn = QPushButton("🖼️ Poster")
+        self.poster_btn.setStyleSheet(self.reset_btn.styleSheet())
+        self.poster_btn.clicked.connect(self.export_poster)
+        info_layout.addWidget(self.poster_btn)
+        
+        self.trace_btn = QPushButton("⏱️ Trace")
+        self.trace_btn.setStyleSheet(self.reset_btn.styleSheet())
+        self.trace_btn.setToolTip("Save the stage timings collected while the HUD is on "
+                                  "as a Chrome trace")
+        self.trace_btn.clicked.connect(self.export_trace)
+        info_layout.addWidget(self.trace_btn)
+        
         layout.addLayout(info_layout)
         
         # Canvas for fractal display
@@ -84,36 +130,208 @@ class FractalViewer(QWidget):
         self.iterations_label = QLabel("256")
         controls_layout.addWidget(self.iterations_label)
         
+        # Color scheme selector
+        controls_layout.addWidget(QLabel("Colors:"))
+        palette = ColorPalette(self.config)
+        self.scheme_combo = QComboBox()
+        self.scheme_combo.addItems(palette.scheme_names())
+        self.scheme_combo.setCurrentText(palette.scheme)
+        self.scheme_combo.currentTextChanged.connect(self.on_scheme_changed)
+        controls_layout.addWidget(self.scheme_combo)
+        
+        # Coloring modes
+        rendering = self.config.get('rendering', {})
+        self.smooth_check = QCheckBox("Smooth")
+        self.smooth_check.setToolTip("Blend the bands between iteration counts")
+        self.smooth_check.setChecked(rendering.get('smooth_coloring', False))
+        self.smooth_check.toggled.connect(self.on_smooth_changed)
+        controls_layout.addWidget(self.smooth_check)
+        
+        self.equalize_check = QCheckBox("Equalize")
+        self.equalize_check.setToolTip("Spread the colors evenly over the frame (histogram)")
+        self.equalize_check.setChecked(rendering.get('histogram_equalization', False))
+        self.equalize_check.toggled.connect(self.on_equalize_changed)
+        controls_layout.addWidget(self.equalize_check)
+        
+        # Render instrumentation overlay
+        self.hud_check = QCheckBox("HUD")
+        self.hud_check.setToolTip("Show per-stage render timings and work counters")
+        self.hud_check.toggled.connect(self.on_hud_toggled)
+        self.hud_check.setChecked(self.config.get('performance', {}).get('instrumentation', False))
+        controls_layout.addWidget(self.hud_check)
+        
         layout.addLayout(controls_layout)
         
     def load_fractal(self, fractal_info):
         """Load and display a fractal"""
         self.current_fractal = fractal_info
         dimension = fractal_info.get('dimension', '2D')
-        name = list(fractal_info.keys())[0] if isinstance(fractal_info, dict) else "Unknown"
+        name = fractal_info.get('name', "Unknown")
         
         # Update info
         self.info_label.setText(f"🍩 {name} ({dimension})")
         
-        # Create appropriate renderer
+        # Create appropriate renderer. Renderers (and the fractal's kernels)
+        # are imported here, on first use, so that startup stays light
         if dimension == '2D':
-            self.renderer = Renderer2D(self.canvas.size(), self.config)
+            from src.rendering.renderer_2d import Renderer2D
+            self.renderer = Renderer2D(self.canvas.size(), self.config, fractal_info)
+            self.renderer.set_color_scheme(self.scheme_combo.currentText())
+            self.renderer.set_smooth_coloring(self.smooth_check.isChecked())
+            self.renderer.set_histogram_equalization(self.equalize_check.isChecked())
         else:
-            self.renderer = Renderer3D(self.canvas.size(), self.config)
+            from src.rendering.renderer_3d import Renderer3D
+            self.renderer = Renderer3D(self.canvas.size(), self.config, fractal_info)
         
         # Start rendering
         self.is_rendering = True
         self.render_fractal()
         
     def render_fractal(self):
-        """Render the current fractal"""
+        """Render the current fractal in the background"""
         if not self.renderer or not self.current_fractal:
             return
+        self.settle_timer.stop()
+        
+        renderer = self.renderer
+        fractal = self.current_fractal
+        max_iter = self.iterations_slider.value()
+        self.submit(lambda: [renderer.render(fractal, max_iter)])
+        
+    def submit(self, job):
+        """Queue a render job on the render worker
+        
+        2D jobs first apply the coloring chosen in the UI (scheme,
+        equalization, smooth coloring), on the worker, so the renderer is
+        never restyled while it renders and a setting is not lost when its
+        job is superseded.
+        """
+        renderer = self.renderer
+        if getattr(renderer, 'dimension', None) != '2D':
+            self.render_worker.submit(job)
+            return
+        scheme = self.scheme_combo.currentText()
+        equalize = self.equalize_check.isChecked()
+        smooth = self.smooth_check.isChecked()
+        
+        def styled():
+            renderer.set_color_scheme(scheme)
+            renderer.set_histogram_equalization(equalize)
+            # Drops the frames and cached tiles when it changes
+            renderer.set_smooth_coloring(smooth)
+            return job()
+            
+        self.render_worker.submit(styled)
+            
+    def render_interactive(self):
+        """Render a coarse preview now and refine it once input settles"""
+        if not self.renderer or not self.current_fractal:
+            return
+        if not self.progressive:
+            self.render_fractal()
+            return
+            
+        renderer = self.renderer
+        max_iter = self.iterations_slider.value()
+        if getattr(renderer, 'dimension', None) == '2D':
+            self.submit(lambda: [renderer.begin_progressive(max_iter)])
+        else:
+            self.submit(lambda: [renderer.render_preview(max_iter)])
+        self.settle_timer.start(self.SETTLE_DELAY_MS)
+        
+    def refine_step(self):
+        """Refine the progressive frame pass by pass in the background"""
+        if getattr(self.renderer, 'dimension', None) != '2D':
+            # 3D previews are replaced by a full frame
+            self.render_fractal()
+            return
+        renderer = self.renderer
+        self.submit(lambda: refine_passes(renderer))
+        
+    def recolor(self):
+        """Recolor the current frame in the background
+        
+        The iteration buffer is only re-mapped when it is the finished frame
+        of the current view; a render the recolor superseded is resumed
+        (progressive passes) or started over instead.
+        """
+        if not self.renderer or not self.current_fractal:
+            return
+        renderer = self.renderer
+        fractal = self.current_fractal
+        max_iter = self.iterations_slider.value()
+        
+        def frames():
+            if renderer.progressive is not None:
+                yield from refine_passes(renderer)
+            elif (renderer.last_result is not None and renderer.last_max_iter == max_iter and
+                  renderer.last_view == renderer.current_view()):
+                yield renderer.recolor()
+            else:
+                yield renderer.render(fractal, max_iter)
+                
+        self.submit(frames)
+        
+    def on_frame_ready(self, image):
+        """Display a frame delivered by the render worker"""
+        if self.is_rendering:
+            self.show_frame(image)
+            
+    def show_frame(self, image):
+        """Display a frame from the render worker and close its timings"""
+        self.canvas.set_image(image)
+        if not profiler.enabled:
+            return
+        counters = self.renderer.render_stats() if self.renderer else {}
+        summary = profiler.end_frame(counters)
+        if summary is not None:
+            self.canvas.set_hud(self.format_hud(summary))
             
-        image = self.renderer.render(self.current_fractal, 
-                                     self.iterations_slider.value())
-        if image:
-            self.canvas.set_image(image)
+    def format_hud(self, summary):
+        """Text of the HUD for a frame summary from Profiler.end_frame"""
+        frames = profiler.frames
+        average = sum(frame["frame_ms"] for frame in frames) / len(frames)
+        lines = [f"frame        {summary['frame_ms']:8.1f} ms  "
+                 f"(avg {average:.1f} ms, {1000 / average:.1f} fps)"]
+        stages = summary["stages"]
+        names = [name for name in self.HUD_STAGES if name in stages]
+        names += sorted(set(stages) - set(self.HUD_STAGES))
+        for name in names:
+            lines.append(f"  {name:15} {stages[name]:8.1f} ms")
+        
+        counters = summary["counters"]
+        lines.append(f"pixels       {counters.get('pixels', 0):>12,}")
+        if 'iterations' in counters:
+            lines.append(f"iterations   {counters['iterations']:>12,}")
+        if 'iterated_pixels' in counters:
+            lines.append(f"iterated px  {counters['iterated_pixels']:>12,}")
+        if 'early_exits' in counters:
+            lines.append(f"early exits  {counters['early_exits']:>12,}")
+        hits = counters.get('cached_tiles', 0) + counters.get('stored_tiles', 0)
+        if hits:
+            stored = counters.get('stored_tiles', 0)
+            lines.append(f"cache hits   {hits:>12,} tiles ({stored} from disk)")
+        if counters.get('supersampled_pixels'):
+            lines.append(f"supersampled {counters['supersampled_pixels']:>12,} px")
+        return "\n".join(lines)
+        
+    def on_hud_toggled(self, checked):
+        """Turn render instrumentation and its overlay on or off"""
+        profiler.set_enabled(checked)
+        self.canvas.set_hud("Waiting for the next frame..." if checked else None)
+        
+    def export_trace(self):
+        """Save the collected stage timings as a Chrome trace (chrome://tracing, Perfetto)"""
+        if not profiler.events:
+            self.info_label.setText("⏱️ Turn on the HUD and render a few frames first")
+            return
+        from PyQt6.QtWidgets import QFileDialog
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Save Trace", "render_trace.json", "Chrome trace (*.json)"
+        )
+        if filename:
+            profiler.save_trace(filename)
+            self.info_label.setText(f"⏱️ Trace saved to {filename}")
             
     def on_iterations_changed(self, value):
         """Handle iterations slider change"""
@@ -121,6 +339,22 @@ class FractalViewer(QWidget):
         if self.is_rendering:
             self.render_fractal()
             
+    def on_scheme_changed(self, name):
+        """Recolor the current frame without recomputing the fractal"""
+        if getattr(self.renderer, 'dimension', None) == '2D':
+            self.recolor()
+                
+    def on_smooth_changed(self, checked):
+        """Switch to (or from) normalized iteration counts; needs a new frame"""
+        if getattr(self.renderer, 'dimension', None) == '2D':
+            # The render job switches the renderer, after the current render
+            self.render_fractal()
+            
+    def on_equalize_changed(self, checked):
+        """Toggle histogram equalization by recoloring the current frame"""
+        if getattr(self.renderer, 'dimension', None) == '2D':
+            self.recolor()
+            
     def reset_view(self):
         """Reset view to default"""
         if self.renderer:
@@ -138,9 +372,57 @@ class FractalViewer(QWidget):
                 self.canvas.current_image.save(filename)
                 self.info_label.setText(f"💾 Saved to {filename}")
                 
+    def export_poster(self):
+        """Render the current 2D view at poster size in the background"""
+        if getattr(self.renderer, 'dimension', None) != '2D':
+            self.info_label.setText("🖼️ Poster export is available for 2D fractals")
+            return
+        if self.poster_thread is not None and self.poster_thread.isRunning():
+            return
+        from PyQt6.QtWidgets import QFileDialog, QInputDialog, QProgressDialog
+        
+        size, ok = QInputDialog.getItem(self, "Poster Export", "Size (width x height):",
+                                        self.POSTER_SIZES, 1, True)
+        if not ok:
+            return
+        try:
+            width, height = (int(v) for v in size.lower().split("x"))
+        except ValueError:
+            self.info_label.setText(f"⚠ Invalid poster size: {size}")
+            return
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Save Poster", "", "PNG (*.png);;NumPy array (*.npy)"
+        )
+        if not filename:
+            return
+            
+        from src.utils.poster_export import PosterExport
+        poster = PosterExport.from_renderer(self.renderer, width, height,
+                                            self.iterations_slider.value())
+        
+        progress = QProgressDialog(f"Rendering {width}x{height} poster...", "Cancel",
+                                   0, height, self)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.poster_thread = PosterThread(poster, filename, self)
+        self.poster_thread.progress.connect(progress.setValue)
+        self.poster_thread.finished_export.connect(progress.close)
+        self.poster_thread.finished_export.connect(self.info_label.setText)
+        progress.canceled.connect(self.poster_thread.requestInterruption)
+        self.poster_thread.start()
+                
     def stop_rendering(self):
         """Stop rendering"""
         self.is_rendering = False
+        self.settle_timer.stop()
+        self.render_worker.cancel()
+        
+    def shutdown(self):
+        """Stop the render thread"""
+        self.stop_rendering()
+        self.render_worker.stop()
+        if self.poster_thread is not None:
+            self.poster_thread.requestInterruption()
+            self.poster_thread.wait()
 
 
 class FractalCanvas(QLabel):
@@ -163,15 +445,43 @@ class FractalCanvas(QLabel):
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.setText("🍩 Fractal will appear here")
         
+        # Instrumentation overlay, drawn over the top-left corner
+        self.hud = QLabel(self)
+        self.hud.setStyleSheet("""
+            QLabel {
+                background: rgba(0, 0, 0, 160);
+                color: #FFF5EE;
+                font-family: monospace;
+                font-size: 11px;
+                padding: 6px;
+                border: none;
+                border-radius: 6px;
+            }
+        """)
+        self.hud.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.hud.move(12, 12)
+        self.hud.hide()
+        
     def set_image(self, image):
         """Set and display image"""
         self.current_image = image
-        pixmap = QPixmap.fromImage(image)
-        scaled = pixmap.scaled(self.size(), 
-                              Qt.AspectRatioMode.KeepAspectRatio,
-                              Qt.TransformationMode.SmoothTransformation)
+        with profiler.stage("scale_pixmap"):
+            pixmap = QPixmap.fromImage(image)
+            scaled = pixmap.scaled(self.size(), 
+                                  Qt.AspectRatioMode.KeepAspectRatio,
+                                  Qt.TransformationMode.SmoothTransformation)
         self.setPixmap(scaled)
         
+    def set_hud(self, text):
+        """Show text in the overlay, or hide it when text is None"""
+        if text is None:
+            self.hud.hide()
+            return
+        self.hud.setText(text)
+        self.hud.adjustSize()
+        self.hud.show()
+        self.hud.raise_()
+        
     def mousePressEvent(self, event):
         """Handle mouse press for dragging"""
         if event.button() == Qt.MouseButton.LeftButton:
@@ -182,7 +492,7 @@ class FractalCanvas(QLabel):
         if self.drag_start and self.parent_viewer.renderer:
             delta = event.pos() - self.drag_start
             self.parent_viewer.renderer.pan(delta.x(), delta.y())
-            self.parent_viewer.render_fractal()
+            self.parent_viewer.render_interactive()
             self.drag_start = event.pos()
             
     def mouseReleaseEvent(self, event):
@@ -195,4 +505,38 @@ class FractalCanvas(QLabel):
             delta = event.angleDelta().y()
             zoom_factor = 1.1 if delta > 0 else 0.9
             self.parent_viewer.renderer.zoom(zoom_factor)
-            self.parent_viewer.render_fractal()
+            self.parent_viewer.render_interactive()
+
+
+class PosterThread(QThread):
+    """Renders a PosterExport off the GUI thread
+    
+    Progress is reported in rows; requestInterruption() cancels the render
+    between tiles and discards the partial file.
+    """
+    
+    progress = pyqtSignal(int)
+    finished_export = pyqtSignal(str)
+    
+    def __init__(self, poster, path, parent=None):
+        super().__init__(parent)
+        self.poster = poster
+        self.path = path
+        
+    def run(self):
+        """Render the poster and report the outcome"""
+        poster = self.poster
+        try:
+            with cancellation(self.isInterruptionRequested):
+                stats = poster.render(self.path,
+                                      progress=lambda done, total: self.progress.emit(done))
+        except RenderCancelled:
+            self.finished_export.emit("🖼️ Poster export cancelled")
+            return
+        except Exception as e:
+            self.finished_export.emit(f"⚠ Poster export failed: {e}")
+            return
+        finally:
+            poster.renderer.engine.shutdown()
+        self.finished_export.emit(f"🖼️ Saved {poster.width}x{poster.height} poster to "
+                                  f"{self.path} ({stats['seconds']:.0f} s)")
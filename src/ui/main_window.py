@@ -9,6 +9,7 @@ from PyQt6.QtGui import QPainter, QColor, QPen, QBrush, QFont, QLinearGradient
 from src.ui.donut_button import DonutButton
 from src.ui.fractal_viewer import FractalViewer
 from src.fractals.fractal_registry import FractalRegistry
+from src.utils.jit_warmup import start_warm_up
 
 
 class MainWindow(QMainWindow):
@@ -22,6 +23,9 @@ class MainWindow(QMainWindow):
         self.init_ui()
         self.setup_fractals()
         
+        # Compile (or load cached) kernels while the menu is shown
+        self.warm_up_thread = start_warm_up(config)
+        
     def init_ui(self):
         """Initialize user interface"""
         # Window setup
@@ -199,6 +203,11 @@ class MainWindow(QMainWindow):
             }
         """
     
+    def closeEvent(self, event):
+        """Stop background rendering before the window closes"""
+        self.fractal_viewer.shutdown()
+        super().closeEvent(event)
+    
     def keyPressEvent(self, event):
         """Handle keyboard shortcuts"""
         if event.key() == Qt.Key.Key_Escape:
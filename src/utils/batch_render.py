@@ -0,0 +1,355 @@
+"""Headless batch rendering of 2D fractals
+
+Renders a job file of fractal views to image files on a pool of processes,
+without Qt. A job file is JSON:
+
+    {
+      "defaults": {"width": 800, "height": 600, "max_iter": 256, "palette": "donut"},
+      "jobs": [
+        {"fractal": "Mandelbrot", "center": [-0.745, 0.113], "zoom": 64},
+        {"fractal": "Julia Set", "params": {"c_real": -0.8, "c_imag": 0.156},
+         "output": "dragon.png"},
+        {"fractal": "Julia Set",
+         "sweep": {"c_real": {"start": -1.0, "stop": 0.5, "num": 16},
+                   "c_imag": [0.0, 0.3, 0.6]}}
+      ]
+    }
+
+Each job takes ``fractal``, ``params``, ``center`` (numbers or decimal
+strings for deep zooms), ``zoom``, ``width``, ``height``, ``max_iter``,
+``palette`` and ``output`` (``.png``, or ``.npy`` for the raw iteration
+counts). ``sweep`` expands a job into the product of parameter values,
+given as lists or ``{"start", "stop", "num"}`` ranges.
+
+Every image is written by the worker that rendered it, under a temporary
+name that is renamed once complete, and logged to ``manifest.jsonl``.
+Jobs whose output already exists are skipped, so an interrupted batch
+continues where it stopped when run again:
+
+    python -m src.utils.batch_render jobs.json -o renders/
+    python -m src.utils.batch_render --julia-presets -o renders/
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+
+
+# Settings of a job that are not given explicitly
+JOB_DEFAULTS = {
+    "fractal": "Mandelbrot",
+    "params": {},
+    "center": None,
+    "zoom": None,
+    "width": 800,
+    "height": 600,
+    "max_iter": 256,
+    "palette": None,
+}
+
+MANIFEST = "manifest.jsonl"
+
+
+def expand_sweep(sweep):
+    """
+    Parameter combinations of a sweep
+
+    Args:
+        sweep: Dict of parameter name -> list of values or
+            {"start", "stop", "num"} range
+
+    Returns:
+        List of parameter dicts
+    """
+    names = list(sweep)
+    values = []
+    for name in names:
+        spec = sweep[name]
+        if isinstance(spec, dict):
+            spec = np.linspace(spec["start"], spec["stop"], int(spec["num"])).tolist()
+        values.append(list(spec))
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+
+def job_id(job):
+    """Stable digest of everything that affects a job's image"""
+    spec = {key: job[key] for key in JOB_DEFAULTS}
+    text = json.dumps(spec, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+def slug(text):
+    """File-name friendly version of a name"""
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "fractal"
+
+
+def expand_jobs(spec):
+    """
+    Turn a job file into the list of concrete jobs
+
+    Args:
+        spec: Parsed job file (dict with "defaults" and "jobs", or a list)
+
+    Returns:
+        List of job dicts with every setting filled in and an "output" name
+    """
+    if isinstance(spec, list):
+        spec = {"jobs": spec}
+    defaults = dict(JOB_DEFAULTS, **spec.get("defaults", {}))
+
+    jobs = []
+    for entry in spec.get("jobs", []):
+        base = dict(defaults, **entry)
+        sweep = base.pop("sweep", None)
+        combinations = expand_sweep(sweep) if sweep else [{}]
+        for values in combinations:
+            job = dict(base, params=dict(base["params"], **values))
+            if sweep or not job.get("output"):
+                # Named after the content, so a changed job never reuses an old image
+                stem = Path(job["output"]).stem if job.get("output") else slug(job["fractal"])
+                suffix = Path(job["output"]).suffix if job.get("output") else ".png"
+                job["output"] = f"{stem}-{job_id(job)}{suffix}"
+            jobs.append(job)
+    return jobs
+
+
+def julia_preset_jobs(**settings):
+    """Jobs for every JuliaSet.get_interesting_parameters entry"""
+    from src.fractals.fractal_2d.julia import JuliaSet
+
+    jobs = []
+    for preset in JuliaSet.get_interesting_parameters():
+        c = preset["c"]
+        jobs.append(dict(settings, fractal="Julia Set",
+                         params={"c_real": c.real, "c_imag": c.imag},
+                         output=f"julia-{slug(preset['name'])}.png"))
+    return jobs
+
+
+# Per-process state of the pool workers
+_worker = {}
+
+
+def init_worker(config):
+    """Pool initializer: keep the config; renderers are built on demand"""
+    _worker["config"] = config
+    _worker["renderers"] = {}
+
+
+def render_view(job, config=None, coordinator=None):
+    """
+    Compute the iteration counts of a job's view
+
+    Args:
+        job: Job dict (see JOB_DEFAULTS)
+        config: Application config, when not running in a pool worker
+        coordinator: distributed_render.Coordinator that computes the view
+            on its workers; the renderer is then not shared, so several
+            threads may call this at once
+
+    Returns:
+        (renderer, 2D int32 array of iteration counts)
+    """
+    from src.rendering.renderer_2d import Renderer2D
+
+    config = _worker.get("config", config) or {}
+    renderers = _worker.setdefault("renderers", {}) if coordinator is None else {}
+
+    # One renderer per frame size and process, reused across jobs
+    size = (int(job["width"]), int(job["height"]))
+    renderer = renderers.get(size)
+    if renderer is None:
+        renderer = Renderer2D(size, config, job["fractal"], **job["params"])
+        renderers[size] = renderer
+    else:
+        renderer.set_fractal(job["fractal"], **job["params"])
+    renderer.reset_view()
+    if job["center"] is not None:
+        renderer.set_center(*job["center"])
+    if job["zoom"] is not None:
+        renderer.set_zoom(job["zoom"])
+    if coordinator is not None:
+        return renderer, coordinator.compute_view(renderer, int(job["max_iter"]))
+    return renderer, renderer.compute_view(int(job["max_iter"]))
+
+
+def render_job(job, output_dir, config=None):
+    """
+    Render one job and write its output file
+
+    Returns:
+        Dict with the job's output, size and timings
+    """
+    start = time.perf_counter()
+    renderer, counts = render_view(job, config)
+    rendered = time.perf_counter()
+
+    path = Path(output_dir) / job["output"]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f".{path.name}.{os.getpid()}.part")
+    if path.suffix == ".npy":
+        with open(partial, "wb") as f:
+            np.save(f, counts)
+    else:
+        from PIL import Image
+
+        # Renderers are reused, so the scheme is set for every job
+        renderer.set_color_scheme(job["palette"] or renderer.palette.default_scheme)
+        # Antialiased like the viewer's frames when the config enables it
+        image = renderer.colorize(counts, int(job["max_iter"]))
+        image_format = Image.registered_extensions().get(path.suffix.lower(), "PNG")
+        Image.fromarray(image).save(partial, format=image_format)
+    os.replace(partial, path)
+
+    return {
+        "output": job["output"],
+        "fractal": job["fractal"],
+        "params": job["params"],
+        "render_seconds": round(rendered - start, 4),
+        "total_seconds": round(time.perf_counter() - start, 4),
+        "iterated_pixels": int(renderer.counters["iterated_pixels"]),
+        "supersampled_fraction": round(renderer.render_stats()["supersampled_fraction"], 4),
+    }
+
+
+def default_config():
+    """Application config set up for batch work (no caches, one thread)"""
+    from src.utils.config_loader import ConfigLoader
+
+    config = ConfigLoader.load_config()
+    performance = dict(config.get("performance", {}))
+    # Parallelism comes from the process pool; frames are not revisited
+    performance.update(multi_threading=False, cache_enabled=False)
+    config["performance"] = performance
+    return config
+
+
+def run_batch(jobs, output_dir, workers=None, force=False, config=None, log=print):
+    """
+    Render jobs on a process pool, skipping those already on disk
+
+    Args:
+        jobs: Concrete jobs from expand_jobs
+        output_dir: Directory for the images and manifest.jsonl
+        workers: Number of processes (default: one per CPU core)
+        force: Render jobs even if their output exists
+        config: Application config (default: config.json set up for batch)
+        log: Callable receiving progress lines
+
+    Returns:
+        Number of jobs rendered (failed jobs are logged and retried next run)
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    pending = [job for job in jobs if force or not (output_dir / job["output"]).exists()]
+    log(f"{len(jobs)} jobs, {len(jobs) - len(pending)} already done, {len(pending)} to render")
+    if not pending:
+        return 0
+
+    config = config if config is not None else default_config()
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending)))
+
+    # Compile (or load) the kernels once so the workers start from the cache
+    from src.utils.jit_warmup import warm_up
+    warm_up(sorted({job["fractal"] for job in pending}))
+
+    done = 0
+    failed = 0
+    started = time.perf_counter()
+    queue = iter(pending)
+    context = multiprocessing.get_context("spawn")
+    executor = ProcessPoolExecutor(workers, mp_context=context,
+                                   initializer=init_worker, initargs=(config,))
+    running_jobs = {}
+    try:
+        with open(output_dir / MANIFEST, "a", encoding="utf-8") as manifest:
+            def submit(job):
+                future = executor.submit(render_job, job, str(output_dir))
+                running_jobs[future] = job
+                return future
+
+            # Keep a bounded number of jobs in flight so huge batches stream
+            running = {submit(job) for job in itertools.islice(queue, 2 * workers)}
+            while running:
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    job = running_jobs.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # Left without output, so the next run retries it
+                        failed += 1
+                        result = {"output": job["output"], "error": repr(e)}
+                        log(f"✗ {job['output']}: {e}")
+                    else:
+                        done += 1
+                        log(f"[{done}/{len(pending)}] {result['output']} "
+                            f"({result['render_seconds']:.2f} s)")
+                    manifest.write(json.dumps(result) + "\n")
+                    manifest.flush()
+                for job in itertools.islice(queue, len(finished)):
+                    running.add(submit(job))
+    except KeyboardInterrupt:
+        # shutdown(cancel_futures=True) needs Python 3.9
+        for future in running_jobs:
+            future.cancel()
+        executor.shutdown(wait=False)
+        log(f"Interrupted after {done} jobs; run again to continue")
+        raise
+    executor.shutdown()
+
+    elapsed = time.perf_counter() - started
+    log(f"Rendered {done} jobs in {elapsed:.1f} s ({done / max(elapsed, 1e-9):.2f} jobs/s)"
+        + (f", {failed} failed" if failed else ""))
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render fractals in batch without the GUI")
+    parser.add_argument("jobs", nargs="?", help="job file (JSON)")
+    parser.add_argument("--julia-presets", action="store_true",
+                        help="render every interesting Julia Set parameter")
+    parser.add_argument("-o", "--output-dir", default="renders")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="number of processes (default: CPU cores)")
+    parser.add_argument("--size", default=None, help="default frame size WIDTHxHEIGHT")
+    parser.add_argument("--max-iter", type=int, default=None, help="default iteration limit")
+    parser.add_argument("--force", action="store_true", help="render jobs that are already done")
+    args = parser.parse_args(argv)
+
+    if not args.jobs and not args.julia_presets:
+        parser.error("give a job file or --julia-presets")
+
+    spec = {"defaults": {}, "jobs": []}
+    if args.jobs:
+        with open(args.jobs, "r", encoding="utf-8") as f:
+            loaded = json.load(f)
+        spec = {"jobs": loaded} if isinstance(loaded, list) else loaded
+    defaults = dict(spec.get("defaults", {}))
+    if args.size:
+        defaults["width"], defaults["height"] = (int(v) for v in args.size.lower().split("x"))
+    if args.max_iter:
+        defaults["max_iter"] = args.max_iter
+    jobs = list(spec.get("jobs", []))
+    if args.julia_presets:
+        jobs += julia_preset_jobs()
+
+    try:
+        run_batch(expand_jobs({"defaults": defaults, "jobs": jobs}),
+                  args.output_dir, args.workers, args.force)
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,433 @@
+"""Headless throughput benchmarks
+
+A fixed set of scenes times the fractal kernels, the 2D renderer, the
+colormap and the 3D ray marcher. Each scene first runs once on a tiny
+frame so that JIT compilation (or loading the kernel cache) is not
+timed, then runs repeatedly at full size. Reported are the wall time of
+the best and the median run, Mpixels/s and, for escape-time scenes,
+Giter/s: the iterations the frame represents (the sum of its iteration
+counts, interior pixels counting max_iter) per second, which stays
+comparable when an optimization skips work.
+
+Results are written as JSON and compared against a stored baseline:
+
+    python -m src.utils.benchmark list
+    python -m src.utils.benchmark run -o results.json [--scene kernel.*] [--scale 0.5]
+    python -m src.utils.benchmark compare baseline.json results.json [--threshold 0.1]
+
+``compare`` exits with status 1 when a scene got slower than the
+threshold allows.
+"""
+
+import argparse
+import datetime
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+
+# Version of the results file layout
+RESULTS_VERSION = 1
+
+# Warm-up frames are this many pixels tall (width keeps the aspect ratio)
+WARMUP_HEIGHT = 18
+
+# Renderers never answer a frame from a cache while being timed
+RENDER_CONFIG = {'performance': {'cache_enabled': False}}
+
+SCENES = {}
+
+
+def scene(name, description, width, height):
+    """Register a scene builder under name
+
+    The builder takes (width, height) and returns a Workload.
+    """
+    def register(build):
+        SCENES[name] = {"description": description, "width": width, "height": height,
+                        "build": build}
+        return build
+    return register
+
+
+class Workload:
+    """One timed unit of work of a scene"""
+
+    def __init__(self, run, max_iter=None):
+        """
+        Args:
+            run: Callable doing the work; returns an iteration buffer for
+                escape-time scenes, anything otherwise
+            max_iter: Iteration limit of an escape-time scene (None when
+                the scene has no iteration count)
+        """
+        self.run = run
+        self.max_iter = max_iter
+
+    def iterations(self, result):
+        """Iterations represented by an iteration buffer, or None"""
+        if self.max_iter is None:
+            return None
+        counts = np.minimum(np.asarray(result, dtype=np.float64), self.max_iter)
+        return int(np.floor(counts).sum())
+
+
+def grid(center_x, center_y, span, width, height):
+    """x and y coordinates of a frame whose height covers span"""
+    pixel = span / height
+    x = center_x + (np.arange(width) - (width - 1) / 2) * pixel
+    y = center_y + (np.arange(height) - (height - 1) / 2) * pixel
+    return x, y
+
+
+@scene("kernel.mandelbrot.overview", "Mandelbrot.calculate, whole set, 256 iterations",
+       1920, 1080)
+def _mandelbrot_overview(width, height):
+    from src.fractals.fractal_2d.mandelbrot import Mandelbrot
+    x, y = grid(-0.75, 0.0, 3.0, width, height)
+    return Workload(lambda: Mandelbrot.calculate(x, y, 256), 256)
+
+
+@scene("kernel.mandelbrot.seahorse", "Mandelbrot.calculate, Seahorse Valley, 1000 iterations",
+       1920, 1080)
+def _mandelbrot_seahorse(width, height):
+    from src.fractals.fractal_2d.mandelbrot import Mandelbrot
+    x, y = grid(-0.75, 0.1, 0.04, width, height)
+    return Workload(lambda: Mandelbrot.calculate(x, y, 1000), 1000)
+
+
+@scene("kernel.julia.overview", "JuliaSet.calculate, c = -0.8 + 0.156i, 500 iterations",
+       1920, 1080)
+def _julia_overview(width, height):
+    from src.fractals.fractal_2d.julia import JuliaSet
+    x, y = grid(0.0, 0.0, 2.4, width, height)
+    return Workload(lambda: JuliaSet.calculate(x, y, -0.8, 0.156, 500), 500)
+
+
+@scene("kernel.burning_ship.overview", "BurningShip.calculate, whole ship, 256 iterations",
+       1920, 1080)
+def _burning_ship_overview(width, height):
+    from src.fractals.fractal_2d.burning_ship import BurningShip
+    x, y = grid(-0.5, -0.5, 3.0, width, height)
+    return Workload(lambda: BurningShip.calculate(x, y, 256), 256)
+
+
+def renderer_2d(width, height, center, zoom, rendering=None):
+    """Headless Renderer2D on a fixed view, with every frame cache off"""
+    from src.rendering.renderer_2d import Renderer2D
+    config = dict(RENDER_CONFIG, rendering=rendering or {})
+    renderer = Renderer2D((width, height), config)
+    renderer.set_center(*center)
+    renderer.set_zoom(zoom)
+    return renderer
+
+
+def forget_frames(renderer):
+    """Drop what a renderer keeps from its last frame, so the next is computed afresh"""
+    renderer.last_result = None
+    renderer.last_view = None
+    renderer.iteration_state = None
+    renderer.aa_samples = None
+    renderer.reference = None
+
+
+def render_frame(renderer, max_iter):
+    """Workload rendering full frames (iterations and colors)"""
+    def run():
+        forget_frames(renderer)
+        renderer.render_array(max_iter)
+        return renderer.last_result
+    return Workload(run, max_iter)
+
+
+@scene("renderer2d.overview", "Renderer2D.render_array, whole Mandelbrot set, 256 iterations",
+       1920, 1080)
+def _renderer_overview(width, height):
+    return render_frame(renderer_2d(width, height, (-0.75, 0.0), 4 / 3), 256)
+
+
+@scene("renderer2d.seahorse", "Renderer2D.render_array, Seahorse Valley, 1000 iterations",
+       1920, 1080)
+def _renderer_seahorse(width, height):
+    return render_frame(renderer_2d(width, height, (-0.75, 0.1), 100), 1000)
+
+
+@scene("renderer2d.seahorse.smooth_aa",
+       "Renderer2D.render_array, Seahorse Valley, 1000 iterations, smooth coloring and "
+       "antialiasing", 1920, 1080)
+def _renderer_seahorse_smooth(width, height):
+    rendering = {'smooth_coloring': True, 'antialiasing': True}
+    return render_frame(renderer_2d(width, height, (-0.75, 0.1), 100, rendering), 1000)
+
+
+@scene("renderer2d.deep", "Renderer2D.render_array, perturbation at zoom 1e13, 2000 iterations",
+       1280, 720)
+def _renderer_deep(width, height):
+    center = ("-0.743643887037151", "0.131825904205330")
+    return render_frame(renderer_2d(width, height, center, 1e13), 2000)
+
+
+def colormap(width, height, rendering=None):
+    """Workload coloring a Seahorse Valley iteration buffer"""
+    renderer = renderer_2d(width, height, (-0.75, 0.1), 100, rendering)
+    data = renderer.compute_view(1000)
+    return Workload(lambda: renderer.apply_colormap(data, 1000))
+
+
+@scene("colormap.counts", "Renderer2D.apply_colormap, whole iteration counts", 1920, 1080)
+def _colormap_counts(width, height):
+    return colormap(width, height)
+
+
+@scene("colormap.smooth", "Renderer2D.apply_colormap, normalized iteration counts",
+       1920, 1080)
+def _colormap_smooth(width, height):
+    return colormap(width, height, {'smooth_coloring': True})
+
+
+@scene("colormap.equalized", "Renderer2D.apply_colormap, histogram-equalized smooth counts",
+       1920, 1080)
+def _colormap_equalized(width, height):
+    return colormap(width, height, {'smooth_coloring': True, 'histogram_equalization': True})
+
+
+@scene("renderer3d.mandelbulb", "Renderer3D.render_scene, Mandelbulb power 8", 640, 360)
+def _mandelbulb(width, height):
+    from PyQt6.QtCore import QSize
+    from src.rendering.renderer_3d import Renderer3D
+    renderer = Renderer3D(QSize(width, height), RENDER_CONFIG)
+    return Workload(lambda: renderer.render_scene(8))
+
+
+def select(patterns=None):
+    """Scene names matching any of the glob patterns (default: all)"""
+    if not patterns:
+        return list(SCENES)
+    names = [name for name in SCENES
+             if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)]
+    if not names:
+        raise ValueError(f"No scene matches {', '.join(patterns)}")
+    return names
+
+
+def run_scene(name, scale=1.0, repeat=5, budget=20.0):
+    """
+    Time one scene
+
+    Args:
+        name: Scene name
+        scale: Factor on the scene's frame width and height
+        repeat: Maximum timed runs
+        budget: Seconds after which no further run is started (at least
+            one run is always timed)
+
+    Returns:
+        Result dict of the scene
+    """
+    spec = SCENES[name]
+    width = max(1, round(spec["width"] * scale))
+    height = max(1, round(spec["height"] * scale))
+
+    # Compiles (or loads) every kernel the full-size frame uses
+    warm_height = min(height, WARMUP_HEIGHT)
+    warm_width = max(1, round(width * warm_height / height))
+    start = time.perf_counter()
+    warm = spec["build"](warm_width, warm_height)
+    warm.iterations(warm.run())
+    warm_up = time.perf_counter() - start
+
+    workload = spec["build"](width, height)
+    times = []
+    iterations = None
+    started = time.perf_counter()
+    while len(times) < repeat and (not times or time.perf_counter() - started < budget):
+        start = time.perf_counter()
+        result = workload.run()
+        times.append(time.perf_counter() - start)
+        if iterations is None:
+            iterations = workload.iterations(result)
+
+    best = min(times)
+    pixels = width * height
+    return {
+        "description": spec["description"],
+        "width": width,
+        "height": height,
+        "pixels": pixels,
+        "iterations": iterations,
+        "runs": len(times),
+        "times": times,
+        "best_s": best,
+        "median_s": statistics.median(times),
+        "mpixels_per_s": pixels / best / 1e6,
+        "giter_per_s": iterations / best / 1e9 if iterations is not None else None,
+        "warmup_s": warm_up,
+    }
+
+
+def machine_info():
+    """Describe the machine and software versions the results belong to"""
+    import numba
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                                capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "numba_threads": numba.config.NUMBA_NUM_THREADS,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "numba": numba.__version__,
+        "commit": commit or None,
+    }
+
+
+def run(patterns=None, scale=1.0, repeat=5, budget=20.0, log=print):
+    """
+    Run the selected scenes
+
+    Returns:
+        Results dict as written by ``main`` (see ``compare``)
+    """
+    results = {
+        "version": RESULTS_VERSION,
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "settings": {"scale": scale, "repeat": repeat, "budget_s": budget},
+        "scenes": {},
+    }
+    for name in select(patterns):
+        result = run_scene(name, scale, repeat, budget)
+        results["scenes"][name] = result
+        if log:
+            log(format_result(name, result))
+    return results
+
+
+def format_result(name, result):
+    """One table line of a scene result"""
+    giter = result["giter_per_s"]
+    giter = f"{giter:8.3f} Giter/s" if giter is not None else " " * 16
+    return (f"{name:32} {result['width']:>5}x{result['height']:<5} "
+            f"{result['best_s'] * 1000:10.1f} ms (median {result['median_s'] * 1000:8.1f}) "
+            f"{result['mpixels_per_s']:9.2f} Mpix/s {giter}")
+
+
+def compare(baseline, current, threshold=0.1):
+    """
+    Compare the best times of two result sets
+
+    A scene regressed when its best time grew by more than threshold
+    (relative). Scenes missing from either set or timed at a different
+    frame size are reported but not judged.
+
+    Returns:
+        (rows, regressed): rows of (scene, baseline s, current s, change,
+        verdict) and the names of regressed scenes
+    """
+    rows = []
+    regressed = []
+    for name in sorted(set(baseline["scenes"]) | set(current["scenes"])):
+        old = baseline["scenes"].get(name)
+        new = current["scenes"].get(name)
+        if old is None or new is None:
+            rows.append((name, old and old["best_s"], new and new["best_s"], None,
+                         "only in " + ("current" if old is None else "baseline")))
+            continue
+        if (old["width"], old["height"]) != (new["width"], new["height"]):
+            rows.append((name, old["best_s"], new["best_s"], None, "frame size differs"))
+            continue
+        change = new["best_s"] / old["best_s"] - 1
+        if change > threshold:
+            verdict = "REGRESSION"
+            regressed.append(name)
+        elif change < -threshold:
+            verdict = "faster"
+        else:
+            verdict = "ok"
+        rows.append((name, old["best_s"], new["best_s"], change, verdict))
+    return rows, regressed
+
+
+def load(path):
+    """Read a results file"""
+    with open(path) as f:
+        results = json.load(f)
+    if results.get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path}: unsupported results version {results.get('version')}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fractal kernels and renderers")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="list the scenes")
+
+    run_parser = commands.add_parser("run", help="run scenes and report throughput")
+    run_parser.add_argument("-o", "--output", help="write results as JSON")
+    run_parser.add_argument("--scene", action="append",
+                            help="glob pattern of scenes to run (repeatable; default all)")
+    run_parser.add_argument("--scale", type=float, default=1.0,
+                            help="factor on every scene's frame size")
+    run_parser.add_argument("--repeat", type=int, default=5, help="maximum timed runs per scene")
+    run_parser.add_argument("--budget", type=float, default=20.0,
+                            help="seconds per scene after which no run is started")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="relative slowdown counted as a regression")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for name, spec in SCENES.items():
+            print(f"{name:32} {spec['width']:>5}x{spec['height']:<5} {spec['description']}")
+        return
+
+    if args.command == "run":
+        try:
+            select(args.scene)
+        except ValueError as e:
+            parser.error(str(e))
+        machine = machine_info()
+        print(f"{machine['processor']}, {machine['cpus']} CPUs, numba {machine['numba']}, "
+              f"{machine['numba_threads']} threads")
+        results = run(args.scene, args.scale, args.repeat, args.budget)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+            print(f"✓ Results written to {args.output}")
+        return
+
+    baseline = load(args.baseline)
+    current = load(args.current)
+    if baseline["machine"].get("processor") != current["machine"].get("processor") or \
+            baseline["machine"].get("cpus") != current["machine"].get("cpus"):
+        print("⚠ Results come from different machines")
+    rows, regressed = compare(baseline, current, args.threshold)
+    for name, old, new, change, verdict in rows:
+        old = f"{old * 1000:10.1f} ms" if old is not None else " " * 13
+        new = f"{new * 1000:10.1f} ms" if new is not None else " " * 13
+        change = f"{change:+7.1%}" if change is not None else " " * 7
+        print(f"{name:32} {old} -> {new} {change}  {verdict}")
+    if regressed:
+        print(f"✗ {len(regressed)} regression(s) beyond {args.threshold:.0%}")
+        sys.exit(1)
+    print("✓ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Color palettes - lookup-table based coloring of iteration buffers"""
+
+from typing import Dict, Any
+
+import numpy as np
+
+
+def hex_to_rgb(value: str):
+    """Convert '#RRGGBB' to an (r, g, b) tuple of floats in 0..255"""
+    value = value.lstrip('#')
+    return tuple(float(int(value[i:i + 2], 16)) for i in (0, 2, 4))
+
+
+class ColorPalette:
+    """Precomputed lookup tables for the color schemes in config.json
+
+    A lookup table has one RGB entry per iteration count, so coloring a
+    whole iteration buffer is a single indexing operation. Normalized
+    (fractional) counts index a finer table with SMOOTH_STEPS entries per
+    iteration. Tables are cached per (scheme, max_iter).
+    """
+
+    INSIDE_COLOR = (0, 0, 0)
+
+    # Table entries per iteration for normalized counts
+    SMOOTH_STEPS = 16
+    # Largest fine table; the steps per iteration shrink for huge max_iter
+    SMOOTH_TABLE_SIZE = 1 << 20
+
+    def __init__(self, config):
+        colors = (config or {}).get('colors', {})
+        self.schemes: Dict[str, Any] = dict(colors.get('schemes') or {'donut': {}})
+        self.scheme = colors.get('default_scheme', 'donut')
+        if self.scheme not in self.schemes:
+            self.scheme = next(iter(self.schemes))
+        self.default_scheme = self.scheme
+        self._luts = {}
+
+    def scheme_names(self):
+        """Names of all available schemes"""
+        return list(self.schemes.keys())
+
+    def set_scheme(self, name: str):
+        """Select the active scheme"""
+        if name not in self.schemes:
+            raise KeyError(f"Unknown color scheme: {name}")
+        self.scheme = name
+
+    def lut(self, max_iter: int, scheme: str = None) -> np.ndarray:
+        """
+        Get the lookup table for a scheme
+
+        Args:
+            max_iter: Maximum iterations (index of the inside color)
+            scheme: Scheme name, defaults to the active scheme
+
+        Returns:
+            (max_iter + 1, 3) uint8 array indexed by iteration count
+        """
+        scheme = scheme or self.scheme
+        key = (scheme, max_iter)
+        table = self._luts.get(key)
+        if table is None:
+            t = np.arange(max_iter + 1, dtype=np.float64) / max(max_iter, 1)
+            table = self.gradient(scheme, t)
+            table[max_iter] = self.INSIDE_COLOR
+            self._luts[key] = table
+        return table
+
+    def smooth_steps(self, max_iter: int) -> int:
+        """Fine table entries per iteration for a given max_iter"""
+        return max(1, min(self.SMOOTH_STEPS, self.SMOOTH_TABLE_SIZE // max(max_iter, 1)))
+
+    def smooth_lut(self, max_iter: int, scheme: str = None) -> np.ndarray:
+        """
+        Get the fine lookup table for normalized counts
+
+        Args:
+            max_iter: Maximum iterations
+            scheme: Scheme name, defaults to the active scheme
+
+        Returns:
+            (max_iter * smooth_steps + 1, 3) uint8 array indexed by
+            count * smooth_steps; the last entry is the inside color
+        """
+        scheme = scheme or self.scheme
+        key = (scheme, max_iter, 'smooth')
+        table = self._luts.get(key)
+        if table is None:
+            size = max(max_iter, 1) * self.smooth_steps(max_iter)
+            table = self.gradient(scheme, np.arange(size + 1, dtype=np.float64) / size)
+            table[size] = self.INSIDE_COLOR
+            self._luts[key] = table
+        return table
+
+    def histogram(self, data: np.ndarray, max_iter: int) -> np.ndarray:
+        """
+        Histogram equalization of a frame, in one bincount and cumsum pass
+
+        Maps each whole count to max_iter times the fraction of escaped
+        pixels below it, so every color of the gradient covers about the
+        same area of the frame however deep the view is.
+
+        Args:
+            data: Iteration buffer (int counts or normalized counts)
+            max_iter: Maximum iterations used to compute data
+
+        Returns:
+            (max_iter + 1,) float32 array of equalized counts; apply()
+            interpolates it for normalized counts
+        """
+        counts = data.reshape(-1)
+        if counts.dtype.kind == 'f':
+            counts = counts.astype(np.intp)
+        histogram = np.bincount(counts, minlength=max_iter + 1)[:max_iter]
+        escaped = histogram.sum()
+        if escaped == 0:
+            return np.arange(max_iter + 1, dtype=np.float32)
+        positions = np.zeros(max_iter + 1, dtype=np.float64)
+        np.cumsum(histogram, out=positions[1:])
+        return (positions * (max_iter / escaped)).astype(np.float32)
+
+    def gradient(self, scheme: str, t: np.ndarray) -> np.ndarray:
+        """Evaluate a scheme at normalized positions t (0..1) as uint8 RGB"""
+        spec = self.schemes.get(scheme, {})
+        rgb = np.empty((len(t), 3), dtype=np.float64)
+
+        if 'start' in spec and 'end' in spec:
+            # Two-stop linear gradient
+            start = np.array(hex_to_rgb(spec['start']))
+            end = np.array(hex_to_rgb(spec['end']))
+            rgb[:] = start + (end - start) * t[:, None]
+        elif spec.get('gradient'):
+            # Rainbow - hue cycles with iteration count (HSV, s=0.85, v=1)
+            hue = (t % 1.0) * 6.0
+            for channel, n in enumerate((5.0, 3.0, 1.0)):
+                k = (n + hue) % 6.0
+                rgb[:, channel] = 255.0 * (1.0 - 0.85 * np.clip(np.minimum(k, 4.0 - k), 0.0, 1.0))
+        else:
+            # Donut-themed pink to orange gradient
+            rgb[:, 0] = 255 * (0.8 + 0.2 * np.sin(t * 10))
+            rgb[:, 1] = 182 * (0.7 + 0.3 * np.cos(t * 8))
+            rgb[:, 2] = 193 * (0.5 + 0.5 * np.sin(t * 6))
+
+        return np.clip(rgb, 0, 255).astype(np.uint8)
+
+    def apply(self, data: np.ndarray, max_iter: int, scheme: str = None,
+              equalization: np.ndarray = None) -> np.ndarray:
+        """
+        Map an iteration buffer to an RGB image in one vectorized pass
+
+        Args:
+            data: Array of iteration counts, or float normalized counts
+            max_iter: Maximum iterations used to compute data
+            scheme: Scheme name, defaults to the active scheme
+            equalization: Equalized counts from histogram(), if any
+
+        Returns:
+            data.shape + (3,) uint8 image
+        """
+        if equalization is not None:
+            if data.dtype.kind == 'f':
+                # Interpolate between the equalized whole counts, as
+                # offset + value * slope per count
+                whole = data.astype(np.intp)
+                np.minimum(whole, max_iter - 1, out=whole)
+                slope = np.diff(equalization)
+                offset = equalization[:-1] - np.arange(max_iter, dtype=np.float32) * slope
+                data = offset[whole] + data * slope[whole]
+            else:
+                data = equalization[np.clip(data, 0, max_iter)]
+        if data.dtype.kind != 'f':
+            table = self.lut(max_iter, scheme)
+            index = np.clip(data, 0, max_iter).astype(np.intp, copy=False)
+            return table[index]
+
+        table = self.smooth_lut(max_iter, scheme)
+        index = (data * self.smooth_steps(max_iter)).astype(np.intp)
+        np.clip(index, 0, len(table) - 1, out=index)
+        return table[index]
@@ -0,0 +1,685 @@
+"""Distributed tile rendering of 2D fractals over TCP
+
+A coordinator splits a view into tiles and hands them to worker processes,
+on this machine or others, that connect to it over TCP. A tile job names
+the fractal, its parameters, the frame size, the view (grid origin and
+zoom step) and the tile's column and row range of the pixel grid, plus
+max_iter, so a worker reproduces exactly what the local renderer would
+compute, deep zoom included. Results come back as raw arrays and are
+pasted into the frame.
+
+Scheduling:
+
+- Tiles are handed out most expensive first. The cost of every tile is
+  estimated from a preview of the view at 1/8 resolution, so the long
+  tiles start early and the short ones fill the gaps at the end.
+- Workers pull: each keeps only ``window`` tiles in flight, so a fast
+  worker simply comes back for more.
+- A worker that disconnects (or dies) has its tiles put back in the queue.
+  A tile that has been out for longer than ``timeout`` is handed out
+  again as well; whichever copy finishes first is used.
+
+Messages are a fixed header (JSON length, payload length), a JSON object
+and an optional binary payload:
+
+    python -m src.utils.distributed_render worker --connect coordinator:7420
+    python -m src.utils.distributed_render render --listen 0.0.0.0:7420 --workers 4 \\
+        --center -0.75 0.1 --zoom 8 --size 16384x16384 -o poster.png
+    python -m src.utils.distributed_render render --local-workers 4 \\
+        --size 4096x4096 -o poster.png
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import os
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+DEFAULT_PORT = 7420
+PROTOCOL_VERSION = 1
+
+# JSON length, payload length
+FRAME = struct.Struct(">II")
+
+
+def send_message(sock, header, payload=b""):
+    """Send one message: a JSON header and an optional binary payload"""
+    data = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    payload = memoryview(payload).cast("B")
+    sock.sendall(FRAME.pack(len(data), len(payload)) + data)
+    if len(payload):
+        sock.sendall(payload)
+
+
+def recv_exact(sock, size):
+    """Receive exactly size bytes"""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            raise ConnectionError("connection closed")
+        received += n
+    return buffer
+
+
+def recv_message(sock):
+    """
+    Receive one message
+
+    Returns:
+        (header dict, payload bytearray)
+
+    Raises:
+        ConnectionError: If the peer closed the connection
+    """
+    header_size, payload_size = FRAME.unpack(recv_exact(sock, FRAME.size))
+    header = json.loads(recv_exact(sock, header_size).decode("utf-8"))
+    return header, recv_exact(sock, payload_size)
+
+
+def parse_address(text, default_host="127.0.0.1"):
+    """'host:port', 'host' or ':port' -> (host, port)"""
+    host, _, port = text.rpartition(":") if ":" in text else (text, "", "")
+    return host or default_host, int(port or DEFAULT_PORT)
+
+
+def tile_job(renderer, view, cols, rows, max_iter):
+    """
+    Describe a block of a renderer's view as a tile job
+
+    Args:
+        renderer: Renderer2D whose fractal and frame size are used
+        view: (origin_x, origin_y, zoom_index)
+        cols: (start, stop) column range relative to origin_x
+        rows: (start, stop) row range relative to origin_y
+        max_iter: Maximum iterations
+
+    Returns:
+        JSON-serializable dict
+    """
+    return {
+        "fractal": renderer.fractal_name,
+        "params": renderer.fractal_params,
+        "size": [renderer.width, renderer.height],
+        "view": [int(v) for v in view],
+        "cols": [int(c) for c in cols],
+        "rows": [int(r) for r in rows],
+        "max_iter": int(max_iter),
+        "smooth": bool(renderer.smooth),
+        "subdivision": bool(renderer.subdivision),
+        "tile": int(renderer.engine.tile_size),
+    }
+
+
+# Renderers of a worker process, one per frame size, fractal and parameters
+_renderers = {}
+MAX_RENDERERS = 8
+
+
+def compute_tile(job, config):
+    """
+    Compute a tile job (worker side)
+
+    Returns:
+        (2D array of iteration counts of the tile, work counters)
+    """
+    from src.rendering.renderer_2d import Renderer2D
+
+    size = tuple(job["size"])
+    key = (size, job["fractal"], tuple(sorted(job["params"].items())))
+    renderer = _renderers.get(key)
+    if renderer is None:
+        renderer = Renderer2D(size, config, job["fractal"], **job["params"])
+        if len(_renderers) >= MAX_RENDERERS:
+            _renderers.pop(next(iter(_renderers))).engine.shutdown()
+        _renderers[key] = renderer
+    renderer.set_smooth_coloring(job["smooth"])
+    renderer.subdivision = job["subdivision"]
+    # Subdivision fills depend on the tile grid; use the coordinator's
+    renderer.engine.tile_size = job["tile"]
+    renderer.reset_counters()
+    block = renderer.compute_pixels(tuple(job["view"]), np.arange(*job["cols"]),
+                                    np.arange(*job["rows"]), job["max_iter"])
+    return block, {key: int(value) for key, value in renderer.counters.items()}
+
+
+def run_worker(address, config=None, connect_timeout=30.0, log=print):
+    """
+    Serve tile jobs for a coordinator until it shuts the connection down
+
+    Args:
+        address: (host, port) of the coordinator
+        config: Application config (default: config.json)
+        connect_timeout: Seconds to keep retrying while the coordinator starts
+        log: Callable receiving progress lines
+    """
+    if config is None:
+        from src.utils.config_loader import ConfigLoader
+        config = ConfigLoader.load_config()
+    # Tiles are never revisited by a worker
+    config = dict(config, performance=dict(config.get("performance", {}),
+                                           cache_enabled=False))
+
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        try:
+            sock = socket.create_connection(address)
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    send_message(sock, {"type": "hello", "version": PROTOCOL_VERSION, "name": name,
+                        "cores": os.cpu_count()})
+    log(f"Worker {name} connected to {address[0]}:{address[1]}")
+
+    tiles = 0
+    try:
+        while True:
+            try:
+                header, _ = recv_message(sock)
+            except ConnectionError:
+                break
+            if header["type"] == "shutdown":
+                break
+            start = time.perf_counter()
+            try:
+                block, counters = compute_tile(header["job"], config)
+                block = np.ascontiguousarray(block)
+            except Exception as e:
+                send_message(sock, {"type": "error", "id": header["id"], "error": repr(e)})
+                continue
+            send_message(sock, {"type": "result", "id": header["id"],
+                                "dtype": block.dtype.str, "shape": block.shape,
+                                "seconds": time.perf_counter() - start,
+                                "counters": counters}, block.data)
+            tiles += 1
+    finally:
+        sock.close()
+        for renderer in _renderers.values():
+            renderer.engine.shutdown()
+        _renderers.clear()
+    log(f"Worker {name} done after {tiles} tiles")
+
+
+class TileTask:
+    """One tile of a batch, possibly out at several workers"""
+
+    def __init__(self, batch, job, bounds, cost):
+        self.batch = batch
+        self.job = job
+        # (row0, row1, col0, col1) in the batch's result
+        self.bounds = bounds
+        self.cost = cost
+        self.links = set()
+        self.sent = 0.0
+        self.attempts = 0
+        self.done = False
+
+
+class TileBatch:
+    """The tiles of one compute_pixels call and the array they fill"""
+
+    def __init__(self, renderer, height, width):
+        self.renderer = renderer
+        self.result = None
+        self.shape = (height, width)
+        self.remaining = 0
+        self.error = None
+
+
+class WorkerLink(threading.Thread):
+    """Coordinator side of one worker connection
+
+    Keeps up to ``window`` tiles in flight on the worker and reads their
+    results; when the connection drops, its tiles go back to the queue.
+    """
+
+    def __init__(self, coordinator, sock, address):
+        super().__init__(daemon=True)
+        self.coordinator = coordinator
+        self.sock = sock
+        self.address = address
+        self.name = f"{address[0]}:{address[1]}"
+        self.in_flight = {}
+        self.tiles = 0
+        self.busy_seconds = 0.0
+        self.closed = False
+
+    def run(self):
+        coordinator = self.coordinator
+        try:
+            hello, _ = recv_message(self.sock)
+            if hello.get("type") != "hello" or hello.get("version") != PROTOCOL_VERSION:
+                raise ConnectionError(f"unexpected greeting {hello}")
+            self.name = hello.get("name", self.name)
+            coordinator.joined(self)
+
+            while not self.closed:
+                tasks = coordinator.take(self)
+                for task_id, task in tasks:
+                    send_message(self.sock, {"type": "tile", "id": task_id, "job": task.job})
+                if not self.in_flight:
+                    continue
+                header, payload = recv_message(self.sock)
+                coordinator.complete(self, header, payload)
+        except (OSError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.closed = True
+            self.sock.close()
+            coordinator.lost(self)
+
+    def close(self):
+        """Ask the worker to exit and drop the connection"""
+        self.closed = True
+        try:
+            send_message(self.sock, {"type": "shutdown"})
+        except OSError:
+            pass
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class Coordinator:
+    """Renders views of a Renderer2D on worker processes connected over TCP"""
+
+    # Tiles handed to a worker before it returns one
+    DEFAULT_WINDOW = 2
+    # Errors a tile may cause before its batch fails
+    MAX_ATTEMPTS = 3
+    # Preview step used to estimate tile costs
+    COST_STEP = 8
+
+    def __init__(self, host="127.0.0.1", port=0, tile_size=128, window=DEFAULT_WINDOW,
+                 timeout=120.0, estimate=True, log=print):
+        """
+        Args:
+            host: Interface to listen on ("0.0.0.0" for remote workers)
+            port: Port to listen on (0: any free port, see ``address``)
+            tile_size: Edge of the square tiles, in pixels; rounded to a
+                multiple of the renderer's tile size, so that workers
+                subdivide the same tiles as a local render would
+            window: Tiles in flight per worker
+            timeout: Seconds after which a tile still out is handed out again
+            estimate: Order tiles by a cost estimate from a low resolution preview
+            log: Callable receiving progress lines
+        """
+        self.tile_size = tile_size
+        self.window = window
+        self.timeout = timeout
+        self.estimate = estimate
+        self.log = log
+        self.server = socket.create_server((host, port))
+        self.address = self.server.getsockname()[:2]
+        self.links = []
+        self.processes = []
+        self._condition = threading.Condition()
+        self._queue = []
+        self._tasks = {}
+        self._ids = itertools.count()
+        self._closed = False
+        self._acceptor = threading.Thread(target=self._accept, daemon=True)
+        self._acceptor.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                sock, address = self.server.accept()
+            except OSError:
+                return
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            WorkerLink(self, sock, address).start()
+
+    @property
+    def worker_count(self):
+        """Number of connected workers"""
+        with self._condition:
+            return len(self.links)
+
+    def spawn_local_workers(self, count, threads=None):
+        """
+        Start worker processes on this machine
+
+        Args:
+            count: Number of processes
+            threads: Render threads per process (default: cores / count)
+        """
+        threads = threads or max(1, (os.cpu_count() or 1) // count)
+        host = "127.0.0.1" if self.address[0] in ("0.0.0.0", "") else self.address[0]
+        root = Path(__file__).resolve().parents[2]
+        for _ in range(count):
+            self.processes.append(subprocess.Popen(
+                [sys.executable, "-m", "src.utils.distributed_render", "worker",
+                 "--connect", f"{host}:{self.address[1]}", "--threads", str(threads),
+                 "--quiet"],
+                cwd=root))
+
+    def wait_for_workers(self, count, timeout=60.0):
+        """Block until count workers are connected; False on timeout"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while len(self.links) < count:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def tile_edge(self, renderer):
+        """Tile edge for a renderer: tile_size rounded to its engine's tiles"""
+        engine_tile = renderer.engine.tile_size
+        return engine_tile * max(1, round(self.tile_size / engine_tile))
+
+    def band_rows(self, renderer):
+        """Rows per band of a renderer's frame that keep every worker busy"""
+        size = self.tile_edge(renderer)
+        tiles_across = -(-renderer.width // size)
+        wanted = 4 * max(1, self.worker_count) * self.window
+        return size * max(1, -(-wanted // tiles_across))
+
+    def compute_view(self, renderer, max_iter):
+        """
+        Iteration buffer of a renderer's current view
+
+        Matches a fresh Renderer2D.compute_view: with the tile cache
+        enabled, whole tiles of the cache grid are computed and cropped,
+        like Renderer2D.compute_tiled does.
+        """
+        view = renderer.current_view()
+        width, height = renderer.width, renderer.height
+        if not renderer.tile_cache.enabled:
+            return self.compute_pixels(renderer, view, np.arange(width), np.arange(height),
+                                       max_iter)
+        size = renderer.tile_cache.tile_size
+        left, top = view[0] % size, view[1] % size
+        cols = np.arange(-left, -(-(left + width) // size) * size - left)
+        rows = np.arange(-top, -(-(top + height) // size) * size - top)
+        block = self.compute_pixels(renderer, view, cols, rows, max_iter)
+        return block[top:top + height, left:left + width].copy()
+
+    def compute_pixels(self, renderer, view, cols, rows, max_iter):
+        """
+        Compute a block of a view on the workers, like Renderer2D.compute_pixels
+
+        Args:
+            renderer: Renderer2D that defines fractal and frame size
+            view: (origin_x, origin_y, zoom_index)
+            cols: Contiguous array of column indices relative to origin_x
+            rows: Contiguous array of row indices relative to origin_y
+            max_iter: Maximum iterations
+
+        Returns:
+            2D array of iteration counts
+
+        Raises:
+            RenderCancelled: If the calling thread's render was cancelled
+            RuntimeError: If a tile failed on every attempt
+        """
+        from src.rendering.tile_engine import check_cancelled
+
+        col0, row0 = int(cols[0]), int(rows[0])
+        height, width = len(rows), len(cols)
+        size = self.tile_edge(renderer)
+        blocks = [(i, min(i + size, height), j, min(j + size, width))
+                  for i in range(0, height, size) for j in range(0, width, size)]
+        costs = self.estimate_costs(renderer, view, cols, rows, max_iter, blocks)
+
+        batch = TileBatch(renderer, height, width)
+        with self._condition:
+            for (i0, i1, j0, j1), cost in zip(blocks, costs):
+                job = tile_job(renderer, view, (col0 + j0, col0 + j1),
+                               (row0 + i0, row0 + i1), max_iter)
+                self._push(next(self._ids), TileTask(batch, job, (i0, i1, j0, j1), cost))
+            batch.remaining = len(blocks)
+            self._condition.notify_all()
+
+        try:
+            with self._condition:
+                while batch.remaining and batch.error is None:
+                    self._condition.wait(0.25)
+                    self._resubmit_overdue()
+                    self._condition.release()
+                    try:
+                        check_cancelled()
+                    finally:
+                        self._condition.acquire()
+        finally:
+            with self._condition:
+                # Forget whatever is left of the batch (cancelled or failed)
+                for task_id, task in list(self._tasks.items()):
+                    if task.batch is batch:
+                        task.done = True
+                        del self._tasks[task_id]
+        if batch.error is not None:
+            raise RuntimeError(batch.error)
+        return batch.result
+
+    def estimate_costs(self, renderer, view, cols, rows, max_iter, blocks):
+        """Relative cost of every block, from a preview at 1/COST_STEP resolution"""
+        if not self.estimate:
+            return [(i1 - i0) * (j1 - j0) for i0, i1, j0, j1 in blocks]
+        step = self.COST_STEP
+        preview = renderer.compute_pixels(view, cols[::step], rows[::step], max_iter)
+        preview = np.asarray(preview, dtype=np.float64) + 1.0
+        return [float(preview[i0 // step:-(-i1 // step), j0 // step:-(-j1 // step)].sum())
+                for i0, i1, j0, j1 in blocks]
+
+    def _push(self, task_id, task):
+        self._tasks[task_id] = task
+        heapq.heappush(self._queue, (-task.cost, task_id))
+
+    def _resubmit_overdue(self):
+        """Queue again the tiles that have been out longer than the timeout"""
+        now = time.monotonic()
+        for task_id, task in self._tasks.items():
+            if not task.done and task.links and now - task.sent > self.timeout:
+                task.sent = now
+                heapq.heappush(self._queue, (-task.cost, task_id))
+                self.log(f"Tile {task_id} overdue, handing it out again")
+
+    def take(self, link):
+        """
+        Tiles for a worker to start (called by its link thread)
+
+        Blocks while the worker has nothing in flight and nothing is queued.
+
+        Returns:
+            List of (task id, task)
+        """
+        with self._condition:
+            while not link.in_flight and not self._queue and not link.closed:
+                self._condition.wait(0.5)
+            taken = []
+            # Overdue tiles this worker already has stay queued for the others
+            held = []
+            while self._queue and len(link.in_flight) < self.window:
+                entry = heapq.heappop(self._queue)
+                task = self._tasks.get(entry[1])
+                if task is None or task.done:
+                    continue
+                if link in task.links:
+                    held.append(entry)
+                    continue
+                task.links.add(link)
+                task.sent = time.monotonic()
+                link.in_flight[entry[1]] = task
+                taken.append((entry[1], task))
+            for entry in held:
+                heapq.heappush(self._queue, entry)
+            return taken
+
+    def complete(self, link, header, payload):
+        """Handle a result or error message from a worker"""
+        with self._condition:
+            task = link.in_flight.pop(header.get("id"), None)
+            if task is None:
+                return
+            task.links.discard(link)
+            if task.done:
+                return
+            batch = task.batch
+            if header["type"] == "error":
+                task.attempts += 1
+                self.log(f"Tile {header['id']} failed on {link.name}: {header['error']}")
+                if task.attempts >= self.MAX_ATTEMPTS:
+                    batch.error = f"tile {task.job['cols']}x{task.job['rows']}: {header['error']}"
+                    self._condition.notify_all()
+                elif not task.links:
+                    heapq.heappush(self._queue, (-task.cost, header["id"]))
+                    self._condition.notify_all()
+                return
+
+            block = np.frombuffer(payload, dtype=np.dtype(header["dtype"]))
+            block = block.reshape(header["shape"])
+            if batch.result is None:
+                batch.result = np.empty(batch.shape, dtype=block.dtype)
+            i0, i1, j0, j1 = task.bounds
+            batch.result[i0:i1, j0:j1] = block
+            task.done = True
+            del self._tasks[header["id"]]
+            batch.remaining -= 1
+            batch.renderer.count(**header.get("counters", {}))
+            link.tiles += 1
+            link.busy_seconds += header.get("seconds", 0.0)
+            self._condition.notify_all()
+
+    def joined(self, link):
+        """Register a worker that completed its greeting"""
+        with self._condition:
+            self.links.append(link)
+            self._condition.notify_all()
+        self.log(f"Worker {link.name} joined ({len(self.links)} connected)")
+
+    def lost(self, link):
+        """Put the tiles of a dropped worker back in the queue"""
+        with self._condition:
+            if link in self.links:
+                self.links.remove(link)
+            requeued = 0
+            for task_id, task in link.in_flight.items():
+                task.links.discard(link)
+                if not task.done and not task.links:
+                    heapq.heappush(self._queue, (-task.cost, task_id))
+                    requeued += 1
+            link.in_flight.clear()
+            self._condition.notify_all()
+        if not self._closed:
+            self.log(f"Worker {link.name} lost, {requeued} tiles requeued "
+                     f"({len(self.links)} connected)")
+
+    def stats(self):
+        """Tiles and busy seconds per connected worker"""
+        with self._condition:
+            return {link.name: {"tiles": link.tiles, "seconds": round(link.busy_seconds, 3)}
+                    for link in self.links}
+
+    def close(self):
+        """Shut the workers down and stop listening"""
+        self._closed = True
+        with self._condition:
+            links = list(self.links)
+            self._condition.notify_all()
+        for link in links:
+            link.close()
+        self.server.close()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.processes = []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distributed 2D fractal rendering")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    worker = commands.add_parser("worker", help="serve tiles for a coordinator")
+    worker.add_argument("--connect", default=f"127.0.0.1:{DEFAULT_PORT}",
+                        help="coordinator HOST:PORT")
+    worker.add_argument("--threads", type=int, default=None,
+                        help="render threads (default: performance.worker_threads)")
+    worker.add_argument("--quiet", action="store_true")
+
+    render = commands.add_parser("render", help="render a poster on the workers")
+    render.add_argument("--listen", default=f"127.0.0.1:{DEFAULT_PORT}",
+                        help="HOST:PORT workers connect to")
+    render.add_argument("--workers", type=int, default=0,
+                        help="remote workers to wait for before starting")
+    render.add_argument("--local-workers", type=int, default=0,
+                        help="worker processes to start on this machine")
+    render.add_argument("--fractal", default="Mandelbrot")
+    render.add_argument("--center", nargs=2, metavar=("X", "Y"))
+    render.add_argument("--zoom", type=float, default=None)
+    render.add_argument("--size", default="8192x8192", help="image size WIDTHxHEIGHT")
+    render.add_argument("--max-iter", type=int, default=256)
+    render.add_argument("--palette", default=None)
+    render.add_argument("--tile", type=int, default=128, help="tile edge in pixels")
+    render.add_argument("--counts", action="store_true",
+                        help="store raw iteration counts (.npy output)")
+    render.add_argument("-o", "--output", required=True, help="output .png or .npy")
+    args = parser.parse_args(argv)
+
+    from src.utils.config_loader import ConfigLoader
+    config = ConfigLoader.load_config()
+
+    if args.command == "worker":
+        if args.threads:
+            config["performance"] = dict(config.get("performance", {}), multi_threading=True,
+                                         worker_threads=args.threads)
+        log = (lambda *_: None) if args.quiet else print
+        run_worker(parse_address(args.connect), config, log=log)
+        return
+
+    from src.utils.poster_export import PosterExport
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    host, port = parse_address(args.listen)
+    with Coordinator(host, port, tile_size=args.tile,
+                     log=lambda line: print(line, file=sys.stderr)) as coordinator:
+        if args.local_workers:
+            coordinator.spawn_local_workers(args.local_workers)
+        expected = max(1, args.local_workers + args.workers)
+        print(f"Listening on {coordinator.address[0]}:{coordinator.address[1]}, "
+              f"waiting for {expected} workers", file=sys.stderr)
+        if not coordinator.wait_for_workers(expected, timeout=3600):
+            sys.exit("workers did not connect")
+
+        poster = PosterExport(args.fractal, width, height, args.center, args.zoom,
+                              args.max_iter, palette=args.palette, config=config)
+        stats = poster.render(args.output, args.counts, coordinator=coordinator)
+        for name, worker_stats in coordinator.stats().items():
+            print(f"  {name}: {worker_stats['tiles']} tiles, {worker_stats['seconds']:.1f} s",
+                  file=sys.stderr)
+    megapixels = width * height / 1e6
+    print(f"Wrote {args.output}: {width}x{height} ({megapixels:.0f} Mpixels) in "
+          f"{stats['seconds']:.1f} s ({megapixels / stats['seconds']:.1f} Mpixels/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""JIT warm-up and first-frame latency report
+
+All kernels are compiled with ``cache=True``: numba stores the machine code
+in ``__pycache__`` next to the sources (or in ``NUMBA_CACHE_DIR``) and later
+runs load it instead of compiling. ``warm_up`` imports every fractal and
+runs each driver once on a tiny grid (a single ray for 3D fractals), which
+compiles everything a first frame needs on the very first run and just
+loads it afterwards. The main
+window runs it on a background thread while the menu is shown.
+
+Run as a script to pre-build the kernel cache (e.g. at install time, or
+into a ``NUMBA_CACHE_DIR`` shipped with a package) or to measure latency:
+
+    python -m src.utils.jit_warmup
+    python -m src.utils.jit_warmup --report [--fractal NAME]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+
+def warm_up(fractals=None):
+    """
+    Compile (or load from the cache) the kernels of the fractals
+
+    Args:
+        fractals: Names to warm up (default: every registered fractal)
+
+    Returns:
+        Dict of fractal name -> seconds spent
+    """
+    # Imported here: this module is loaded by the menu, kernels are not
+    from src.fractals.fractal_2d.escape_time import (escape_grid, escape_points, first_class,
+                                                     resume_pixels)
+    from src.fractals.fractal_2d.perturbation import calculate_delta
+    from src.fractals.fractal_3d.ray_march import march_tile
+    from src.fractals.fractal_registry import FractalRegistry
+    from src.rendering.subdivision import subdivide
+
+    if fractals is None:
+        fractals = (list(FractalRegistry.get_2d_fractals()) +
+                    list(FractalRegistry.get_3d_fractals()))
+
+    coords = np.zeros(2)
+    timings = {}
+    for name in fractals:
+        start = time.perf_counter()
+        fractal = FractalRegistry.create(name)
+        if fractal.dimension == "3D":
+            # One ray of a 1x1 frame
+            march_tile(first_class(fractal.distance), np.array([0.0, 0.0, -3.0, 1.0, 1.0]),
+                       np.array([1.0, 0.0, 1.0, 0.0]), np.array([0.0, 0.0, -1.0]), 8.0,
+                       1, 1, 0, 1, 0, 1)
+            timings[name] = time.perf_counter() - start
+            continue
+        point = first_class(fractal.point)
+        resume = first_class(fractal.resume)
+        escape_grid(point, coords, coords, fractal.params, 2)
+        escape_points(point, coords, coords, fractal.params, 2)
+        subdivide(point, coords, coords, fractal.params, 2)
+        resume_pixels(resume, coords, coords, fractal.params, np.zeros(1, dtype=np.int32),
+                      np.zeros(1), np.zeros(1), np.zeros(1, dtype=np.int32), 2)
+        if fractal.deep_zoom:
+            calculate_delta(coords, coords, coords, coords, 2, fractal.burning_ship)
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def start_warm_up(config=None):
+    """
+    Warm up the kernels on a daemon thread
+
+    Args:
+        config: Application config; ``performance.jit_warmup`` turns it off
+
+    Returns:
+        The started thread, or None when disabled
+    """
+    if not (config or {}).get('performance', {}).get('jit_warmup', True):
+        return None
+
+    def run():
+        try:
+            warm_up()
+        except Exception as e:
+            # A failed warm-up only means the first frame compiles instead
+            print(f"⚠ JIT warm-up failed: {e}")
+
+    thread = threading.Thread(target=run, name="jit-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def measure_first_frame(fractal="Mandelbrot", width=640, height=480, max_iter=256):
+    """
+    Time the first and second frame of a 2D fractal in this process
+
+    The first frame counts from before the renderer is imported, since
+    kernels are compiled (or loaded from the cache) when their module is
+    imported.
+
+    Returns:
+        Dict with "import", "first_frame" and "second_frame" in seconds
+    """
+    start = time.perf_counter()
+    from PyQt6.QtCore import QSize
+    from src.rendering.renderer_2d import Renderer2D
+    config = {'performance': {'cache_enabled': False}}
+    renderer = Renderer2D(QSize(width, height), config, fractal)
+    imported = time.perf_counter()
+
+    renderer.render_array(max_iter)
+    first = time.perf_counter()
+    renderer.last_view = None
+    renderer.render_array(max_iter)
+    second = time.perf_counter()
+    return {
+        "import": imported - start,
+        "first_frame": first - start,
+        "second_frame": second - first,
+    }
+
+
+def _measure_in_subprocess(cache_dir, fractal, width, height, max_iter):
+    """Run measure_first_frame in a fresh interpreter using cache_dir"""
+    env = dict(os.environ, NUMBA_CACHE_DIR=cache_dir)
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, env.get('PYTHONPATH')]))
+    command = [sys.executable, "-m", "src.utils.jit_warmup", "--measure",
+               "--fractal", fractal, "--size", f"{width}x{height}",
+               "--max-iter", str(max_iter)]
+    output = subprocess.run(command, env=env, cwd=root, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def report(fractal="Mandelbrot", width=640, height=480, max_iter=256):
+    """
+    Compare cold, warm and hot first-frame latency
+
+    Cold runs a fresh interpreter with an empty kernel cache, warm runs a
+    fresh interpreter on the cache the cold run left behind, and hot is
+    the second frame within one process.
+
+    Returns:
+        Dict with the "cold" and "warm" measurements
+    """
+    with tempfile.TemporaryDirectory(prefix="numba-cache-") as cache_dir:
+        cold = _measure_in_subprocess(cache_dir, fractal, width, height, max_iter)
+        warm = _measure_in_subprocess(cache_dir, fractal, width, height, max_iter)
+
+    print(f"First frame of {fractal} at {width}x{height}, {max_iter} iterations")
+    print(f"  cold (empty kernel cache):   {cold['first_frame']:7.3f} s"
+          f"  (import and compile {cold['import']:.3f} s)")
+    print(f"  warm (kernel cache on disk): {warm['first_frame']:7.3f} s"
+          f"  (import and load {warm['import']:.3f} s)")
+    print(f"  hot (same process):          {warm['second_frame']:7.3f} s")
+    return {"cold": cold, "warm": warm}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm up the JIT kernel cache")
+    parser.add_argument("--report", action="store_true",
+                        help="compare cold and warm first-frame latency")
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--fractal", default="Mandelbrot")
+    parser.add_argument("--size", default="640x480", help="frame size WIDTHxHEIGHT")
+    parser.add_argument("--max-iter", type=int, default=256)
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.lower().split("x"))
+
+    if args.measure:
+        print(json.dumps(measure_first_frame(args.fractal, width, height, args.max_iter)))
+    elif args.report:
+        report(args.fractal, width, height, args.max_iter)
+    else:
+        for name, seconds in warm_up().items():
+            print(f"✓ {name}: {seconds:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
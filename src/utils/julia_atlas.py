@@ -0,0 +1,142 @@
+"""Julia set atlases and parameter maps
+
+A parameter map places a small Julia set thumbnail at every point c of a
+grid over the Mandelbrot set: connected Julia sets appear where c lies in
+the set, dust outside it. All thumbnails are computed by
+``JuliaSet.calculate_batch`` in one parallel kernel launch into a single
+(n, height, width) buffer, which ``tile_atlas`` lays out as one image:
+
+    python -m src.utils.julia_atlas --grid 48x32 --thumb 32 -o map.png
+    python -m src.utils.julia_atlas --center -0.75 0.1 --extent 0.5 \\
+        --grid 16x16 --thumb 96 --counts -o seahorse.npy
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+
+def parameter_grid(center=(-0.75, 0.0), extent=3.0, columns=32, rows=24):
+    """
+    c values of a grid over the complex plane
+
+    Args:
+        center: (x, y) center of the grid
+        extent: Width of the grid in the plane (cells are square)
+        columns: Grid columns
+        rows: Grid rows
+
+    Returns:
+        (rows, columns) complex array; the imaginary part grows with the
+        row, like the rows of a rendered view
+    """
+    spacing = extent / columns
+    x = center[0] + (np.arange(columns) - (columns - 1) / 2) * spacing
+    y = center[1] + (np.arange(rows) - (rows - 1) / 2) * spacing
+    return x[None, :] + 1j * y[:, None]
+
+
+def tile_atlas(thumbnails, columns, gap=0, fill=0):
+    """
+    Lay a stack of thumbnails out as one atlas image, row by row
+
+    Args:
+        thumbnails: (n, height, width) or (n, height, width, channels) array
+        columns: Thumbnails per atlas row
+        gap: Pixels between neighbouring thumbnails
+        fill: Value of the gaps and of unused cells in the last row
+
+    Returns:
+        (rows * (height + gap) - gap, columns * (width + gap) - gap[, channels])
+        array of the thumbnails' dtype
+    """
+    count, height, width = thumbnails.shape[:3]
+    channels = thumbnails.shape[3:]
+    rows = -(-count // columns)
+    cells = np.full((rows * columns, height + gap, width + gap) + channels, fill,
+                    dtype=thumbnails.dtype)
+    cells[:count, :height, :width] = thumbnails
+    # (row, column, y, x) -> (row, y, column, x)
+    atlas = cells.reshape((rows, columns, height + gap, width + gap) + channels)
+    atlas = atlas.swapaxes(1, 2).reshape((rows * (height + gap), columns * (width + gap)) +
+                                         channels)
+    return atlas[:atlas.shape[0] - gap, :atlas.shape[1] - gap]
+
+
+def render_atlas(c_values, columns=None, width=48, height=48, max_iter=128, zoom=1.0,
+                 palette=None, smooth=False, gap=0, config=None):
+    """
+    Render a colored atlas of Julia set thumbnails
+
+    Args:
+        c_values: Complex array of parameters; a 2D grid keeps its layout
+        columns: Thumbnails per atlas row (default: the grid's columns, or
+            a square layout for a flat list)
+        width: Thumbnail width
+        height: Thumbnail height
+        max_iter: Maximum iterations
+        zoom: Zoom of every thumbnail (vertical extent 4 / zoom)
+        palette: Color scheme name (default: the configured one)
+        smooth: Color normalized iteration counts
+        gap: Black pixels between thumbnails
+        config: Application config (color schemes)
+
+    Returns:
+        (atlas RGB uint8 image, (n, height, width) iteration buffer)
+    """
+    from src.fractals.fractal_2d.julia import JuliaSet
+    from src.utils.colors import ColorPalette
+
+    c_values = np.asarray(c_values)
+    if columns is None:
+        columns = (c_values.shape[1] if c_values.ndim == 2 else
+                   int(np.ceil(np.sqrt(c_values.size))))
+    counts = JuliaSet.calculate_batch(c_values, width, height, max_iter, zoom=zoom,
+                                      smooth=smooth)
+    colors = ColorPalette(config).apply(counts, max_iter, palette)
+    return tile_atlas(colors, columns, gap), counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a Julia set parameter map")
+    parser.add_argument("--center", nargs=2, type=float, default=(-0.75, 0.0),
+                        metavar=("X", "Y"), help="center of the c grid")
+    parser.add_argument("--extent", type=float, default=3.0, help="width of the c grid")
+    parser.add_argument("--grid", default="32x24", help="c grid size COLUMNSxROWS")
+    parser.add_argument("--thumb", default="48", help="thumbnail size N or WIDTHxHEIGHT")
+    parser.add_argument("--zoom", type=float, default=1.0, help="zoom of every thumbnail")
+    parser.add_argument("--max-iter", type=int, default=128)
+    parser.add_argument("--palette", default=None)
+    parser.add_argument("--smooth", action="store_true", help="smooth coloring")
+    parser.add_argument("--gap", type=int, default=1, help="pixels between thumbnails")
+    parser.add_argument("--counts", action="store_true",
+                        help="write the (n, height, width) iteration buffer (.npy)")
+    parser.add_argument("-o", "--output", required=True, help="output .png or .npy")
+    args = parser.parse_args(argv)
+    columns, rows = (int(v) for v in args.grid.lower().split("x"))
+    size = [int(v) for v in args.thumb.lower().split("x")]
+    width, height = size if len(size) == 2 else size * 2
+
+    from src.utils.config_loader import ConfigLoader
+    from src.utils.poster_export import PngWriter
+
+    c_values = parameter_grid(args.center, args.extent, columns, rows)
+    start = time.perf_counter()
+    atlas, counts = render_atlas(c_values, columns, width, height, args.max_iter, args.zoom,
+                                 args.palette, args.smooth, args.gap,
+                                 ConfigLoader.load_config())
+    elapsed = time.perf_counter() - start
+
+    if args.counts:
+        np.save(args.output, counts)
+    else:
+        writer = PngWriter(args.output, atlas.shape[1], atlas.shape[0])
+        writer.write(atlas)
+        writer.close()
+    print(f"Wrote {args.output}: {counts.shape[0]} Julia sets of {width}x{height} "
+          f"in {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
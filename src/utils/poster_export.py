@@ -0,0 +1,296 @@
+"""Out-of-core poster export of 2D fractals
+
+Renders images far larger than memory (65536x65536 and beyond) in bands of
+rows. Each band is computed by the renderer on the parallel tile engine
+(deep zoom included) and handed to a writer at once, so only one band is
+held in memory:
+
+- ``.png``: a streaming PNG encoder writes compressed rows as they come
+- ``.npy``: a memory-mapped array (RGB, or raw iteration counts with
+  ``counts=True``) that other tools can open without loading it
+
+    python -m src.utils.poster_export --center -0.75 0.1 --zoom 8 \\
+        --size 65536x65536 --max-iter 1024 -o poster.png
+"""
+
+import argparse
+import functools
+import os
+import struct
+import sys
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+
+class PngWriter:
+    """Streaming RGB PNG encoder
+
+    Rows are filtered (Sub), compressed with one zlib stream and written as
+    IDAT chunks while they arrive. The file is written under a temporary
+    name and renamed by ``close()`` once complete.
+    """
+
+    SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+    def __init__(self, path, width, height, level=6):
+        """
+        Args:
+            path: Output file
+            width: Image width
+            height: Image height
+            level: zlib compression level
+        """
+        self.path = Path(path)
+        self.width = width
+        self.height = height
+        self.rows = 0
+        self.partial = self.path.with_name(f".{self.path.name}.{os.getpid()}.part")
+        self.file = open(self.partial, "wb")
+        self.compressor = zlib.compressobj(level)
+        self.file.write(self.SIGNATURE)
+        # 8-bit truecolor, no interlacing
+        self.chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def chunk(self, kind, data):
+        """Write one PNG chunk"""
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(kind)
+        self.file.write(data)
+        self.file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    def write(self, rows):
+        """
+        Append rows to the image
+
+        Args:
+            rows: (n, width, 3) uint8 array
+        """
+        n = len(rows)
+        data = rows.reshape(n, self.width * 3)
+        # Sub filter: every byte minus the same channel of the pixel to its left
+        filtered = np.empty((n, self.width * 3 + 1), dtype=np.uint8)
+        filtered[:, 0] = 1
+        filtered[:, 1:4] = data[:, :3]
+        np.subtract(data[:, 3:], data[:, :-3], out=filtered[:, 4:])
+        compressed = self.compressor.compress(filtered.tobytes())
+        if compressed:
+            self.chunk(b"IDAT", compressed)
+        self.rows += n
+
+    def close(self):
+        """Finish the stream and move the file into place"""
+        if self.rows != self.height:
+            self.abort()
+            raise ValueError(f"PNG has {self.rows} of {self.height} rows")
+        self.chunk(b"IDAT", self.compressor.flush())
+        self.chunk(b"IEND", b"")
+        self.file.close()
+        os.replace(self.partial, self.path)
+
+    def abort(self):
+        """Discard the partial file"""
+        self.file.close()
+        self.partial.unlink(missing_ok=True)
+
+
+class NpyWriter:
+    """Writes rows into a memory-mapped .npy file"""
+
+    def __init__(self, path, width, height, dtype=np.uint8, channels=3):
+        self.path = Path(path)
+        self.height = height
+        self.rows = 0
+        self.partial = self.path.with_name(f".{self.path.name}.{os.getpid()}.part")
+        shape = (height, width, channels) if channels else (height, width)
+        self.array = np.lib.format.open_memmap(self.partial, mode="w+", dtype=dtype, shape=shape)
+
+    def write(self, rows):
+        """Append rows to the array"""
+        self.array[self.rows:self.rows + len(rows)] = rows
+        self.rows += len(rows)
+        # Hand the pages to the OS so they do not pile up in this process
+        self.array.flush()
+
+    def close(self):
+        """Flush and move the file into place"""
+        self.array.flush()
+        del self.array
+        os.replace(self.partial, self.path)
+
+    def abort(self):
+        """Discard the partial file"""
+        del self.array
+        self.partial.unlink(missing_ok=True)
+
+
+class PosterExport:
+    """Renders one view of a 2D fractal at an arbitrary size, band by band"""
+
+    def __init__(self, fractal="Mandelbrot", width=8192, height=8192, center=None,
+                 zoom=None, max_iter=256, params=None, palette=None, config=None):
+        """
+        Args:
+            fractal: Registry name of a 2D fractal
+            width: Image width
+            height: Image height
+            center: (x, y) of the view; strings keep full precision
+                (default: the fractal's default view)
+            zoom: Zoom of the view (its vertical extent is 4 / zoom)
+            max_iter: Maximum iterations
+            params: Fractal parameters
+            palette: Color scheme name (default: the configured one)
+            config: Application config
+        """
+        from src.rendering.renderer_2d import Renderer2D
+
+        config = dict(config or {})
+        # Poster tiles are never revisited, so caching them only costs memory
+        config["performance"] = dict(config.get("performance", {}), cache_enabled=False)
+        self.renderer = Renderer2D((width, height), config, fractal, **(params or {}))
+        if center is not None:
+            self.renderer.set_center(*center)
+        if zoom is not None:
+            self.renderer.set_zoom(zoom)
+        if palette is not None:
+            self.renderer.set_color_scheme(palette)
+        self.width = width
+        self.height = height
+        self.max_iter = max_iter
+
+    @classmethod
+    def from_renderer(cls, renderer, width, height, max_iter, config=None):
+        """
+        Poster of a renderer's current view and coloring
+
+        The poster has the renderer's center and vertical extent, color
+        scheme, smooth coloring, histogram equalization and subdivision.
+        """
+        poster = cls(renderer.fractal_name, width, height, max_iter=max_iter,
+                     params=renderer.fractal_params, palette=renderer.palette.scheme,
+                     config=config if config is not None else renderer.config)
+        poster.renderer.set_center(renderer.center_x, renderer.center_y)
+        poster.renderer.set_zoom_index(renderer.zoom_index)
+        poster.renderer.set_smooth_coloring(renderer.smooth)
+        poster.renderer.set_histogram_equalization(renderer.equalize)
+        poster.renderer.subdivision = renderer.subdivision
+        return poster
+
+    @property
+    def band_rows(self):
+        """Rows rendered per band: one row of tiles"""
+        return self.renderer.engine.tile_size
+
+    def equalization(self, view, samples=1024):
+        """
+        Histogram equalization of the whole poster, from a sparse sample grid
+
+        Bands are colored one at a time, so they share the equalization of
+        about samples x samples pixels spread over the image.
+        """
+        renderer = self.renderer
+        cols = np.linspace(0, self.width - 1, min(samples, self.width)).astype(np.int64)
+        rows = np.linspace(0, self.height - 1, min(samples, self.height)).astype(np.int64)
+        sample = renderer.compute_pixels(view, cols, rows, self.max_iter)
+        return renderer.palette.histogram(sample, self.max_iter)
+
+    def render(self, path, counts=False, progress=None, coordinator=None):
+        """
+        Render the poster to a file
+
+        Args:
+            path: Output file (.png, or .npy for a memory-mapped array)
+            counts: Store raw iteration counts instead of colors (.npy only;
+                float32 normalized counts with smooth coloring)
+            progress: Called as progress(rows done, total rows) after each band
+            coordinator: distributed_render.Coordinator that computes the
+                bands on its workers (default: this process)
+
+        Returns:
+            Dict with the image size, seconds and pixels iterated
+
+        Raises:
+            RenderCancelled: If the calling thread's render was cancelled
+        """
+        path = Path(path)
+        if path.suffix.lower() == ".npy":
+            dtype = np.float32 if self.renderer.smooth else np.int32
+            writer = (NpyWriter(path, self.width, self.height, dtype, channels=0)
+                      if counts else NpyWriter(path, self.width, self.height))
+        elif path.suffix.lower() == ".png" and not counts:
+            writer = PngWriter(path, self.width, self.height)
+        else:
+            raise ValueError("Poster output must be .png or .npy (counts need .npy)")
+
+        renderer = self.renderer
+        view = renderer.current_view()
+        cols = np.arange(self.width)
+        compute_pixels = renderer.compute_pixels
+        band_rows = self.band_rows
+        if coordinator is not None:
+            compute_pixels = functools.partial(coordinator.compute_pixels, renderer)
+            band_rows = coordinator.band_rows(renderer)
+        renderer.reset_counters()
+        start = time.perf_counter()
+        try:
+            equalization = None
+            if renderer.equalize and not counts:
+                equalization = self.equalization(view)
+            for row in range(0, self.height, band_rows):
+                rows = np.arange(row, min(row + band_rows, self.height))
+                band = compute_pixels(view, cols, rows, self.max_iter)
+                writer.write(band if counts else
+                             renderer.apply_colormap(band, self.max_iter, equalization))
+                if progress is not None:
+                    progress(int(rows[-1]) + 1, self.height)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.close()
+
+        return {
+            "width": self.width,
+            "height": self.height,
+            "seconds": time.perf_counter() - start,
+            "iterated_pixels": int(renderer.counters["iterated_pixels"]),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a poster-size fractal image")
+    parser.add_argument("--fractal", default="Mandelbrot")
+    parser.add_argument("--center", nargs=2, metavar=("X", "Y"),
+                        help="view center (decimal strings keep deep-zoom precision)")
+    parser.add_argument("--zoom", type=float, default=None)
+    parser.add_argument("--size", default="8192x8192", help="image size WIDTHxHEIGHT")
+    parser.add_argument("--max-iter", type=int, default=256)
+    parser.add_argument("--palette", default=None)
+    parser.add_argument("--counts", action="store_true",
+                        help="store raw iteration counts (.npy output)")
+    parser.add_argument("-o", "--output", required=True, help="output .png or .npy")
+    args = parser.parse_args(argv)
+    width, height = (int(v) for v in args.size.lower().split("x"))
+
+    from src.utils.config_loader import ConfigLoader
+    poster = PosterExport(args.fractal, width, height, args.center, args.zoom,
+                          args.max_iter, palette=args.palette,
+                          config=ConfigLoader.load_config())
+    start = time.perf_counter()
+
+    def progress(done, total):
+        elapsed = time.perf_counter() - start
+        remaining = elapsed / done * (total - done)
+        print(f"\r{done / total:6.1%}  {done}/{total} rows  "
+              f"{elapsed:7.1f} s elapsed, {remaining:7.1f} s left", end="", file=sys.stderr)
+
+    stats = poster.render(args.output, args.counts, progress)
+    print(file=sys.stderr)
+    megapixels = width * height / 1e6
+    print(f"Wrote {args.output}: {width}x{height} ({megapixels:.0f} Mpixels) in "
+          f"{stats['seconds']:.1f} s ({megapixels / stats['seconds']:.1f} Mpixels/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,616 @@
+"""Slippy-map tile server for 2D fractals
+
+Serves ``/{fractal}/{z}/{x}/{y}.png`` over HTTP with asyncio, so any web
+map viewer (Leaflet, OpenLayers) can browse a fractal. Level 0 is one
+256x256 tile showing the fractal's default view; every level doubles the
+zoom, and tile (x, y) of level z covers pixels ``[x * 256, (x + 1) * 256)``
+of a 2^z x 2^z tile world (y grows downward, like the renderer's rows).
+
+Tiles are computed and PNG-encoded on a process pool by the same
+renderer, kernels and palettes as the viewer, deep zoom included:
+
+- concurrent requests for a tile that is being computed wait for that
+  one computation instead of starting their own
+- encoded tiles are kept in a hot cache (LRU, capped in bytes)
+- ``/stats`` reports request counts, cache hits, latency percentiles and
+  throughput as JSON; ``/`` is a minimal Leaflet page of the fractal
+  (Leaflet is vendored under ``static/leaflet`` and served from
+  ``/static/``, so the page works offline)
+
+Query arguments: ``iter`` (default grows with the level), ``palette``,
+``smooth`` (0/1), and fractal parameters such as ``c_real``:
+
+    python -m src.utils.tile_server serve --port 8420 --workers 4
+    curl -o tile.png "http://127.0.0.1:8420/mandelbrot/3/4/3.png?palette=rainbow"
+    python -m src.utils.tile_server bench --levels 4 --passes 2 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import functools
+import html
+import http
+import inspect
+import io
+import json
+import math
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, localcontext
+from urllib.parse import parse_qsl, quote, unquote, urlsplit
+
+import numpy as np
+
+
+TILE_SIZE = 256
+DEFAULT_PORT = 8420
+# Deepest level served (deep zoom reaches about 2^330)
+MAX_LEVEL = 256
+MAX_ITER_LIMIT = 1_000_000
+
+TILE_PATH = re.compile(r"^/([^/]+)/(\d+)/(\d+)/(\d+)\.png$")
+
+# Files served under /static/ (vendored Leaflet for the index page)
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_FILES = {
+    "/static/leaflet/leaflet.js": "application/javascript",
+    "/static/leaflet/leaflet.css": "text/css",
+}
+
+
+def slug(name):
+    """URL name of a fractal: 'Julia Set' -> 'julia-set'"""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+@functools.lru_cache(maxsize=None)
+def static_file(request_path):
+    """Contents of one of STATIC_FILES (read once)"""
+    relative = request_path[len("/static/"):]
+    with open(os.path.join(STATIC_DIR, *relative.split("/")), "rb") as f:
+        return f.read()
+
+
+# Renderers of a pool worker, one per fractal and parameters
+_worker = {}
+MAX_RENDERERS = 16
+
+
+def init_worker(config):
+    """Pool initializer: keep the config; renderers are built on demand"""
+    _worker["config"] = config
+    _worker["renderers"] = {}
+
+
+def tile_view(renderer, level, x, y):
+    """
+    View of a map tile
+
+    Args:
+        renderer: TILE_SIZE x TILE_SIZE Renderer2D of the fractal
+        level: Map level; 0 shows the fractal's default view
+        x: Tile column, 0 <= x < 2^level
+        y: Tile row, 0 <= y < 2^level
+
+    Returns:
+        (origin_x, origin_y, zoom_index)
+    """
+    renderer.set_zoom(renderer.default_zoom)
+    zoom_index = renderer.zoom_index + level * renderer.ZOOM_STEPS_PER_OCTAVE
+    pixel = Decimal(renderer.pixel_size(zoom_index))
+    with localcontext() as ctx:
+        ctx.prec = renderer.decimal_digits(zoom_index)
+        center_x, center_y = (Decimal(str(v)) if isinstance(v, float) else Decimal(v)
+                              for v in renderer.default_center)
+        center_x = int((center_x / pixel).to_integral_value())
+        center_y = int((center_y / pixel).to_integral_value())
+    half = (TILE_SIZE << level) // 2
+    return (center_x - half + x * TILE_SIZE, center_y - half + y * TILE_SIZE, zoom_index)
+
+
+def render_tile(fractal, params, level, x, y, max_iter, palette, smooth):
+    """
+    Render and PNG-encode one map tile in a pool worker
+
+    Returns:
+        (PNG bytes, seconds spent)
+
+    Raises:
+        ValueError: If params names a parameter the fractal does not take
+    """
+    from PIL import Image
+
+    from src.fractals.fractal_registry import FractalRegistry
+    from src.rendering.renderer_2d import Renderer2D
+
+    start = time.perf_counter()
+    key = (fractal, tuple(sorted(params.items())))
+    renderer = _worker.setdefault("renderers", {}).get(key)
+    if renderer is None:
+        accepted = inspect.signature(FractalRegistry.load(fractal)).parameters
+        unknown = sorted(set(params) - set(accepted))
+        if unknown:
+            raise ValueError(f"{fractal} has no parameter {', '.join(unknown)}")
+        renderer = Renderer2D((TILE_SIZE, TILE_SIZE), _worker.get("config", {}), fractal,
+                              **params)
+        # Per-tile equalization would show the tile seams
+        renderer.equalize = False
+        renderers = _worker["renderers"]
+        if len(renderers) >= MAX_RENDERERS:
+            renderers.pop(next(iter(renderers))).engine.shutdown()
+        renderers[key] = renderer
+
+    renderer.set_smooth_coloring(smooth)
+    renderer.set_color_scheme(palette or renderer.palette.default_scheme)
+    view = tile_view(renderer, level, x, y)
+    indices = np.arange(TILE_SIZE)
+    counts = renderer.compute_pixels(view, indices, indices, max_iter)
+    image = renderer.colorize(counts, max_iter, view)
+
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, "PNG", compress_level=1)
+    return buffer.getvalue(), time.perf_counter() - start
+
+
+class HotCache:
+    """In-memory LRU cache of encoded tiles, capped in bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._tiles = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._tiles)
+
+    def get(self, key):
+        """Encoded tile, or None on a miss"""
+        data = self._tiles.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self._tiles.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """Store a tile and evict least recently used tiles over budget"""
+        old = self._tiles.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old)
+        self._tiles[key] = data
+        self.bytes += len(data)
+        while self.bytes > self.max_bytes and len(self._tiles) > 1:
+            _, evicted = self._tiles.popitem(last=False)
+            self.bytes -= len(evicted)
+            self.evictions += 1
+
+    def stats(self):
+        """Hit/miss statistics and memory use"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "tiles": len(self._tiles),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def percentiles(samples):
+    """p50/p95/p99/max of latency samples in seconds, as milliseconds"""
+    if not samples:
+        return {}
+    values = np.percentile(np.fromiter(samples, dtype=np.float64), [50, 95, 99, 100]) * 1e3
+    return {name: round(float(value), 3)
+            for name, value in zip(("p50_ms", "p95_ms", "p99_ms", "max_ms"), values)}
+
+
+class ServerStats:
+    """Request counters, latency samples and throughput of a tile server"""
+
+    # Latency samples kept for the percentiles
+    SAMPLES = 4096
+    # Window of the recent throughput, in seconds
+    RECENT_SECONDS = 10.0
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.counters = Counter()
+        self.latency = deque(maxlen=self.SAMPLES)
+        self.compute = deque(maxlen=self.SAMPLES)
+        self.completed = deque()
+
+    def record(self, status, seconds):
+        """Count a finished request"""
+        now = time.perf_counter()
+        self.counters["requests"] += 1
+        self.counters[f"status_{status}"] += 1
+        self.latency.append(seconds)
+        self.completed.append(now)
+        while self.completed and self.completed[0] < now - self.RECENT_SECONDS:
+            self.completed.popleft()
+
+    def snapshot(self):
+        """JSON-serializable summary"""
+        uptime = time.perf_counter() - self.started
+        recent = min(uptime, self.RECENT_SECONDS)
+        return {
+            "uptime_seconds": round(uptime, 3),
+            "counters": dict(self.counters),
+            "requests_per_second": round(self.counters["requests"] / uptime, 3) if uptime else 0.0,
+            "recent_requests_per_second": round(len(self.completed) / recent, 3) if recent else 0.0,
+            "latency": percentiles(self.latency),
+            "compute_latency": percentiles(self.compute),
+        }
+
+
+class TileServer:
+    """asyncio HTTP server answering map tile requests from a process pool"""
+
+    def __init__(self, config=None, workers=None, cache_mb=128, base_iter=256,
+                 iter_per_level=64):
+        """
+        Args:
+            config: Application config (fractal palettes, rendering options)
+            workers: Pool processes (default: one per core)
+            cache_mb: Hot cache budget for encoded tiles
+            base_iter: Default max_iter at level 0
+            iter_per_level: Default max_iter added per level
+        """
+        from src.fractals.fractal_registry import FractalRegistry
+
+        config = dict(config or {})
+        # Tiles run in parallel across processes, one thread each; the
+        # server caches them encoded, so renderers keep no tiles
+        config["performance"] = dict(config.get("performance", {}), multi_threading=False,
+                                     cache_enabled=False)
+        self.config = config
+        self.fractals = {slug(name): name for name in FractalRegistry.get_2d_fractals()}
+        self.palettes = set(((config.get("colors") or {}).get("schemes") or {}).keys())
+        self.base_iter = base_iter
+        self.iter_per_level = iter_per_level
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.executor = ProcessPoolExecutor(self.workers,
+                                            mp_context=multiprocessing.get_context("spawn"),
+                                            initializer=init_worker, initargs=(config,))
+        self.cache = HotCache(int(cache_mb * 1024 * 1024))
+        self.stats = ServerStats()
+        # Tiles being computed: key -> asyncio future of (PNG bytes, seconds)
+        self.pending = {}
+        # ... and their pool futures, cancelled on close
+        self.jobs = {}
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """Start listening; returns the asyncio server"""
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server
+
+    def close(self):
+        """Stop listening and shut the pool down"""
+        if self.server is not None:
+            self.server.close()
+        # shutdown(cancel_futures=True) needs Python 3.9
+        for job in self.jobs.values():
+            job.cancel()
+        self.executor.shutdown()
+
+    def parse_tile(self, match, query):
+        """
+        Tile request from a matched path and its query arguments
+
+        Returns:
+            (fractal name, params dict, level, x, y, max_iter, palette, smooth)
+
+        Raises:
+            LookupError: Unknown fractal, palette or tile (404)
+            ValueError: Malformed arguments (400)
+        """
+        name, level, x, y = unquote(match[1]), int(match[2]), int(match[3]), int(match[4])
+        fractal = self.fractals.get(slug(name))
+        if fractal is None:
+            raise LookupError(f"Unknown fractal: {name}")
+        if level > MAX_LEVEL or x >= 1 << level or y >= 1 << level:
+            raise LookupError(f"No tile {level}/{x}/{y}")
+
+        query = dict(query)
+        max_iter = int(query.pop("iter", self.base_iter + self.iter_per_level * level))
+        if not 1 <= max_iter <= MAX_ITER_LIMIT:
+            raise ValueError(f"iter must be between 1 and {MAX_ITER_LIMIT}")
+        palette = query.pop("palette", None)
+        if palette is not None and palette not in self.palettes:
+            raise LookupError(f"Unknown palette: {palette}")
+        smooth = query.pop("smooth", None)
+        if smooth is None:
+            smooth = bool(self.config.get("rendering", {}).get("smooth_coloring", False))
+        else:
+            smooth = smooth.lower() not in ("0", "false", "no", "off")
+        params = {key: float(value) for key, value in query.items()}
+        if not all(math.isfinite(value) for value in params.values()):
+            raise ValueError("parameters must be finite numbers")
+        return fractal, params, level, x, y, max_iter, palette, smooth
+
+    async def get_tile(self, request):
+        """
+        PNG of a tile request, from the hot cache, a computation already in
+        flight, or a new computation on the pool
+        """
+        fractal, params, *rest = request
+        key = (fractal, tuple(sorted(params.items())), *rest)
+        data = self.cache.get(key)
+        if data is not None:
+            self.stats.counters["cache_hits"] += 1
+            return data
+
+        future = self.pending.get(key)
+        if future is None:
+            self.stats.counters["computed"] += 1
+            job = self.executor.submit(render_tile, *request)
+            future = asyncio.wrap_future(job)
+            self.pending[key] = future
+            self.jobs[key] = job
+            future.add_done_callback(lambda done: self.finished(key, done))
+        else:
+            self.stats.counters["deduplicated"] += 1
+        # Shielded: a client going away does not cancel the tile for the others
+        data, _ = await asyncio.shield(future)
+        return data
+
+    def finished(self, key, future):
+        """Cache a computed tile once its future is done"""
+        del self.pending[key]
+        del self.jobs[key]
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self.stats.counters["compute_errors"] += 1
+            return
+        data, seconds = future.result()
+        self.stats.compute.append(seconds)
+        self.cache.put(key, data)
+
+    async def respond(self, request_path, query):
+        """(status, content type, body) for a GET request"""
+        if request_path == "/stats":
+            stats = self.stats.snapshot()
+            stats.update(cache=self.cache.stats(), in_flight=len(self.pending),
+                         workers=self.workers)
+            return 200, "application/json", json.dumps(stats, indent=2).encode()
+        if request_path == "/fractals":
+            return 200, "application/json", json.dumps(self.fractals, indent=2).encode()
+        if request_path == "/" or request_path == "/index.html":
+            return 200, "text/html; charset=utf-8", self.index_page(dict(query)).encode()
+        if request_path in STATIC_FILES:
+            return 200, STATIC_FILES[request_path], static_file(request_path)
+
+        match = TILE_PATH.match(request_path)
+        if match is None:
+            return 404, "text/plain", b"Not found\n"
+        try:
+            request = self.parse_tile(match, query)
+        except LookupError as e:
+            return 404, "text/plain", f"{e}\n".encode()
+        except ValueError as e:
+            return 400, "text/plain", f"{e}\n".encode()
+        try:
+            return 200, "image/png", await self.get_tile(request)
+        except (KeyError, ValueError, TypeError) as e:
+            return 400, "text/plain", f"{e}\n".encode()
+
+    async def handle(self, reader, writer):
+        """Serve the requests of one connection (HTTP/1.1 keep-alive)"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                start = time.perf_counter()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    method, target, version = "", "/", "HTTP/1.0"
+                keep_alive = (headers.get("connection", "").lower() != "close" and
+                              version == "HTTP/1.1")
+                url = urlsplit(target)
+                if method not in ("GET", "HEAD"):
+                    status, content_type, body = 405, "text/plain", b"Method not allowed\n"
+                else:
+                    try:
+                        status, content_type, body = await self.respond(
+                            url.path, parse_qsl(url.query))
+                    except Exception as e:
+                        status, content_type, body = 500, "text/plain", f"{e!r}\n".encode()
+
+                head = [f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}",
+                        f"Content-Type: {content_type}",
+                        f"Content-Length: {len(body)}",
+                        "Connection: " + ("keep-alive" if keep_alive else "close")]
+                if content_type == "image/png" or url.path in STATIC_FILES:
+                    head.append("Cache-Control: public, max-age=86400")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+                self.stats.record(status, time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def index_page(self, query):
+        """Leaflet map of a fractal (Leaflet comes from /static/, no internet needed)"""
+        fractal = slug(query.pop("fractal", "mandelbrot"))
+        arguments = "&".join(f"{quote(k)}={quote(v)}" for k, v in query.items())
+        url = f"/{fractal}/{{z}}/{{x}}/{{y}}.png" + (f"?{arguments}" if arguments else "")
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(fractal)}</title>
+<link rel="stylesheet" href="/static/leaflet/leaflet.css">
+<script src="/static/leaflet/leaflet.js"></script>
+<style>html, body, #map {{ height: 100%; margin: 0; background: #000; }}</style>
+</head><body><div id="map"></div><script>
+const map = L.map("map", {{crs: L.CRS.Simple, minZoom: 0, maxZoom: 40}});
+L.tileLayer({json.dumps(url)}, {{tileSize: {TILE_SIZE}, noWrap: true,
+    bounds: [[-{TILE_SIZE}, 0], [0, {TILE_SIZE}]], maxZoom: 40}}).addTo(map);
+map.setView([-{TILE_SIZE // 2}, {TILE_SIZE // 2}], 1);
+</script></body></html>
+"""
+
+
+async def serve(host, port, **options):
+    """Run a tile server until interrupted"""
+    from src.utils.config_loader import ConfigLoader
+
+    server = TileServer(ConfigLoader.load_config(), **options)
+    try:
+        await server.start(host, port)
+        print(f"Serving tiles on http://{host}:{port}/ with {server.workers} workers "
+              f"({', '.join(sorted(server.fractals))})", file=sys.stderr)
+        await server.server.serve_forever()
+    finally:
+        server.close()
+
+
+def pyramid(fractal, levels, query=""):
+    """Paths of every tile of levels 0..levels - 1"""
+    suffix = f"?{query}" if query else ""
+    return [f"/{fractal}/{z}/{x}/{y}.png{suffix}"
+            for z in range(levels) for y in range(1 << z) for x in range(1 << z)]
+
+
+async def load_test(host, port, paths, concurrency=16):
+    """
+    Request paths over concurrency keep-alive connections
+
+    Returns:
+        Dict with requests, seconds, requests per second, latency
+        percentiles and status counts
+    """
+    queue = deque(paths)
+    latency = []
+    statuses = Counter()
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while queue:
+                path = queue.popleft()
+                start = time.perf_counter()
+                writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+                await writer.drain()
+                status = int((await reader.readline()).split()[1])
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    if name.lower() == "content-length":
+                        length = int(value)
+                await reader.readexactly(length)
+                latency.append(time.perf_counter() - start)
+                statuses[status] += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(min(concurrency, len(paths)))))
+    seconds = time.perf_counter() - start
+    return {
+        "requests": len(latency),
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(len(latency) / seconds, 1),
+        "latency": percentiles(latency),
+        "statuses": dict(statuses),
+    }
+
+
+async def bench(args):
+    """Load-test a server: an existing one, or one started here"""
+    server = None
+    host, port = args.host, args.port
+    if not args.url:
+        from src.utils.config_loader import ConfigLoader
+        server = TileServer(ConfigLoader.load_config(), workers=args.workers)
+        await server.start(host, 0)
+        port = server.server.sockets[0].getsockname()[1]
+    else:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    try:
+        paths = pyramid(args.fractal, args.levels, args.query)
+        for number in range(1, args.passes + 1):
+            result = await load_test(host, port, paths, args.concurrency)
+            print(f"pass {number}: {json.dumps(result)}")
+        if server is not None:
+            stats = server.stats.snapshot()
+            print(f"server: {json.dumps(dict(stats['counters'], cache=server.cache.stats()))}")
+            print(f"compute latency: {json.dumps(stats['compute_latency'])}")
+    finally:
+        if server is not None:
+            server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fractal map tile server")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="serve tiles over HTTP")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--workers", type=int, default=None, help="pool processes")
+    serve_parser.add_argument("--cache-mb", type=float, default=128,
+                              help="hot cache budget for encoded tiles")
+    serve_parser.add_argument("--base-iter", type=int, default=256,
+                              help="default max_iter at level 0")
+    serve_parser.add_argument("--iter-per-level", type=int, default=64,
+                              help="default max_iter added per level")
+
+    bench_parser = commands.add_parser("bench", help="load-test a tile server")
+    bench_parser.add_argument("--url", default=None,
+                              help="server to test (default: start one on localhost)")
+    bench_parser.add_argument("--host", default="127.0.0.1")
+    bench_parser.add_argument("--port", type=int, default=0)
+    bench_parser.add_argument("--workers", type=int, default=None)
+    bench_parser.add_argument("--fractal", default="mandelbrot")
+    bench_parser.add_argument("--levels", type=int, default=4,
+                              help="request every tile of levels 0..LEVELS-1")
+    bench_parser.add_argument("--query", default="", help="query string of every request")
+    bench_parser.add_argument("--passes", type=int, default=2,
+                              help="repetitions (later passes hit the hot cache)")
+    bench_parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "serve":
+            asyncio.run(serve(args.host, args.port, workers=args.workers,
+                              cache_mb=args.cache_mb, base_iter=args.base_iter,
+                              iter_per_level=args.iter_per_level))
+        else:
+            asyncio.run(bench(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""Exponential zoom video export from keyframes
+
+Rendering every frame of a zoom video is wasteful: consecutive frames show
+almost the same region. Instead one keyframe, larger than the video frame
+by ``scale``, is rendered per doubling of the zoom, and every frame in
+between is resampled from two consecutive keyframes: the outer part from
+keyframe k, the center (which keyframe k + 1 covers at twice the detail)
+from keyframe k + 1. With ``scale`` 2 every frame pixel averages at least
+one keyframe pixel, so frames are never upscaled.
+
+Keyframes are rendered in parallel on the batch process pool and frames
+are written as they are produced, so memory holds only the keyframes in
+flight plus the two being resampled, whatever the length of the video:
+
+    python -m src.utils.zoom_video --target "Seahorse Valley" -o frames/
+    python -m src.utils.zoom_video --center -0.743643887037151 0.131825904205330 \\
+        --zoom 1e12 --raw - | ffmpeg -f rawvideo -pix_fmt rgb24 -s 1280x720 \\
+        -r 30 -i - zoom.mp4
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from decimal import Decimal, localcontext
+from pathlib import Path
+
+import numpy as np
+from numba import jit, prange
+
+from src.utils.batch_render import JOB_DEFAULTS, default_config, init_worker, render_view
+
+
+@jit(nopython=True, nogil=True, parallel=True, cache=True)
+def resample_box(source, out, x0, y0, step, row0, row1, col0, col1):
+    """
+    Area-average an RGB image into a block of output pixels
+
+    Output pixel (i, j) covers the square [x0 + j step, x0 + (j + 1) step)
+    x [y0 + i step, y0 + (i + 1) step) of source, where source pixel (r, s)
+    covers [s, s + 1) x [r, r + 1); pixels beyond the edge repeat it.
+
+    Args:
+        source: (height, width, 3) uint8 image
+        out: (rows, cols, 3) float32 image, written in place
+        x0: Left edge of output column 0 in source pixels
+        y0: Top edge of output row 0 in source pixels
+        step: Output pixel size in source pixels
+        row0: First output row to write
+        row1: End of the output rows to write
+        col0: First output column to write
+        col1: End of the output columns to write
+    """
+    height, width = source.shape[0], source.shape[1]
+    area = step * step
+    for i in prange(row0, row1):
+        top = y0 + i * step
+        bottom = top + step
+        for j in range(col0, col1):
+            left = x0 + j * step
+            right = left + step
+            red = 0.0
+            green = 0.0
+            blue = 0.0
+            for r in range(int(math.floor(top)), int(math.ceil(bottom))):
+                weight_y = min(bottom, r + 1.0) - max(top, float(r))
+                row = min(max(r, 0), height - 1)
+                for s in range(int(math.floor(left)), int(math.ceil(right))):
+                    weight = weight_y * (min(right, s + 1.0) - max(left, float(s)))
+                    column = min(max(s, 0), width - 1)
+                    red += weight * source[row, column, 0]
+                    green += weight * source[row, column, 1]
+                    blue += weight * source[row, column, 2]
+            out[i, j, 0] = red / area
+            out[i, j, 1] = green / area
+            out[i, j, 2] = blue / area
+
+
+def render_keyframe(job, target, config=None, coordinator=None):
+    """
+    Render one keyframe in a pool worker (or on a coordinator's workers)
+
+    The renderer snaps its view to the pixel grid of the zoom level, so the
+    keyframe center misses the target by up to half a pixel; that offset is
+    returned so the frames can be placed exactly.
+
+    Returns:
+        (RGB image, pixel size, target x and y relative to the keyframe
+        center in keyframe pixels)
+    """
+    renderer, counts = render_view(job, config, coordinator)
+    image = renderer.palette.apply(counts, int(job["max_iter"]), job["palette"])
+
+    origin_x, origin_y, zoom_index = renderer.current_view()
+    pixel = renderer.pixel_size(zoom_index)
+    with localcontext() as ctx:
+        ctx.prec = renderer.decimal_digits(zoom_index)
+        offset_x = (Decimal(target[0]) / Decimal(pixel) - origin_x -
+                    Decimal(renderer.width - 1) / 2)
+        offset_y = (Decimal(target[1]) / Decimal(pixel) - origin_y -
+                    Decimal(renderer.height - 1) / 2)
+    return image, pixel, float(offset_x), float(offset_y)
+
+
+class ZoomVideo:
+    """Zoom from a start zoom to an end zoom toward a fixed target"""
+
+    ZOOM_STEPS_PER_OCTAVE = 8
+
+    def __init__(self, target, end_zoom, fractal="Mandelbrot", params=None, start_zoom=1.0,
+                 width=1280, height=720, frames_per_octave=30, max_iter=1000,
+                 palette=None, scale=2):
+        """
+        Args:
+            target: (x, y) zoom target; strings keep full precision
+            end_zoom: Zoom of the last frame
+            fractal: Registry name of a 2D fractal
+            params: Fractal parameters
+            start_zoom: Zoom of the first frame
+            width: Frame width
+            height: Frame height
+            frames_per_octave: Frames per doubling of the zoom
+            max_iter: Maximum iterations (kept constant so colors do not shift)
+            palette: Color scheme name (default: the configured one)
+            scale: Keyframe size relative to the frame
+        """
+        self.target = tuple(str(value) for value in target)
+        self.fractal = fractal
+        self.params = dict(params or {})
+        self.width = width
+        self.height = height
+        self.frames_per_octave = frames_per_octave
+        self.max_iter = max_iter
+        self.palette = palette
+        self.scale = scale
+
+        # Keyframes sit on the renderer's zoom ladder, one octave apart
+        steps = self.ZOOM_STEPS_PER_OCTAVE
+        self.start_index = int(round(math.log2(start_zoom) * steps))
+        end_index = int(round(math.log2(end_zoom) * steps))
+        self.octaves = max(end_index - self.start_index, 0) / steps
+        self.frame_count = int(round(self.octaves * frames_per_octave)) + 1
+        self.keyframe_count = int(math.ceil(self.octaves)) + 1
+
+    def keyframe_job(self, k):
+        """Batch job of keyframe k"""
+        zoom_index = self.start_index + k * self.ZOOM_STEPS_PER_OCTAVE
+        return dict(JOB_DEFAULTS, fractal=self.fractal, params=self.params,
+                    center=list(self.target),
+                    zoom=2.0 ** (zoom_index / self.ZOOM_STEPS_PER_OCTAVE),
+                    width=self.width * self.scale, height=self.height * self.scale,
+                    max_iter=self.max_iter, palette=self.palette)
+
+    def frame_pixel(self, t):
+        """Frame pixel size after t octaves of zoom"""
+        zoom = 2.0 ** (self.start_index / self.ZOOM_STEPS_PER_OCTAVE + t)
+        return 4.0 / zoom / self.height
+
+    def compose(self, t, keyframes, out):
+        """
+        Resample the frame t octaves into the zoom
+
+        Args:
+            t: Zoom position in octaves from the start
+            keyframes: Dict of keyframe index -> render_keyframe result
+            out: (height, width, 3) float32 buffer for the frame
+        """
+        k = min(int(math.floor(t)), self.keyframe_count - 1)
+        frame_pixel = self.frame_pixel(t)
+        for level in (k, k + 1):
+            if level not in keyframes:
+                continue
+            image, pixel, offset_x, offset_y = keyframes[level]
+            key_height, key_width = image.shape[:2]
+            step = frame_pixel / pixel
+            # Left/top edge of the frame in keyframe pixel edges
+            x0 = offset_x + key_width / 2 - self.width / 2 * step
+            y0 = offset_y + key_height / 2 - self.height / 2 * step
+            if level == k:
+                rows, cols = (0, self.height), (0, self.width)
+            else:
+                # Only the frame pixels lying wholly inside the finer keyframe
+                cols = (max(int(math.ceil(-x0 / step)), 0),
+                        min(int(math.floor((key_width - x0) / step)), self.width))
+                rows = (max(int(math.ceil(-y0 / step)), 0),
+                        min(int(math.floor((key_height - y0) / step)), self.height))
+                if cols[0] >= cols[1] or rows[0] >= rows[1]:
+                    continue
+            resample_box(image, out, x0, y0, step, rows[0], rows[1], cols[0], cols[1])
+
+    def frames(self, workers=None, config=None, coordinator=None):
+        """
+        Generate the frames in order
+
+        Keyframes are rendered on a process pool with at most ``workers``
+        of them in flight; only keyframes still needed are kept. With a
+        distributed_render.Coordinator, the keyframes' tiles are computed
+        on its workers instead, ``workers`` keyframes at a time.
+
+        Yields:
+            (height, width, 3) uint8 frames
+        """
+        config = config if config is not None else default_config()
+        workers = max(1, min(workers or os.cpu_count() or 1, self.keyframe_count))
+
+        from src.utils.jit_warmup import warm_up
+        warm_up([self.fractal])
+
+        if coordinator is None:
+            context = multiprocessing.get_context("spawn")
+            executor = ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker,
+                                           initargs=(config,))
+            extra = ()
+        else:
+            executor = ThreadPoolExecutor(workers)
+            extra = (config, coordinator)
+        with executor:
+            futures = {}
+            keyframes = {}
+            next_keyframe = 0
+            out = np.empty((self.height, self.width, 3), dtype=np.float32)
+            for frame in range(self.frame_count):
+                t = min(frame / self.frames_per_octave, self.octaves)
+                k = int(math.floor(t))
+
+                # Keep keyframes k and k + 1, render ahead up to the pool size
+                while (next_keyframe < self.keyframe_count and
+                       next_keyframe < k + 2 + workers):
+                    futures[next_keyframe] = executor.submit(
+                        render_keyframe, self.keyframe_job(next_keyframe), self.target, *extra)
+                    next_keyframe += 1
+                for level in (k, k + 1):
+                    if level in futures:
+                        keyframes[level] = futures.pop(level).result()
+                for level in [level for level in keyframes if level < k]:
+                    del keyframes[level]
+
+                self.compose(t, keyframes, out)
+                yield np.clip(out + 0.5, 0, 255).astype(np.uint8)
+
+
+def write_png_sequence(frames, directory, threads=None, log=print):
+    """
+    Write frames as frame_000000.png, ... (encoded on a few threads)
+
+    Returns:
+        Number of frames written
+    """
+    from PIL import Image
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    threads = threads or min(4, os.cpu_count() or 1)
+    pending = []
+    count = 0
+    with ThreadPoolExecutor(threads) as executor:
+        for count, frame in enumerate(frames, 1):
+            path = directory / f"frame_{count - 1:06d}.png"
+            pending.append(executor.submit(Image.fromarray(frame).save, path))
+            # Bound the frames waiting to be encoded
+            while len(pending) > 2 * threads:
+                pending.pop(0).result()
+            if count % 30 == 0:
+                log(f"{count} frames")
+        for future in pending:
+            future.result()
+    return count
+
+
+def write_raw_stream(frames, stream):
+    """
+    Write frames as raw rgb24 video to a binary stream
+
+    Returns:
+        Number of frames written
+    """
+    count = 0
+    for count, frame in enumerate(frames, 1):
+        stream.write(frame.tobytes())
+    stream.flush()
+    return count
+
+
+def interesting_target(name):
+    """Target of a Mandelbrot.get_interesting_points entry"""
+    from src.fractals.fractal_2d.mandelbrot import Mandelbrot
+
+    for point in Mandelbrot.get_interesting_points():
+        if point["name"].lower() == name.lower():
+            return point
+    names = ", ".join(point["name"] for point in Mandelbrot.get_interesting_points())
+    raise KeyError(f"Unknown target {name!r} (known: {names})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export an exponential zoom video")
+    parser.add_argument("--target", help="name of a Mandelbrot.get_interesting_points entry")
+    parser.add_argument("--center", nargs=2, metavar=("X", "Y"),
+                        help="zoom target (decimal strings keep deep-zoom precision)")
+    parser.add_argument("--zoom", type=float, help="end zoom (default: the target's)")
+    parser.add_argument("--start-zoom", type=float, default=1.0)
+    parser.add_argument("--fractal", default="Mandelbrot")
+    parser.add_argument("--size", default="1280x720", help="frame size WIDTHxHEIGHT")
+    parser.add_argument("--fps-octave", type=int, default=30, help="frames per zoom doubling")
+    parser.add_argument("--max-iter", type=int, default=1000)
+    parser.add_argument("--palette", default=None)
+    parser.add_argument("--scale", type=int, default=2, help="keyframe size / frame size")
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("-o", "--output-dir", help="write a PNG sequence here")
+    output.add_argument("--raw", metavar="FILE", help="write raw rgb24 frames ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    if args.target:
+        point = interesting_target(args.target)
+        center, zoom = (point["x"], point["y"]), point["zoom"]
+    elif args.center:
+        center, zoom = args.center, None
+    else:
+        parser.error("give --target or --center")
+    zoom = args.zoom or zoom
+    if zoom is None:
+        parser.error("--center needs --zoom")
+    width, height = (int(v) for v in args.size.lower().split("x"))
+
+    # With raw video on stdout, progress goes to stderr
+    log = (lambda line: print(line, file=sys.stderr)) if args.raw == "-" else print
+    video = ZoomVideo(center, zoom, args.fractal, start_zoom=args.start_zoom, width=width,
+                      height=height, frames_per_octave=args.fps_octave,
+                      max_iter=args.max_iter, palette=args.palette, scale=args.scale)
+    log(f"{video.frame_count} frames over {video.octaves:g} octaves "
+        f"from {video.keyframe_count} keyframes")
+
+    start = time.perf_counter()
+    frames = video.frames(args.workers)
+    if args.output_dir:
+        count = write_png_sequence(frames, args.output_dir, log=log)
+    elif args.raw == "-":
+        count = write_raw_stream(frames, sys.stdout.buffer)
+    else:
+        with open(args.raw, "wb") as stream:
+            count = write_raw_stream(frames, stream)
+    elapsed = time.perf_counter() - start
+    log(f"Wrote {count} frames in {elapsed:.1f} s ({count / max(elapsed, 1e-9):.1f} frames/s)")
+    if args.output_dir:
+        log(f"ffmpeg -framerate 30 -i {args.output_dir}/frame_%06d.png "
+            f"-c:v libx264 -pix_fmt yuv420p zoom.mp4")
+
+
+if __name__ == "__main__":
+    main()